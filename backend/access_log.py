@@ -0,0 +1,212 @@
+"""
+Журнал доступа в JSON и идентификаторы запросов.
+
+AccessLogMiddleware принимает идентификатор запроса из X-Request-ID (его
+задает nginx) или создает новый, возвращает его в ответе и добавляет ко
+всем записям журнала, сделанным во время запроса. По завершении запроса
+пишется запись журнала access: шаблон маршрута, статус, время, число и
+время SQL-запросов, размер ответа, пользователь, роль и адрес клиента.
+
+setup_logging направляет записи корневого логгера через очередь: логгеры
+только кладут запись в очередь, а форматирование и запись в поток
+выполняет отдельный поток QueueListener, поэтому журнал не блокирует
+цикл событий. Вызывается при старте каждого процесса (после fork).
+"""
+
+import logging
+import queue
+import re
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import orjson
+
+from config import settings
+from metrics import route_template
+
+access_logger = logging.getLogger("access")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_VALID_REQUEST_ID = re.compile(r"^[\w.-]{1,64}$")
+
+# Атрибуты LogRecord; остальные атрибуты записи - поля из extra
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет к записи идентификатор текущего запроса"""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись журнала одной строкой JSON; поля extra - на верхнем уровне"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode("utf-8")
+
+
+def setup_logging():
+    """Корневой логгер через очередь и QueueListener; повторный вызов заменяет обработчики"""
+    global _listener
+    stop_logging()
+
+    if settings.log_file:
+        handler = logging.FileHandler(settings.log_file, encoding="utf-8")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # Идентификатор запроса берется из контекста в потоке, сделавшем запись
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in [h for h in root.handlers if isinstance(h, QueueHandler)]:
+        root.removeHandler(existing)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.log_level.upper())
+    # Журнал доступа пишется при любом уровне корневого логгера
+    access_logger.setLevel(logging.INFO)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging():
+    """Записывает оставшиеся в очереди записи и останавливает поток журнала"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def client_address(scope) -> Optional[str]:
+    """
+    Адрес клиента.
+
+    X-Forwarded-For учитывается, только если соединение открыл доверенный
+    прокси (forwarded_allow_ips). Адреса заголовка просматриваются справа
+    налево, клиентом считается первый адрес не из доверенных: адреса левее
+    него мог подставить сам клиент.
+    """
+    client = scope.get("client")
+    peer = client[0] if client else None
+    trusted = {address.strip() for address in settings.forwarded_allow_ips.split(",")}
+    trust_all = "*" in trusted
+    if peer is None or not (trust_all or peer in trusted):
+        return peer
+
+    forwarded = []
+    for key, value in scope.get("headers", []):
+        if key == b"x-forwarded-for":
+            forwarded += [address.strip() for address in value.decode("latin-1").split(",") if address.strip()]
+    if not forwarded:
+        return peer
+    if trust_all:
+        return forwarded[0]
+    for address in reversed(forwarded):
+        if address not in trusted:
+            return address
+    return forwarded[0]
+
+
+class AccessLogMiddleware:
+    """Идентификатор запроса и запись журнала access; подключается снаружи всех, кроме MetricsMiddleware"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        user_agent = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")
+            elif key == b"user-agent":
+                user_agent = value.decode("latin-1")
+        if not request_id or not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        status = 500
+        size = 0
+
+        async def send_with_request_id(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration = time.perf_counter() - start
+            if settings.access_log_enabled:
+                self.log_request(scope, status, duration, size, user_agent)
+            _request_id.reset(token)
+
+    def log_request(self, scope, status: int, duration: float, size: int, user_agent: Optional[str]):
+        # Статистику SQL и пользователя записывают во время запроса
+        # QueryStatsMiddleware и auth.get_current_user
+        stats = scope.get("query_stats")
+        state = scope.get("state", {})
+        route = route_template(scope)
+        access_logger.info(
+            "%s %s %d %.1f мс", scope["method"], scope["path"], status, duration * 1000,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route,
+                "status": status,
+                "duration_ms": round(duration * 1000, 1),
+                "db_queries": stats.count if stats else None,
+                "db_time_ms": round(stats.duration * 1000, 1) if stats else None,
+                "response_bytes": size,
+                "user_id": state.get("user_id"),
+                "role": state.get("user_role"),
+                "client": client_address(scope),
+                "user_agent": user_agent,
+            }
+        )
@@ -0,0 +1,282 @@
+"""
+Материализованные представления для аналитики предложений поставщиков.
+
+Каждое представление описано один раз как SQLAlchemy-запрос: из него
+строится DDL материализованного представления в PostgreSQL, и он же
+используется как живой подзапрос, если представление еще не создано
+(или база не PostgreSQL). Запросы с функциями PostgreSQL (percentile_cont,
+stddev) на других СУБД не выполняются: source() и require_postgresql()
+отвечают ошибкой 501.
+"""
+
+import asyncio
+import logging
+from typing import List
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, column, func, select, table, text
+from sqlalchemy.dialects import postgresql
+
+from config import settings
+from database import engine
+from models import ProposalItem, SupplierProposal, TenderLot, TenderProduct
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки, чтобы обновление выполнял только один воркер
+REFRESH_LOCK_KEY = 726001
+
+# Позиция учитывается в ценовой статистике, только если товар в наличии и указана цена
+PRICED_ITEM = and_(ProposalItem.price_per_unit.isnot(None), ProposalItem.is_available == True)
+
+
+def supplier_stats_query(supplier_id: int = None):
+    """Агрегаты по поставщику: счетчики предложений и статистика по позициям"""
+    if supplier_id is None:
+        supplier_filter = SupplierProposal.supplier_id.isnot(None)
+    else:
+        supplier_filter = SupplierProposal.supplier_id == supplier_id
+    
+    proposal_stats = select(
+        SupplierProposal.supplier_id.label('supplier_id'),
+        func.count(SupplierProposal.id).label('proposals_count'),
+        func.count(case((SupplierProposal.status == 'accepted', 1))).label('accepted_proposals'),
+        func.min(SupplierProposal.created_at).label('first_proposal'),
+        func.max(SupplierProposal.created_at).label('last_proposal')
+    ).where(
+        supplier_filter
+    ).group_by(SupplierProposal.supplier_id).subquery('proposal_stats')
+
+    item_stats = select(
+        SupplierProposal.supplier_id.label('supplier_id'),
+        func.count(ProposalItem.id).label('items_count'),
+        func.count(case((PRICED_ITEM, 1))).label('priced_items'),
+        func.sum(case((PRICED_ITEM, ProposalItem.price_per_unit))).label('price_sum'),
+        func.avg(case((PRICED_ITEM, ProposalItem.price_per_unit))).label('avg_price'),
+        func.min(case((PRICED_ITEM, ProposalItem.price_per_unit))).label('min_price'),
+        func.max(case((PRICED_ITEM, ProposalItem.price_per_unit))).label('max_price'),
+        func.avg(ProposalItem.delivery_days).label('avg_delivery'),
+        func.min(ProposalItem.delivery_days).label('min_delivery'),
+        func.max(ProposalItem.delivery_days).label('max_delivery'),
+        func.count(case((ProposalItem.is_analog == True, 1))).label('analog_items')
+    ).join(
+        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
+    ).where(
+        supplier_filter
+    ).group_by(SupplierProposal.supplier_id).subquery('item_stats')
+
+    return select(
+        proposal_stats.c.supplier_id,
+        proposal_stats.c.proposals_count,
+        proposal_stats.c.accepted_proposals,
+        proposal_stats.c.first_proposal,
+        proposal_stats.c.last_proposal,
+        func.coalesce(item_stats.c.items_count, 0).label('items_count'),
+        func.coalesce(item_stats.c.priced_items, 0).label('priced_items'),
+        item_stats.c.price_sum,
+        item_stats.c.avg_price,
+        item_stats.c.min_price,
+        item_stats.c.max_price,
+        item_stats.c.avg_delivery,
+        item_stats.c.min_delivery,
+        item_stats.c.max_delivery,
+        func.coalesce(item_stats.c.analog_items, 0).label('analog_items')
+    ).outerjoin(
+        item_stats, proposal_stats.c.supplier_id == item_stats.c.supplier_id
+    )
+
+
+def product_price_stats_query():
+    """Распределение цен по нормализованному ключу товара во всех тендерах"""
+    price = ProposalItem.price_per_unit
+    return select(
+        TenderProduct.normalized_key.label('product_key'),
+        func.min(TenderProduct.name).label('product_name'),
+        func.min(TenderProduct.unit_of_measure).label('unit_of_measure'),
+        func.count(func.distinct(TenderLot.tender_id)).label('tenders_count'),
+        func.count(ProposalItem.id).label('proposals_count'),
+        func.avg(price).label('avg_price'),
+        func.min(price).label('min_price'),
+        func.max(price).label('max_price'),
+        func.stddev(price).label('price_stddev'),
+        func.percentile_cont(0.25).within_group(price).label('p25_price'),
+        func.percentile_cont(0.5).within_group(price).label('median_price'),
+        func.percentile_cont(0.75).within_group(price).label('p75_price'),
+        func.percentile_cont(0.9).within_group(price).label('p90_price')
+    ).join(
+        TenderProduct, ProposalItem.product_id == TenderProduct.id
+    ).join(
+        TenderLot, TenderProduct.lot_id == TenderLot.id
+    ).where(
+        PRICED_ITEM,
+        TenderProduct.normalized_key.isnot(None)
+    ).group_by(TenderProduct.normalized_key)
+
+
+def tender_stats_query():
+    """Агрегаты предложений по тендеру"""
+    return select(
+        SupplierProposal.tender_id.label('tender_id'),
+        func.count(SupplierProposal.id).label('proposals_count'),
+        func.count(func.distinct(SupplierProposal.supplier_id)).label('suppliers_count'),
+        func.count(case((SupplierProposal.status == 'accepted', 1))).label('accepted_proposals'),
+        func.max(SupplierProposal.updated_at).label('last_updated')
+    ).where(
+        SupplierProposal.tender_id.isnot(None)
+    ).group_by(SupplierProposal.tender_id)
+
+
+class AnalyticsView:
+    """Материализованное представление с уникальным ключом для CONCURRENTLY-обновления"""
+
+    def __init__(self, name: str, key: str, query_factory, postgresql_only: bool = False, prefix_search: bool = False):
+        self.name = name
+        self.key = key
+        self.postgresql_only = postgresql_only  # Живой подзапрос использует функции PostgreSQL
+        self.prefix_search = prefix_search  # Поиск по префиксу ключа (LIKE 'ключ%')
+        self.query = query_factory()
+        self.table = table(name, *[column(c.key, c.type) for c in self.query.selected_columns])
+
+    def create_sql(self) -> str:
+        compiled = self.query.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True}
+        )
+        return f"CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS {compiled}"
+
+    def index_sql(self) -> List[str]:
+        statements = [f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{self.name}_{self.key} ON {self.name} ({self.key})"]
+        if self.prefix_search:
+            # Уникальный индекс с правилами сортировки базы не подходит для LIKE по префиксу
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.name}_{self.key}_pattern "
+                f"ON {self.name} ({self.key} varchar_pattern_ops)"
+            )
+        return statements
+
+
+SUPPLIER_STATS = AnalyticsView('mv_supplier_stats', 'supplier_id', supplier_stats_query)
+PRODUCT_PRICE_STATS = AnalyticsView(
+    'mv_product_price_stats', 'product_key', product_price_stats_query, postgresql_only=True, prefix_search=True
+)
+TENDER_STATS = AnalyticsView('mv_tender_stats', 'tender_id', tender_stats_query)
+
+ANALYTICS_VIEWS = [SUPPLIER_STATS, PRODUCT_PRICE_STATS, TENDER_STATS]
+
+# Базы, в которых представления уже созданы; отсутствие не кэшируется -
+# представления может создать миграция, запущенная после старта процесса
+_views_available = set()
+
+
+def views_available(db) -> bool:
+    """Проверяет, созданы ли материализованные представления"""
+    bind = db.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return False
+    key = str(bind.url)
+    if key not in _views_available:
+        existing = db.execute(text(
+            "SELECT count(*) FROM pg_matviews WHERE matviewname = ANY(:names)"
+        ), {"names": [view.name for view in ANALYTICS_VIEWS]}).scalar()
+        if existing != len(ANALYTICS_VIEWS):
+            return False
+        _views_available.add(key)
+    return True
+
+
+def require_postgresql(db):
+    """Аналитика на функциях PostgreSQL на других СУБД отвечает 501"""
+    if db.get_bind().dialect.name != 'postgresql':
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Эта аналитика доступна только при работе с PostgreSQL"
+        )
+
+
+def source(db, view: AnalyticsView):
+    """Источник данных для аналитики: представление или живой подзапрос"""
+    if views_available(db):
+        return view.table
+    if view.postgresql_only:
+        require_postgresql(db)
+    return view.query.subquery(view.name)
+
+
+def create_analytics_views(bind=engine):
+    """Создает материализованные представления и их уникальные индексы"""
+    with bind.connect() as conn:
+        for view in ANALYTICS_VIEWS:
+            conn.execute(text(view.create_sql()))
+            for statement in view.index_sql():
+                conn.execute(text(statement))
+        conn.commit()
+    _views_available.clear()
+
+
+def drop_analytics_views(bind=engine):
+    """Удаляет материализованные представления"""
+    with bind.connect() as conn:
+        for view in ANALYTICS_VIEWS:
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view.name}"))
+        conn.commit()
+    _views_available.clear()
+
+
+def _refreshed_recently(conn, min_interval: int) -> bool:
+    return bool(conn.execute(text(
+        "SELECT now() - refreshed_at < make_interval(secs => :seconds) FROM analytics_refreshes WHERE id = 1"
+    ), {"seconds": min_interval}).scalar())
+
+
+def refresh_analytics_views(bind=engine, concurrently: bool = True, min_interval: int = 0) -> bool:
+    """
+    Обновляет материализованные представления.
+
+    CONCURRENTLY пересчитывает представление и применяет только разницу,
+    не блокируя чтение. Время обновления записывается в analytics_refreshes;
+    с min_interval обновление пропускается, если с прошлого прошло меньше
+    min_interval секунд. Возвращает False, если обновление уже выполняет
+    другой процесс или оно пропущено.
+    """
+    if bind.dialect.name != 'postgresql':
+        return False
+
+    with bind.connect() as conn:
+        locked = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY}).scalar()
+        conn.commit()
+        if not locked:
+            return False
+        try:
+            if min_interval > 0 and _refreshed_recently(conn, min_interval):
+                conn.commit()
+                return False
+            for view in ANALYTICS_VIEWS:
+                mode = "CONCURRENTLY " if concurrently else ""
+                conn.execute(text(f"REFRESH MATERIALIZED VIEW {mode}{view.name}"))
+                conn.commit()
+            conn.execute(text(
+                "INSERT INTO analytics_refreshes (id, refreshed_at) VALUES (1, now()) "
+                "ON CONFLICT (id) DO UPDATE SET refreshed_at = excluded.refreshed_at"
+            ))
+            conn.commit()
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY})
+            conn.commit()
+    return True
+
+
+async def analytics_refresh_loop():
+    """
+    Периодическое обновление представлений в фоне.
+
+    Цикл работает в каждом процессе gunicorn; процесс, проснувшийся после
+    обновления другим процессом, пропускает период, и представления
+    обновляются примерно раз в interval секунд.
+    """
+    interval = settings.analytics_refresh_interval
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(refresh_analytics_views, min_interval=interval)
+        except Exception as e:
+            logger.warning(f"Не удалось обновить аналитические представления: {e}")
@@ -1,18 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func, desc, asc
+from sqlalchemy import and_, or_, func, desc, asc, case, true, select
 from typing import List, Optional, Dict, Any
 from database import get_db
 from models import (
     Tender, TenderStatus, User as UserModel, UserRole, 
-    SupplierProposal, ProposalItem, TenderProduct, TenderLot
+    SupplierProposal, ProposalItem, TenderProduct, TenderLot, normalize_text
 )
 from auth import get_current_active_user, require_any_role
+from tender_comparison import compare_tender_proposals
+from analytics_views import (
+    source, require_postgresql, supplier_stats_query, SUPPLIER_STATS, PRODUCT_PRICE_STATS, TENDER_STATS,
+    refresh_analytics_views
+)
+from cache import VersionedCache, proposals_version
+import re
 from datetime import datetime, timedelta
 from decimal import Decimal
 
 router = APIRouter()
 
+# Карточки поставщиков до изменения их предложений
+supplier_statistics_cache = VersionedCache("supplier_statistics", maxsize=512)
+
 
 @router.get("/tenders/summary")
 async def get_tenders_analytics_summary(
@@ -27,16 +38,26 @@ async def get_tenders_analytics_summary(
         func.count(Tender.id).label('count')
     ).group_by(Tender.status).all()
     
-    # Общее количество предложений
-    total_proposals = db.query(SupplierProposal).count()
+    # Агрегаты предложений берем из предрассчитанных представлений
+    supplier_stats = source(db, SUPPLIER_STATS)
+    tender_stats = source(db, TENDER_STATS)
     
-    # Количество уникальных поставщиков
-    unique_suppliers = db.query(func.count(func.distinct(SupplierProposal.supplier_id))).scalar()
+    total_proposals = db.query(
+        func.coalesce(func.sum(tender_stats.c.proposals_count), 0)
+    ).scalar()
+    
+    suppliers_totals = db.query(
+        func.count(supplier_stats.c.supplier_id).label('unique_suppliers'),
+        func.sum(supplier_stats.c.price_sum).label('price_sum'),
+        func.sum(supplier_stats.c.priced_items).label('priced_items')
+    ).first()
+    
+    unique_suppliers = suppliers_totals.unique_suppliers
     
     # Средняя цена предложений
-    avg_proposal_price = db.query(func.avg(ProposalItem.price_per_unit)).filter(
-        ProposalItem.price_per_unit.isnot(None)
-    ).scalar()
+    avg_proposal_price = None
+    if suppliers_totals.priced_items:
+        avg_proposal_price = suppliers_totals.price_sum / suppliers_totals.priced_items
     
     # Тендеры за последние 30 дней
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -64,48 +85,48 @@ async def get_suppliers_analytics(
 ):
     """Аналитика по поставщикам"""
     
-    # Базовый запрос для аналитики поставщиков
+    # Базовый запрос по предагрегированным данным поставщиков:
+    # счетчики предложений и ценовая статистика считаются отдельно и не размножаются
+    stats = source(db, SUPPLIER_STATS)
+    success_rate = case(
+        (stats.c.proposals_count > 0, stats.c.accepted_proposals * 100.0 / stats.c.proposals_count),
+        else_=0
+    ).label('success_rate')
+    
     query = db.query(
         UserModel.id,
         UserModel.full_name,
         UserModel.email,
-        func.count(SupplierProposal.id).label('proposals_count'),
-        func.avg(ProposalItem.price_per_unit).label('avg_price'),
-        func.count(
-            func.case(
-                [(SupplierProposal.status == 'accepted', 1)],
-                else_=None
-            )
-        ).label('accepted_proposals'),
-        func.min(SupplierProposal.created_at).label('first_proposal'),
-        func.max(SupplierProposal.created_at).label('last_proposal')
-    ).join(
-        SupplierProposal, UserModel.id == SupplierProposal.supplier_id
+        stats.c.proposals_count,
+        stats.c.avg_price,
+        stats.c.accepted_proposals,
+        success_rate,
+        stats.c.first_proposal,
+        stats.c.last_proposal
     ).join(
-        ProposalItem, SupplierProposal.id == ProposalItem.proposal_id
+        stats, stats.c.supplier_id == UserModel.id
     ).filter(
         UserModel.role == UserRole.SUPPLIER
-    ).group_by(
-        UserModel.id, UserModel.full_name, UserModel.email
     )
     
     # Сортировка
-    if sort_by == "proposals_count":
-        if sort_order == "desc":
-            query = query.order_by(desc('proposals_count'))
-        else:
-            query = query.order_by(asc('proposals_count'))
-    elif sort_by == "avg_price":
-        if sort_order == "desc":
-            query = query.order_by(desc('avg_price'))
-        else:
-            query = query.order_by(asc('avg_price'))
-    elif sort_by == "success_rate":
-        # Вычисляем success rate как accepted_proposals / proposals_count
-        query = query.order_by(desc('accepted_proposals'))
-    
-    # Подсчет общего количества
-    total = query.count()
+    sort_columns = {
+        "proposals_count": stats.c.proposals_count,
+        "avg_price": stats.c.avg_price,
+        "success_rate": success_rate
+    }
+    order = desc if sort_order == "desc" else asc
+    query = query.order_by(order(sort_columns[sort_by]), UserModel.id)
+    
+    # Подсчет поставщиков по тому же источнику, что и страница: представление
+    # может отставать от таблиц до следующего обновления
+    total = db.query(
+        func.count(stats.c.supplier_id)
+    ).join(
+        UserModel, UserModel.id == stats.c.supplier_id
+    ).filter(
+        UserModel.role == UserRole.SUPPLIER
+    ).scalar()
     
     # Пагинация
     offset = (page - 1) * size
@@ -114,17 +135,13 @@ async def get_suppliers_analytics(
     # Формируем результат
     items = []
     for supplier in suppliers:
-        success_rate = 0
-        if supplier.proposals_count > 0:
-            success_rate = (supplier.accepted_proposals / supplier.proposals_count) * 100
-        
         items.append({
             "supplier_id": supplier.id,
             "supplier_name": supplier.full_name,
             "supplier_email": supplier.email,
             "proposals_count": supplier.proposals_count,
             "accepted_proposals": supplier.accepted_proposals,
-            "success_rate": round(success_rate, 2),
+            "success_rate": round(float(supplier.success_rate), 2),
             "avg_price": float(supplier.avg_price) if supplier.avg_price else 0,
             "first_proposal": supplier.first_proposal,
             "last_proposal": supplier.last_proposal
@@ -157,60 +174,7 @@ async def get_tender_proposals_analytics(
             detail="Тендер не найден"
         )
     
-    # Получаем все предложения по тендеру
-    proposals = db.query(SupplierProposal).filter(
-        SupplierProposal.tender_id == tender_id
-    ).all()
-    
-    # Аналитика по предложениям
-    proposals_data = []
-    for proposal in proposals:
-        # Получаем информацию о поставщике
-        supplier = db.query(UserModel).filter(UserModel.id == proposal.supplier_id).first()
-        
-        # Получаем элементы предложения
-        proposal_items = db.query(ProposalItem).filter(
-            ProposalItem.proposal_id == proposal.id
-        ).all()
-        
-        # Вычисляем общую стоимость предложения
-        total_price = 0
-        available_items = 0
-        analog_items = 0
-        
-        for item in proposal_items:
-            if item.price_per_unit and item.is_available:
-                total_price += float(item.price_per_unit)
-                available_items += 1
-            if item.is_analog:
-                analog_items += 1
-        
-        proposals_data.append({
-            "proposal_id": proposal.id,
-            "supplier_id": proposal.supplier_id,
-            "supplier_name": supplier.full_name if supplier else "Неизвестно",
-            "supplier_email": supplier.email if supplier else "",
-            "status": proposal.status,
-            "prepayment_percent": float(proposal.prepayment_percent),
-            "currency": proposal.currency,
-            "vat_percent": float(proposal.vat_percent),
-            "total_price": total_price,
-            "available_items": available_items,
-            "analog_items": analog_items,
-            "total_items": len(proposal_items),
-            "created_at": proposal.created_at,
-            "updated_at": proposal.updated_at
-        })
-    
-    # Сортируем по общей стоимости
-    proposals_data.sort(key=lambda x: x['total_price'], reverse=True)
-    
-    return {
-        "tender_id": tender_id,
-        "tender_title": tender.title,
-        "proposals_count": len(proposals_data),
-        "proposals": proposals_data
-    }
+    return compare_tender_proposals(db, tender)
 
 
 @router.get("/products/price-analysis")
@@ -220,34 +184,22 @@ async def get_products_price_analysis(
     current_user: UserModel = Depends(require_any_role([UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER])),
     db: Session = Depends(get_db)
 ):
-    """Анализ цен по товарам"""
+    """Анализ цен по товарам, сгруппированным по нормализованному ключу во всех тендерах"""
     
     # Базовый запрос для анализа цен
-    query = db.query(
-        TenderProduct.id,
-        TenderProduct.name,
-        TenderProduct.position_number,
-        func.count(ProposalItem.id).label('proposals_count'),
-        func.avg(ProposalItem.price_per_unit).label('avg_price'),
-        func.min(ProposalItem.price_per_unit).label('min_price'),
-        func.max(ProposalItem.price_per_unit).label('max_price'),
-        func.stddev(ProposalItem.price_per_unit).label('price_stddev')
-    ).join(
-        ProposalItem, TenderProduct.id == ProposalItem.product_id
-    ).filter(
-        ProposalItem.price_per_unit.isnot(None),
-        ProposalItem.is_available == True
+    stats = source(db, PRODUCT_PRICE_STATS)
+    query = db.query(stats).filter(
+        stats.c.proposals_count >= 2  # Только товары с минимум 2 предложениями
     )
     
     if product_name:
-        query = query.filter(TenderProduct.name.ilike(f"%{product_name}%"))
-    
-    query = query.group_by(
-        TenderProduct.id, TenderProduct.name, TenderProduct.position_number
-    ).having(
-        func.count(ProposalItem.id) >= 2  # Только товары с минимум 2 предложениями
-    ).order_by(
-        desc('proposals_count')
+        # Поиск по префиксу нормализованного ключа использует индекс;
+        # _ и % в запросе ищутся как обычные символы
+        prefix = re.sub(r"([\\%_])", r"\\\1", normalize_text(product_name))
+        query = query.filter(stats.c.product_key.like(f"{prefix}%", escape="\\"))
+    
+    query = query.order_by(
+        desc(stats.c.proposals_count), stats.c.product_key
     ).limit(limit)
     
     results = query.all()
@@ -256,15 +208,22 @@ async def get_products_price_analysis(
     items = []
     for result in results:
         items.append({
-            "product_id": result.id,
-            "product_name": result.name,
-            "position_number": result.position_number,
+            "product_key": result.product_key,
+            "product_name": result.product_name,
+            "unit_of_measure": result.unit_of_measure,
+            "tenders_count": result.tenders_count,
             "proposals_count": result.proposals_count,
             "avg_price": float(result.avg_price) if result.avg_price else 0,
             "min_price": float(result.min_price) if result.min_price else 0,
             "max_price": float(result.max_price) if result.max_price else 0,
             "price_stddev": float(result.price_stddev) if result.price_stddev else 0,
-            "price_range": float(result.max_price - result.min_price) if result.max_price and result.min_price else 0
+            "price_range": float(result.max_price - result.min_price) if result.max_price and result.min_price else 0,
+            "percentiles": {
+                "p25": float(result.p25_price) if result.p25_price is not None else None,
+                "median": float(result.median_price) if result.median_price is not None else None,
+                "p75": float(result.p75_price) if result.p75_price is not None else None,
+                "p90": float(result.p90_price) if result.p90_price is not None else None
+            }
         })
     
     return {
@@ -273,6 +232,118 @@ async def get_products_price_analysis(
     }
 
 
+@router.get("/products/price-histogram")
+async def get_product_price_histogram(
+    product_key: str,
+    buckets: int = Query(10, ge=2, le=50),
+    current_user: UserModel = Depends(require_any_role([UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER])),
+    db: Session = Depends(get_db)
+):
+    """Гистограмма цен по товару во всех тендерах"""
+    
+    # width_bucket есть только в PostgreSQL
+    require_postgresql(db)
+    
+    price = ProposalItem.price_per_unit
+    offers = db.query(
+        price.label('price')
+    ).join(
+        TenderProduct, ProposalItem.product_id == TenderProduct.id
+    ).filter(
+        TenderProduct.normalized_key == product_key,
+        price.isnot(None),
+        ProposalItem.is_available == True
+    ).subquery('offers')
+    
+    bounds = db.query(
+        func.min(offers.c.price).label('low'),
+        func.max(offers.c.price).label('high')
+    ).subquery('bounds')
+    
+    # width_bucket требует, чтобы границы различались
+    high = case((bounds.c.high > bounds.c.low, bounds.c.high), else_=bounds.c.low + 1)
+    bucket = func.least(func.width_bucket(offers.c.price, bounds.c.low, high, buckets), buckets).label('bucket')
+    
+    results = db.query(
+        bucket,
+        func.count().label('count'),
+        func.min(offers.c.price).label('min_price'),
+        func.max(offers.c.price).label('max_price'),
+        func.min(bounds.c.low).label('low'),
+        func.min(high).label('high')
+    ).select_from(offers).join(
+        bounds, true()
+    ).group_by(bucket).order_by(bucket).all()
+    
+    items = []
+    for result in results:
+        width = (result.high - result.low) / buckets
+        items.append({
+            "bucket": result.bucket,
+            "range_from": float(result.low + width * (result.bucket - 1)),
+            "range_to": float(result.low + width * result.bucket),
+            "count": result.count,
+            "min_price": float(result.min_price),
+            "max_price": float(result.max_price)
+        })
+    
+    return {
+        "product_key": product_key,
+        "buckets": buckets,
+        "items": items
+    }
+
+
+@router.get("/products/price-trend")
+async def get_product_price_trend(
+    product_key: str,
+    period: str = Query("month", regex="^(week|month|quarter|year)$"),
+    current_user: UserModel = Depends(require_any_role([UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER])),
+    db: Session = Depends(get_db)
+):
+    """Динамика цен по товару во всех тендерах с группировкой по периодам"""
+    
+    # date_trunc и percentile_cont есть только в PostgreSQL
+    require_postgresql(db)
+    
+    price = ProposalItem.price_per_unit
+    period_start = func.date_trunc(period, SupplierProposal.created_at).label('period_start')
+    
+    results = db.query(
+        period_start,
+        func.count(ProposalItem.id).label('proposals_count'),
+        func.avg(price).label('avg_price'),
+        func.min(price).label('min_price'),
+        func.max(price).label('max_price'),
+        func.percentile_cont(0.5).within_group(price).label('median_price')
+    ).join(
+        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
+    ).join(
+        TenderProduct, ProposalItem.product_id == TenderProduct.id
+    ).filter(
+        TenderProduct.normalized_key == product_key,
+        price.isnot(None),
+        ProposalItem.is_available == True
+    ).group_by(period_start).order_by(period_start).all()
+    
+    items = []
+    for result in results:
+        items.append({
+            "period_start": result.period_start,
+            "proposals_count": result.proposals_count,
+            "avg_price": float(result.avg_price) if result.avg_price else 0,
+            "median_price": float(result.median_price) if result.median_price is not None else None,
+            "min_price": float(result.min_price) if result.min_price else 0,
+            "max_price": float(result.max_price) if result.max_price else 0
+        })
+    
+    return {
+        "product_key": product_key,
+        "period": period,
+        "items": items
+    }
+
+
 @router.get("/suppliers/{supplier_id}/statistics")
 async def get_supplier_statistics(
     supplier_id: int,
@@ -281,94 +352,85 @@ async def get_supplier_statistics(
 ):
     """Детальная статистика по конкретному поставщику"""
     
-    # Проверяем, что поставщик существует
-    supplier = db.query(UserModel).filter(
+    # Карточка действительна, пока не изменились предложения поставщика
+    version = proposals_version(db, SupplierProposal.supplier_id == supplier_id)
+    cached = supplier_statistics_cache.get(supplier_id, version)
+    if cached is not None:
+        return cached
+    
+    # Поставщик, его агрегаты и последние предложения - одним запросом
+    stats = supplier_stats_query(supplier_id).cte('supplier_stats')
+    recent = select(
+        SupplierProposal.id.label('proposal_id'),
+        SupplierProposal.tender_id.label('tender_id'),
+        Tender.title.label('tender_title'),
+        SupplierProposal.status.label('status'),
+        SupplierProposal.created_at.label('created_at')
+    ).outerjoin(
+        Tender, Tender.id == SupplierProposal.tender_id
+    ).where(
+        SupplierProposal.supplier_id == supplier_id
+    ).order_by(SupplierProposal.created_at.desc()).limit(5).cte('recent_proposals')
+    
+    rows = db.query(
+        UserModel.id,
+        UserModel.full_name,
+        UserModel.email,
+        stats.c.proposals_count,
+        stats.c.accepted_proposals,
+        stats.c.items_count,
+        stats.c.priced_items,
+        stats.c.avg_price,
+        stats.c.min_price,
+        stats.c.max_price,
+        stats.c.avg_delivery,
+        stats.c.min_delivery,
+        stats.c.max_delivery,
+        stats.c.analog_items,
+        recent.c.proposal_id,
+        recent.c.tender_id,
+        recent.c.tender_title,
+        recent.c.status,
+        recent.c.created_at
+    ).outerjoin(
+        stats, stats.c.supplier_id == UserModel.id
+    ).outerjoin(
+        recent, true()
+    ).filter(
         and_(
             UserModel.id == supplier_id,
             UserModel.role == UserRole.SUPPLIER
         )
-    ).first()
+    ).order_by(recent.c.created_at.desc()).all()
     
-    if not supplier:
+    if not rows:
         raise HTTPException(
             status_code=404,
             detail="Поставщик не найден"
         )
     
-    # Общая статистика
-    total_proposals = db.query(SupplierProposal).filter(
-        SupplierProposal.supplier_id == supplier_id
-    ).count()
+    supplier = rows[0]
+    stats = supplier if supplier.proposals_count else None
     
-    accepted_proposals = db.query(SupplierProposal).filter(
-        and_(
-            SupplierProposal.supplier_id == supplier_id,
-            SupplierProposal.status == 'accepted'
-        )
-    ).count()
-    
-    # Статистика по ценам
-    price_stats = db.query(
-        func.avg(ProposalItem.price_per_unit).label('avg_price'),
-        func.min(ProposalItem.price_per_unit).label('min_price'),
-        func.max(ProposalItem.price_per_unit).label('max_price'),
-        func.count(ProposalItem.id).label('total_items')
-    ).join(
-        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
-    ).filter(
-        and_(
-            SupplierProposal.supplier_id == supplier_id,
-            ProposalItem.price_per_unit.isnot(None),
-            ProposalItem.is_available == True
-        )
-    ).first()
-    
-    # Статистика по срокам поставки
-    delivery_stats = db.query(
-        func.avg(ProposalItem.delivery_days).label('avg_delivery'),
-        func.min(ProposalItem.delivery_days).label('min_delivery'),
-        func.max(ProposalItem.delivery_days).label('max_delivery')
-    ).join(
-        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
-    ).filter(
-        and_(
-            SupplierProposal.supplier_id == supplier_id,
-            ProposalItem.delivery_days.isnot(None)
-        )
-    ).first()
-    
-    # Статистика по аналогам
-    analog_stats = db.query(
-        func.count(
-            func.case(
-                [(ProposalItem.is_analog == True, 1)],
-                else_=None
-            )
-        ).label('analog_count'),
-        func.count(ProposalItem.id).label('total_items')
-    ).join(
-        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
-    ).filter(
-        SupplierProposal.supplier_id == supplier_id
-    ).first()
+    total_proposals = stats.proposals_count if stats else 0
+    accepted_proposals = stats.accepted_proposals if stats else 0
+    total_items = stats.items_count if stats else 0
+    analog_items = stats.analog_items if stats else 0
     
     # Последние предложения
-    recent_proposals = db.query(SupplierProposal).filter(
-        SupplierProposal.supplier_id == supplier_id
-    ).order_by(SupplierProposal.created_at.desc()).limit(5).all()
-    
     recent_proposals_data = []
-    for proposal in recent_proposals:
-        tender = db.query(Tender).filter(Tender.id == proposal.tender_id).first()
+    for row in rows:
+        if row.proposal_id is None:
+            continue
         recent_proposals_data.append({
-            "proposal_id": proposal.id,
-            "tender_id": proposal.tender_id,
-            "tender_title": tender.title if tender else "Неизвестно",
-            "status": proposal.status,
-            "created_at": proposal.created_at
+            "proposal_id": row.proposal_id,
+            "tender_id": row.tender_id,
+            "tender_title": row.tender_title if row.tender_title else "Неизвестно",
+            "status": row.status,
+            "created_at": row.created_at
         })
     
-    return {
+    result = {
         "supplier": {
             "id": supplier.id,
             "name": supplier.full_name,
@@ -379,23 +441,32 @@ async def get_supplier_statistics(
             "accepted_proposals": accepted_proposals,
             "success_rate": round((accepted_proposals / total_proposals * 100), 2) if total_proposals > 0 else 0,
             "price_statistics": {
-                "avg_price": float(price_stats.avg_price) if price_stats.avg_price else 0,
-                "min_price": float(price_stats.min_price) if price_stats.min_price else 0,
-                "max_price": float(price_stats.max_price) if price_stats.max_price else 0,
-                "total_items": price_stats.total_items or 0
+                "avg_price": float(stats.avg_price) if stats and stats.avg_price else 0,
+                "min_price": float(stats.min_price) if stats and stats.min_price else 0,
+                "max_price": float(stats.max_price) if stats and stats.max_price else 0,
+                "total_items": stats.priced_items if stats else 0
             },
             "delivery_statistics": {
-                "avg_delivery_days": float(delivery_stats.avg_delivery) if delivery_stats.avg_delivery else 0,
-                "min_delivery_days": delivery_stats.min_delivery or 0,
-                "max_delivery_days": delivery_stats.max_delivery or 0
+                "avg_delivery_days": float(stats.avg_delivery) if stats and stats.avg_delivery else 0,
+                "min_delivery_days": stats.min_delivery if stats and stats.min_delivery else 0,
+                "max_delivery_days": stats.max_delivery if stats and stats.max_delivery else 0
             },
             "analog_statistics": {
-                "analog_items": analog_stats.analog_count or 0,
-                "total_items": analog_stats.total_items or 0,
-                "analog_percentage": round((analog_stats.analog_count / analog_stats.total_items * 100), 2) if analog_stats.total_items and analog_stats.total_items > 0 else 0
+                "analog_items": analog_items,
+                "total_items": total_items,
+                "analog_percentage": round((analog_items / total_items * 100), 2) if total_items > 0 else 0
             }
         },
         "recent_proposals": recent_proposals_data
     }
+    supplier_statistics_cache.set(supplier_id, version, result)
+    return result
 
 
+@router.post("/refresh")
+async def refresh_analytics(
+    current_user: UserModel = Depends(require_any_role([UserRole.ADMIN])),
+):
+    """Принудительное обновление предрассчитанной аналитики"""
+    refreshed = await run_in_threadpool(refresh_analytics_views)
+    return {"refreshed": refreshed}
@@ -6,6 +6,9 @@ from database import get_db
 from models import TenderApplication, User as UserModel, UserRole, Tender, SupplierProfile, TenderLot, TenderProduct, TenderDocument, TenderOrganizer, TenderProcedureStage
 from schemas import TenderApplication as TenderApplicationSchema, TenderApplicationCreate, TenderApplicationUpdate
 from auth import get_current_active_user, require_any_role
+from tender_writer import load_tender_graph
+from compression import iter_chunks
+from dataframes import load_pandas
 from datetime import datetime
 
 router = APIRouter()
@@ -144,17 +147,8 @@ async def get_application_detail(
         SupplierProfile.user_id == application.supplier_id
     ).first()
     
-    # Получаем информацию о тендере с связанными данными
-    tender = db.query(Tender).filter(Tender.id == application.tender_id).first()
-    
-    # Загружаем связанные данные тендера
-    tender.lots = db.query(TenderLot).filter(TenderLot.tender_id == tender.id).all()
-    tender.documents = db.query(TenderDocument).filter(TenderDocument.tender_id == tender.id).all()
-    tender.organizers = db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender.id).all()
-    
-    # Загружаем товары для каждого лота
-    for lot in tender.lots:
-        lot.products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
+    # Получаем информацию о тендере со связанными данными (по запросу на уровень)
+    tender = load_tender_graph(db, application.tender_id)
     
     # Формируем ответ
     response_data = {
@@ -267,12 +261,9 @@ async def export_tender_applications(
     db: Session = Depends(get_db)
 ):
     """Экспорт заявок на тендер в Excel (для администраторов и контрактных управляющих)"""
-    try:
-        import pandas as pd
-        from io import BytesIO
-        from fastapi.responses import StreamingResponse
-    except ImportError:
-        raise HTTPException(status_code=500, detail="Библиотеки для экспорта в Excel не установлены")
+    from io import BytesIO
+    from fastapi.responses import StreamingResponse
+    pd = load_pandas("экспорта в Excel")
     
     # Проверяем, что тендер существует
     tender = db.query(Tender).filter(Tender.id == tender_id).first()
@@ -311,11 +302,9 @@ async def export_tender_applications(
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
         df.to_excel(writer, sheet_name='Заявки', index=False)
     
-    output.seek(0)
-    
     # Возвращаем файл
     return StreamingResponse(
-        BytesIO(output.read()),
+        iter_chunks(output),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename=tender_{tender_id}_applications.xlsx"}
     )
@@ -133,7 +133,7 @@ async def get_recent_tenders(
                     "title": tender.title,
                     "status": tender.status,
                     "created_at": tender.created_at,
-                    "applications_count": len(tender.applications)
+                    "applications_count": tender.applications_count
                 }
                 for tender in recent_tenders
             ]
@@ -155,7 +155,7 @@ async def get_recent_tenders(
                     "title": tender.title,
                     "status": tender.status,
                     "created_at": tender.created_at,
-                    "applications_count": len(tender.applications),
+                    "applications_count": tender.applications_count,
                     "created_by": tender.created_by
                 }
                 for tender in recent_tenders
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from database import get_db
-from models import Tender, TenderLot, TenderProduct, TenderDocument, TenderOrganizer, User as UserModel, UserRole
+from models import Tender, User as UserModel, UserRole
 from auth import get_current_active_user, require_any_role
+from metrics import track_job
+from dataframes import load_pandas
 from datetime import datetime
-import pandas as pd
 from io import BytesIO
 from fastapi.responses import StreamingResponse
+from compression import iter_chunks
+from tender_writer import load_tender_graph
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(track_job)])
 
 @router.get("/tender/{tender_id}")
 async def export_tender(
@@ -17,19 +20,13 @@ async def export_tender(
     db: Session = Depends(get_db)
 ):
     """Экспорт данных тендера в Excel"""
-    tender = db.query(Tender).filter(Tender.id == tender_id).first()
+    pd = load_pandas("экспорта в Excel")
+    
+    # Тендер вместе с лотами, товарами, документами и организаторами
+    tender = load_tender_graph(db, tender_id)
     if not tender:
         raise HTTPException(status_code=404, detail="Тендер не найден")
     
-    # Загружаем связанные данные
-    tender.lots = db.query(TenderLot).filter(TenderLot.tender_id == tender.id).all()
-    tender.documents = db.query(TenderDocument).filter(TenderDocument.tender_id == tender.id).all()
-    tender.organizers = db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender.id).all()
-    
-    # Загружаем товары для каждого лота
-    for lot in tender.lots:
-        lot.products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
-    
     # Создаем Excel файл
     output = BytesIO()
     with pd.ExcelWriter(output, engine='openpyxl') as writer:
@@ -141,12 +138,10 @@ async def export_tender(
             df_documents = pd.DataFrame(documents_data)
             df_documents.to_excel(writer, sheet_name='Документы', index=False)
     
-    output.seek(0)
-    
     filename = f"tender_{tender_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     
     return StreamingResponse(
-        BytesIO(output.read()),
+        iter_chunks(output),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
@@ -157,6 +152,8 @@ async def export_tenders(
     db: Session = Depends(get_db)
 ):
     """Экспорт списка всех тендеров в Excel"""
+    pd = load_pandas("экспорта в Excel")
+    
     # Получаем все тендеры
     query = db.query(Tender)
     
@@ -190,12 +187,10 @@ async def export_tenders(
         df_tenders = pd.DataFrame(tenders_data)
         df_tenders.to_excel(writer, sheet_name='Тендеры', index=False)
     
-    output.seek(0)
-    
     filename = f"tenders_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
     
     return StreamingResponse(
-        BytesIO(output.read()),
+        iter_chunks(output),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
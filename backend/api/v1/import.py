@@ -6,13 +6,14 @@ from models import (
     User as UserModel, UserRole, TenderStatus
 )
 from auth import get_current_active_user, require_any_role
+from metrics import track_job
+from dataframes import load_pandas
 from datetime import datetime
-import pandas as pd
 from io import BytesIO, StringIO
 from decimal import Decimal
 import csv
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(track_job)])
 
 @router.post("/tender")
 async def import_tender(
@@ -21,6 +22,8 @@ async def import_tender(
     db: Session = Depends(get_db)
 ):
     """Импорт данных тендера из Excel"""
+    pd = load_pandas("импорта из Excel")
+    
     if not file.filename.endswith('.xlsx'):
         raise HTTPException(
             status_code=400,
@@ -155,6 +158,8 @@ async def import_tenders(
     db: Session = Depends(get_db)
 ):
     """Импорт списка тендеров из Excel"""
+    pd = load_pandas("импорта из Excel")
+    
     if not file.filename.endswith('.xlsx'):
         raise HTTPException(
             status_code=400,
@@ -208,6 +213,8 @@ async def import_tenders_csv(
     db: Session = Depends(get_db)
 ):
     """Импорт списка тендеров из CSV файла"""
+    pd = load_pandas("импорта из CSV")
+    
     if not file.filename.endswith('.csv'):
         raise HTTPException(
             status_code=400,
@@ -6,12 +6,13 @@ from models import (
     User as UserModel, UserRole, TenderStatus
 )
 from auth import get_current_active_user, require_any_role
+from metrics import track_job
+from dataframes import load_pandas
 from datetime import datetime
-import pandas as pd
 from io import BytesIO
 from decimal import Decimal
 
-router = APIRouter()
+router = APIRouter(dependencies=[Depends(track_job)])
 
 @router.post("/tender")
 async def import_tender(
@@ -20,6 +21,8 @@ async def import_tender(
     db: Session = Depends(get_db)
 ):
     """Импорт данных тендера из Excel"""
+    pd = load_pandas("импорта из Excel")
+    
     if not file.filename.endswith('.xlsx'):
         raise HTTPException(
             status_code=400,
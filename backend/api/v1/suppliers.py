@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, or_, func
 from typing import List, Optional
 from database import get_db
@@ -11,9 +11,12 @@ from models import (
 from schemas import (
     Tender as TenderSchema, SupplierProposal as SupplierProposalSchema,
     SupplierProposalCreate, SupplierProposalUpdate, SupplierProposalWithTender,
-    ProposalItemCreate, ProposalItemUpdate, PaginatedResponse
+    ProposalItemCreate, ProposalItemUpdate, ProposalItemsPatch, PaginatedResponse
 )
-from auth import get_current_active_user, require_role
+from auth import get_current_active_user, require_any_role
+from proposal_service import create_proposal, replace_proposal_items, patch_proposal_items
+from tender_snapshots import get_tender_snapshot, snapshot_response
+from fast_json import FastJSONResponse
 from datetime import datetime
 from decimal import Decimal
 
@@ -31,7 +34,7 @@ async def get_tenders_for_suppliers(
         "by_deadline_asc",
         regex="^(by_deadline_asc|by_deadline_desc|by_published_desc|by_published_asc)$"
     ),
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Получение списка тендеров для поставщиков"""
@@ -70,26 +73,26 @@ async def get_tenders_for_suppliers(
     # Подсчет общего количества
     total = query.count()
     
+    # Предложение текущего поставщика присоединяем к той же выборке,
+    # общее число предложений берем из счетчика тендера
+    query = query.outerjoin(
+        SupplierProposal,
+        and_(
+            SupplierProposal.tender_id == Tender.id,
+            SupplierProposal.supplier_id == current_user.id
+        )
+    ).add_columns(
+        SupplierProposal.id.label('proposal_id'),
+        SupplierProposal.status.label('proposal_status')
+    ).order_by(Tender.id)
+    
     # Пагинация
     offset = (page - 1) * size
-    tenders = query.offset(offset).limit(size).all()
+    rows = query.offset(offset).limit(size).all()
     
     # Преобразование в словари для ответа
     items = []
-    for tender in tenders:
-        # Проверяем, есть ли уже предложение от этого поставщика
-        existing_proposal = db.query(SupplierProposal).filter(
-            and_(
-                SupplierProposal.tender_id == tender.id,
-                SupplierProposal.supplier_id == current_user.id
-            )
-        ).first()
-        
-        # Подсчитываем количество предложений
-        proposals_count = db.query(SupplierProposal).filter(
-            SupplierProposal.tender_id == tender.id
-        ).count()
-        
+    for tender, proposal_id, proposal_status in rows:
         item = {
             "id": tender.id,
             "title": tender.title,
@@ -102,106 +105,80 @@ async def get_tenders_for_suppliers(
             "region": tender.region,
             "procurement_method": tender.procurement_method,
             "created_at": tender.created_at,
-            "has_proposal": existing_proposal is not None,
-            "proposal_status": existing_proposal.status if existing_proposal else None,
-            "proposals_count": proposals_count
+            "has_proposal": proposal_id is not None,
+            "proposal_status": proposal_status,
+            "proposals_count": tender.proposals_count
         }
         items.append(item)
     
     pages = (total + size - 1) // size
     
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
-        size=size,
-        pages=pages
-    )
+    # Словари собраны выше - отдаем их без повторной валидации response_model
+    return FastJSONResponse({"items": items, "total": total, "page": page, "size": size, "pages": pages})
 
 
 @router.get("/tenders/{tender_id}", response_model=TenderSchema)
 async def get_tender_for_supplier(
+    request: Request,
     tender_id: int,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Получение детальной информации о тендере для поставщика"""
-    tender = db.query(Tender).filter(Tender.id == tender_id).first()
-    if not tender:
+    snapshot = get_tender_snapshot(db, tender_id)
+    if not snapshot:
         raise HTTPException(
             status_code=404,
             detail="Тендер не найден"
         )
     
     # Проверяем, что тендер опубликован
-    if tender.status != TenderStatus.PUBLISHED:
+    if snapshot.status != TenderStatus.PUBLISHED:
         raise HTTPException(
             status_code=403,
             detail="Тендер недоступен для просмотра"
         )
     
-    # Загружаем связанные данные
-    try:
-        tender.lots = db.query(TenderLot).filter(TenderLot.tender_id == tender_id).all()
-        tender.documents = db.query(TenderDocument).filter(TenderDocument.tender_id == tender_id).all()
-        tender.organizers = db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender_id).all()
-        
-        # Загружаем товары для каждого лота
-        for lot in tender.lots:
-            lot.products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
-    except Exception as e:
-        tender.lots = []
-        tender.documents = []
-        tender.organizers = []
-    
-    return tender
+    return snapshot_response(request, snapshot)
 
 
 @router.get("/proposals", response_model=List[SupplierProposalWithTender])
 async def get_supplier_proposals(
     status: Optional[str] = None,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Получение предложений поставщика"""
     
-    query = db.query(SupplierProposal).filter(
+    # Позиции и тендеры со всеми дочерними записями загружаются для всех
+    # предложений сразу, по запросу на связь
+    tender = selectinload(SupplierProposal.tender)
+    query = db.query(SupplierProposal).options(
+        selectinload(SupplierProposal.proposal_items),
+        tender.selectinload(Tender.lots).selectinload(TenderLot.products),
+        tender.selectinload(Tender.documents),
+        tender.selectinload(Tender.organizers)
+    ).filter(
         SupplierProposal.supplier_id == current_user.id
     )
     
     if status:
         query = query.filter(SupplierProposal.status == status)
     
-    proposals = query.order_by(SupplierProposal.created_at.desc()).all()
-    
-    # Загружаем связанные данные
-    result = []
-    for proposal in proposals:
-        proposal.tender = db.query(Tender).filter(Tender.id == proposal.tender_id).first()
-        proposal.proposal_items = db.query(ProposalItem).filter(
-            ProposalItem.proposal_id == proposal.id
-        ).all()
-        
-        # Загружаем информацию о товарах
-        for item in proposal.proposal_items:
-            item.product = db.query(TenderProduct).filter(
-                TenderProduct.id == item.product_id
-            ).first()
-        
-        result.append(proposal)
-    
-    return result
+    return query.order_by(SupplierProposal.created_at.desc()).all()
 
 
 @router.get("/proposals/{proposal_id}", response_model=SupplierProposalSchema)
 async def get_supplier_proposal(
     proposal_id: int,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Получение детальной информации о предложении поставщика"""
     
-    proposal = db.query(SupplierProposal).filter(
+    proposal = db.query(SupplierProposal).options(
+        selectinload(SupplierProposal.proposal_items)
+    ).filter(
         and_(
             SupplierProposal.id == proposal_id,
             SupplierProposal.supplier_id == current_user.id
@@ -214,92 +191,18 @@ async def get_supplier_proposal(
             detail="Предложение не найдено"
         )
     
-    # Загружаем элементы предложения
-    proposal.proposal_items = db.query(ProposalItem).filter(
-        ProposalItem.proposal_id == proposal.id
-    ).all()
-    
-    # Загружаем информацию о товарах
-    for item in proposal.proposal_items:
-        item.product = db.query(TenderProduct).filter(
-            TenderProduct.id == item.product_id
-        ).first()
-    
     return proposal
 
 
 @router.post("/proposals", response_model=SupplierProposalSchema)
 async def create_supplier_proposal(
     proposal_data: SupplierProposalCreate,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Создание нового предложения поставщика"""
     
-    # Проверяем, что тендер существует и опубликован
-    tender = db.query(Tender).filter(Tender.id == proposal_data.tender_id).first()
-    if not tender:
-        raise HTTPException(
-            status_code=404,
-            detail="Тендер не найден"
-        )
-    
-    if tender.status != TenderStatus.PUBLISHED:
-        raise HTTPException(
-            status_code=400,
-            detail="Нельзя подавать предложения на неопубликованные тендеры"
-        )
-    
-    # Проверяем, что у поставщика еще нет предложения на этот тендер
-    existing_proposal = db.query(SupplierProposal).filter(
-        and_(
-            SupplierProposal.tender_id == proposal_data.tender_id,
-            SupplierProposal.supplier_id == current_user.id
-        )
-    ).first()
-    
-    if existing_proposal:
-        raise HTTPException(
-            status_code=400,
-            detail="У вас уже есть предложение на этот тендер"
-        )
-    
-    # Создаем предложение
-    db_proposal = SupplierProposal(
-        tender_id=proposal_data.tender_id,
-        supplier_id=current_user.id,
-        prepayment_percent=proposal_data.prepayment_percent,
-        currency=proposal_data.currency,
-        vat_percent=proposal_data.vat_percent,
-        general_comment=proposal_data.general_comment,
-        status="draft"
-    )
-    db.add(db_proposal)
-    db.flush()  # Получаем ID предложения
-    
-    # Создаем элементы предложения
-    for item_data in proposal_data.proposal_items:
-        # Проверяем, что товар существует
-        product = db.query(TenderProduct).filter(TenderProduct.id == item_data.product_id).first()
-        if not product:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Товар с ID {item_data.product_id} не найден"
-            )
-        
-        db_item = ProposalItem(
-            proposal_id=db_proposal.id,
-            product_id=item_data.product_id,
-            is_available=item_data.is_available,
-            is_analog=item_data.is_analog,
-            price_per_unit=item_data.price_per_unit,
-            delivery_days=item_data.delivery_days,
-            comment=item_data.comment
-        )
-        db.add(db_item)
-    
-    db.commit()
-    db.refresh(db_proposal)
+    db_proposal = create_proposal(db, proposal_data.tender_id, current_user.id, proposal_data)
     
     # Загружаем элементы предложения для ответа
     db_proposal.proposal_items = db.query(ProposalItem).filter(
@@ -313,7 +216,7 @@ async def create_supplier_proposal(
 async def update_supplier_proposal(
     proposal_id: int,
     proposal_data: SupplierProposalUpdate,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Обновление предложения поставщика"""
@@ -345,29 +248,7 @@ async def update_supplier_proposal(
     
     # Обновляем элементы предложения, если они переданы
     if proposal_data.proposal_items is not None:
-        # Удаляем старые элементы
-        db.query(ProposalItem).filter(ProposalItem.proposal_id == proposal_id).delete()
-        
-        # Создаем новые элементы
-        for item_data in proposal_data.proposal_items:
-            # Проверяем, что товар существует
-            product = db.query(TenderProduct).filter(TenderProduct.id == item_data.product_id).first()
-            if not product:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Товар с ID {item_data.product_id} не найден"
-                )
-            
-            db_item = ProposalItem(
-                proposal_id=proposal_id,
-                product_id=item_data.product_id,
-                is_available=item_data.is_available,
-                is_analog=item_data.is_analog,
-                price_per_unit=item_data.price_per_unit,
-                delivery_days=item_data.delivery_days,
-                comment=item_data.comment
-            )
-            db.add(db_item)
+        replace_proposal_items(db, proposal, proposal_data.proposal_items)
     
     proposal.updated_at = datetime.utcnow()
     db.commit()
@@ -381,10 +262,46 @@ async def update_supplier_proposal(
     return proposal
 
 
+@router.patch("/proposals/{proposal_id}/items")
+async def patch_supplier_proposal_items(
+    proposal_id: int,
+    items_patch: ProposalItemsPatch,
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
+    db: Session = Depends(get_db)
+):
+    """Частичное обновление позиций предложения (для автосохранения черновика)"""
+    
+    proposal = db.query(SupplierProposal).filter(
+        and_(
+            SupplierProposal.id == proposal_id,
+            SupplierProposal.supplier_id == current_user.id
+        )
+    ).first()
+    
+    if not proposal:
+        raise HTTPException(
+            status_code=404,
+            detail="Предложение не найдено"
+        )
+    
+    if proposal.status == "submitted":
+        raise HTTPException(
+            status_code=400,
+            detail="Нельзя редактировать отправленное предложение"
+        )
+    
+    result = patch_proposal_items(db, proposal, items_patch.items, items_patch.removed_product_ids)
+    if result["updated"] or result["removed"]:
+        proposal.updated_at = datetime.utcnow()
+    db.commit()
+    
+    return result
+
+
 @router.post("/proposals/{proposal_id}/submit")
 async def submit_supplier_proposal(
     proposal_id: int,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Отправка предложения поставщика"""
@@ -409,8 +326,8 @@ async def submit_supplier_proposal(
         )
     
     # Проверяем, что есть хотя бы один элемент предложения
-    items_count = db.query(ProposalItem).filter(ProposalItem.proposal_id == proposal_id).count()
-    if items_count == 0:
+    has_items = db.query(ProposalItem.id).filter(ProposalItem.proposal_id == proposal_id).first()
+    if not has_items:
         raise HTTPException(
             status_code=400,
             detail="Нельзя отправлять пустое предложение"
@@ -426,7 +343,7 @@ async def submit_supplier_proposal(
 @router.get("/tenders/{tender_id}/products")
 async def get_tender_products_for_proposal(
     tender_id: int,
-    current_user: UserModel = Depends(require_role([UserRole.SUPPLIER])),
+    current_user: UserModel = Depends(require_any_role([UserRole.SUPPLIER])),
     db: Session = Depends(get_db)
 ):
     """Получение списка товаров тендера для создания предложения"""
@@ -445,14 +362,15 @@ async def get_tender_products_for_proposal(
             detail="Тендер недоступен для просмотра"
         )
     
-    # Получаем все лоты тендера
-    lots = db.query(TenderLot).filter(TenderLot.tender_id == tender_id).all()
+    # Получаем все лоты тендера вместе с товарами
+    lots = db.query(TenderLot).options(selectinload(TenderLot.products)).filter(
+        TenderLot.tender_id == tender_id
+    ).all()
     
     # Получаем все товары для всех лотов
     products = []
     for lot in lots:
-        lot_products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
-        for product in lot_products:
+        for product in lot.products:
             products.append({
                 "id": product.id,
                 "lot_id": lot.id,
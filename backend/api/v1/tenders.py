@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, or_, func, exists
 from typing import List, Optional
 from database import get_db
-from models import Tender, TenderStatus, User as UserModel, UserRole, TenderLot, TenderProduct, TenderDocument, TenderOrganizer, TenderProcedureStage
-from schemas import Tender as TenderSchema, TenderCreate, TenderUpdate, PaginatedResponse
+from models import Tender, TenderStatus, User as UserModel, UserRole, TenderLot, TenderProduct, TenderDocument, TenderOrganizer, TenderProcedureStage, SupplierProposal, ProposalItem
+from schemas import Tender as TenderSchema, TenderCreate, TenderUpdate, TenderProposalCreate, PaginatedResponse
+from proposal_service import create_proposal
+from tender_writer import create_tender_graph, update_tender_graph
+from http_cache import make_etag, conditional_response, cache_headers
+from fast_json import FastJSONResponse
+from tender_snapshots import get_tender_snapshot, build_tender_snapshot, snapshot_response
 from auth import get_current_active_user, require_role, require_any_role
 from datetime import datetime
+from collections import defaultdict
 
 router = APIRouter()
 
 
 @router.get("/", response_model=PaginatedResponse)
 async def get_tenders(
+    request: Request,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     status: Optional[TenderStatus] = None,
@@ -35,8 +42,8 @@ async def get_tenders(
 ):
     """Получение списка тендеров с расширенной фильтрацией и пагинацией"""
     
-    # Базовый запрос с подключением связанных таблиц
-    query = db.query(Tender).outerjoin(TenderOrganizer)
+    # Базовый запрос
+    query = db.query(Tender)
     
     # Фильтры
     if status:
@@ -45,11 +52,16 @@ async def get_tenders(
     if region:
         query = query.filter(Tender.region.ilike(f"%{region}%"))
     
+    # Условия на лоты, товары и организаторов проверяются подзапросами EXISTS
+    # по тендеру: соединение с ними размножило бы строки тендеров
+    def lot_exists(*criteria):
+        return exists().where(TenderLot.tender_id == Tender.id, *criteria)
+    
     if okpd_code:
         query = query.filter(
             or_(
                 Tender.okpd_code.ilike(f"%{okpd_code}%"),
-                TenderLot.okpd_code.ilike(f"%{okpd_code}%")
+                lot_exists(TenderLot.okpd_code.ilike(f"%{okpd_code}%"))
             )
         )
     
@@ -57,7 +69,7 @@ async def get_tenders(
         query = query.filter(
             or_(
                 Tender.okved_code.ilike(f"%{okved_code}%"),
-                TenderLot.okved_code.ilike(f"%{okved_code}%")
+                lot_exists(TenderLot.okved_code.ilike(f"%{okved_code}%"))
             )
         )
     
@@ -66,9 +78,16 @@ async def get_tenders(
             or_(
                 Tender.title.ilike(f"%{search}%"),
                 Tender.description.ilike(f"%{search}%"),
-                TenderLot.title.ilike(f"%{search}%"),
-                TenderLot.description.ilike(f"%{search}%"),
-                TenderProduct.name.ilike(f"%{search}%")
+                lot_exists(
+                    or_(
+                        TenderLot.title.ilike(f"%{search}%"),
+                        TenderLot.description.ilike(f"%{search}%")
+                    )
+                ),
+                lot_exists(
+                    TenderProduct.lot_id == TenderLot.id,
+                    TenderProduct.name.ilike(f"%{search}%")
+                )
             )
         )
     
@@ -91,7 +110,9 @@ async def get_tenders(
         query = query.filter(Tender.procurement_method == procurement_method)
     
     if organizer_inn:
-        query = query.filter(TenderOrganizer.inn == organizer_inn)
+        query = query.filter(
+            exists().where(TenderOrganizer.tender_id == Tender.id, TenderOrganizer.inn == organizer_inn)
+        )
     
     # Сортировка
     if sort == "by_published_desc":
@@ -107,25 +128,39 @@ async def get_tenders(
     elif sort == "by_price_desc":
         query = query.order_by(Tender.initial_price.desc())
     
-    # Подсчет общего количества
-    total = query.count()
+    # Подсчет общего количества и версия списка одним запросом по отобранным тендерам:
+    # любое изменение тендера (в том числе его лотов, организаторов и числа
+    # предложений) меняет количество, время изменения или сумму счетчиков
+    total, last_modified, proposals_total = query.order_by(None).with_entities(
+        func.count(Tender.id),
+        func.max(func.coalesce(Tender.updated_at, Tender.created_at)),
+        func.sum(Tender.proposals_count)
+    ).one()
+    # Last-Modified не отдается: время изменения не учитывает новые предложения,
+    # и ответ на If-Modified-Since мог бы быть устаревшим
+    etag = make_etag("tenders", request.url.query, total, last_modified, proposals_total)
+    not_modified = conditional_response(request, etag)
+    if not_modified:
+        return not_modified
     
     # Пагинация
     offset = (page - 1) * size
     tenders = query.offset(offset).limit(size).all()
     
+    # Лоты и организаторы страницы загружаем одним запросом на таблицу,
+    # количество товаров и документов берем из счетчиков
+    tender_ids = [tender.id for tender in tenders]
+    lots_by_tender = defaultdict(list)
+    organizers_by_tender = defaultdict(list)
+    if tender_ids:
+        for lot in db.query(TenderLot).filter(TenderLot.tender_id.in_(tender_ids)).order_by(TenderLot.lot_number, TenderLot.id):
+            lots_by_tender[lot.tender_id].append(lot)
+        for org in db.query(TenderOrganizer).filter(TenderOrganizer.tender_id.in_(tender_ids)).order_by(TenderOrganizer.id):
+            organizers_by_tender[org.tender_id].append(org)
+    
     # Преобразование в словари для ответа
     items = []
     for tender in tenders:
-        # Загружаем связанные данные
-        tender.lots = db.query(TenderLot).filter(TenderLot.tender_id == tender.id).all()
-        tender.documents = db.query(TenderDocument).filter(TenderDocument.tender_id == tender.id).all()
-        tender.organizers = db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender.id).all()
-        
-        # Загружаем товары для каждого лота
-        for lot in tender.lots:
-            lot.products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
-        
         item = {
             "id": tender.id,
             "title": tender.title,
@@ -147,66 +182,131 @@ async def get_tenders(
                     "title": lot.title,
                     "initial_price": float(lot.initial_price) if lot.initial_price else None,
                     "currency": lot.currency,
-                    "products_count": len(lot.products)
-                } for lot in tender.lots
+                    "products_count": lot.products_count
+                } for lot in lots_by_tender[tender.id]
             ],
-            "documents_count": len(tender.documents),
+            "products_count": tender.products_count,
+            "documents_count": tender.documents_count,
+            "proposals_count": tender.proposals_count,
             "organizers": [
                 {
                     "id": org.id,
                     "organization_name": org.organization_name,
                     "inn": org.inn
-                } for org in tender.organizers
+                } for org in organizers_by_tender[tender.id]
             ]
         }
         items.append(item)
     
     pages = (total + size - 1) // size
     
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
-        size=size,
-        pages=pages
+    # Словари собраны выше - отдаем их без повторной валидации response_model
+    return FastJSONResponse(
+        {"items": items, "total": total, "page": page, "size": size, "pages": pages},
+        headers=cache_headers(request, etag)
     )
 
 
+def proposal_item_dict(item: ProposalItem) -> dict:
+    return {
+        "id": item.id,
+        "proposal_id": item.proposal_id,
+        "product_id": item.product_id,
+        "is_available": item.is_available,
+        "is_analog": item.is_analog,
+        "price_per_unit": float(item.price_per_unit) if item.price_per_unit else None,
+        "delivery_days": item.delivery_days,
+        "comment": item.comment,
+        "created_at": item.created_at.isoformat() if item.created_at else None,
+        "updated_at": item.updated_at.isoformat() if item.updated_at else None,
+    }
+
+
+@router.get("/proposals")
+async def get_proposals(
+    current_user: UserModel = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Получение предложений в зависимости от роли пользователя"""
+    
+    # Тендер, поставщик и позиции загружаются для всех предложений сразу
+    query = db.query(SupplierProposal).options(
+        joinedload(SupplierProposal.tender),
+        joinedload(SupplierProposal.supplier),
+        selectinload(SupplierProposal.proposal_items)
+    )
+    
+    # Определяем какие предложения показывать в зависимости от роли
+    if current_user.role == UserRole.SUPPLIER:
+        # Поставщики видят только свои предложения
+        proposals = query.filter(SupplierProposal.supplier_id == current_user.id).all()
+    elif current_user.role in [UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER]:
+        # Админы, контрактные управляющие и менеджеры видят все предложения
+        proposals = query.all()
+    else:
+        raise HTTPException(
+            status_code=403,
+            detail="У вас нет прав для просмотра предложений"
+        )
+    
+    # Загружаем связанные данные
+    result = []
+    for proposal in proposals:
+        tender = proposal.tender
+        supplier = proposal.supplier
+        
+        proposal_data = {
+            "id": proposal.id,
+            "tender_id": proposal.tender_id,
+            "supplier_id": proposal.supplier_id,
+            "prepayment_percent": proposal.prepayment_percent,
+            "currency": proposal.currency,
+            "vat_percent": proposal.vat_percent,
+            "general_comment": proposal.general_comment,
+            "status": proposal.status,
+            "created_at": proposal.created_at.isoformat() if proposal.created_at else None,
+            "updated_at": proposal.updated_at.isoformat() if proposal.updated_at else None,
+            "proposal_items": [proposal_item_dict(item) for item in proposal.proposal_items],
+            # Дополнительная информация для админов/менеджеров
+            "tender_info": {
+                "title": tender.title if tender else "Тендер не найден",
+                "status": tender.status if tender else "unknown",
+                "initial_price": float(tender.initial_price) if tender and tender.initial_price else None,
+                "currency": tender.currency if tender else None,
+                "deadline": tender.deadline.isoformat() if tender and tender.deadline else None,
+            } if current_user.role in [UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER] else None,
+            "supplier_info": {
+                "full_name": supplier.full_name if supplier else "Поставщик не найден",
+                "email": supplier.email if supplier else None,
+                "phone": supplier.phone if supplier else None,
+            } if current_user.role in [UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER] else None,
+        }
+        
+        result.append(proposal_data)
+    
+    return result
+
+
 @router.get("/{tender_id}", response_model=TenderSchema)
 async def get_tender(
+    request: Request,
     tender_id: int,
     db: Session = Depends(get_db)
 ):
     """Получение детальной информации о тендере"""
-    tender = db.query(Tender).filter(Tender.id == tender_id).first()
-    if not tender:
+    snapshot = get_tender_snapshot(db, tender_id)
+    if not snapshot:
         raise HTTPException(
             status_code=404,
             detail="Тендер не найден"
         )
     
-    # Загружаем связанные данные
-    try:
-        tender.lots = db.query(TenderLot).filter(TenderLot.tender_id == tender_id).all()
-        tender.documents = db.query(TenderDocument).filter(TenderDocument.tender_id == tender_id).all()
-        tender.organizers = db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender_id).all()
-        tender.stages = db.query(TenderProcedureStage).filter(TenderProcedureStage.tender_id == tender_id).all()
-        
-        # Загружаем товары для каждого лота
-        for lot in tender.lots:
-            lot.products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
-    except Exception as e:
-        # Если есть ошибка с загрузкой связанных данных, возвращаем пустые списки
-        tender.lots = []
-        tender.documents = []
-        tender.organizers = []
-        tender.stages = []
-    
-    return tender
+    return snapshot_response(request, snapshot)
 
 
 @router.get("/{tender_id}/products")
 async def get_tender_products(
+    request: Request,
     tender_id: int,
     db: Session = Depends(get_db)
 ):
@@ -219,14 +319,22 @@ async def get_tender_products(
             detail="Тендер не найден"
         )
     
-    # Получаем все лоты тендера
-    lots = db.query(TenderLot).filter(TenderLot.tender_id == tender_id).all()
+    # Товары меняются только вместе с тендером
+    last_modified = tender.updated_at or tender.created_at
+    etag = make_etag("tender-products", tender.id, last_modified)
+    not_modified = conditional_response(request, etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    # Получаем все лоты тендера вместе с товарами
+    lots = db.query(TenderLot).options(selectinload(TenderLot.products)).filter(
+        TenderLot.tender_id == tender_id
+    ).all()
     
     # Собираем все товары из всех лотов
     products = []
     for lot in lots:
-        lot_products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
-        for product in lot_products:
+        for product in lot.products:
             products.append({
                 "id": product.id,
                 "lot_id": product.lot_id,
@@ -238,13 +346,13 @@ async def get_tender_products(
                 "unit_of_measure": product.unit_of_measure,
             })
     
-    return products
+    return FastJSONResponse(products, headers=cache_headers(request, etag, last_modified))
 
 
 @router.post("/{tender_id}/proposals")
 async def create_tender_proposal(
     tender_id: int,
-    proposal_data: dict,
+    proposal_data: TenderProposalCreate,
     current_user: UserModel = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -257,155 +365,11 @@ async def create_tender_proposal(
             detail="Только поставщики могут подавать заявки на тендеры"
         )
     
-    # Проверяем, что тендер существует и опубликован
-    tender = db.query(Tender).filter(Tender.id == tender_id).first()
-    if not tender:
-        raise HTTPException(
-            status_code=404,
-            detail="Тендер не найден"
-        )
-    
-    if tender.status != TenderStatus.PUBLISHED:
-        raise HTTPException(
-            status_code=400,
-            detail="Нельзя подавать предложения на неопубликованные тендеры"
-        )
-    
-    # Импортируем необходимые модели
-    from models import SupplierProposal, ProposalItem
-    
-    # Проверяем, что у поставщика еще нет предложения на этот тендер
-    existing_proposal = db.query(SupplierProposal).filter(
-        and_(
-            SupplierProposal.tender_id == tender_id,
-            SupplierProposal.supplier_id == current_user.id
-        )
-    ).first()
-    
-    if existing_proposal:
-        raise HTTPException(
-            status_code=400,
-            detail="У вас уже есть предложение по этому тендеру"
-        )
-    
-    # Создаем предложение
-    proposal = SupplierProposal(
-        tender_id=tender_id,
-        supplier_id=current_user.id,
-        prepayment_percent=proposal_data.get('prepayment_percent', 0),
-        currency=proposal_data.get('currency', 'RUB'),
-        vat_percent=proposal_data.get('vat_percent', 20),
-        general_comment=proposal_data.get('general_comment', ''),
-        status='draft'
-    )
-    
-    db.add(proposal)
-    db.flush()  # Получаем ID предложения
-    
-    # Создаем элементы предложения
-    for item_data in proposal_data.get('proposal_items', []):
-        proposal_item = ProposalItem(
-            proposal_id=proposal.id,
-            product_id=item_data['product_id'],
-            is_available=item_data.get('is_available', True),
-            is_analog=item_data.get('is_analog', False),
-            price_per_unit=item_data.get('price_per_unit'),
-            delivery_days=item_data.get('delivery_days'),
-            comment=item_data.get('comment', '')
-        )
-        db.add(proposal_item)
-    
-    db.commit()
-    db.refresh(proposal)
+    proposal = create_proposal(db, tender_id, current_user.id, proposal_data)
     
     return {"id": proposal.id, "status": "created"}
 
 
-@router.get("/proposals")
-async def get_proposals(
-    current_user: UserModel = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-):
-    """Получение предложений в зависимости от роли пользователя"""
-    
-    # Импортируем необходимые модели
-    from models import SupplierProposal, ProposalItem, Tender
-    
-    # Определяем какие предложения показывать в зависимости от роли
-    if current_user.role == UserRole.SUPPLIER:
-        # Поставщики видят только свои предложения
-        proposals = db.query(SupplierProposal).filter(
-            SupplierProposal.supplier_id == current_user.id
-        ).all()
-    elif current_user.role in [UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER]:
-        # Админы, контрактные управляющие и менеджеры видят все предложения
-        proposals = db.query(SupplierProposal).all()
-    else:
-        raise HTTPException(
-            status_code=403,
-            detail="У вас нет прав для просмотра предложений"
-        )
-    
-    # Загружаем связанные данные
-    result = []
-    for proposal in proposals:
-        # Получаем информацию о тендере
-        tender = db.query(Tender).filter(Tender.id == proposal.tender_id).first()
-        
-        # Получаем информацию о поставщике
-        supplier = db.query(UserModel).filter(UserModel.id == proposal.supplier_id).first()
-        
-        proposal_data = {
-            "id": proposal.id,
-            "tender_id": proposal.tender_id,
-            "supplier_id": proposal.supplier_id,
-            "prepayment_percent": proposal.prepayment_percent,
-            "currency": proposal.currency,
-            "vat_percent": proposal.vat_percent,
-            "general_comment": proposal.general_comment,
-            "status": proposal.status,
-            "created_at": proposal.created_at.isoformat() if proposal.created_at else None,
-            "updated_at": proposal.updated_at.isoformat() if proposal.updated_at else None,
-            "proposal_items": [],
-            # Дополнительная информация для админов/менеджеров
-            "tender_info": {
-                "title": tender.title if tender else "Тендер не найден",
-                "status": tender.status if tender else "unknown",
-                "initial_price": float(tender.initial_price) if tender and tender.initial_price else None,
-                "currency": tender.currency if tender else None,
-                "deadline": tender.deadline.isoformat() if tender and tender.deadline else None,
-            } if current_user.role in [UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER] else None,
-            "supplier_info": {
-                "full_name": supplier.full_name if supplier else "Поставщик не найден",
-                "email": supplier.email if supplier else None,
-                "phone": supplier.phone if supplier else None,
-            } if current_user.role in [UserRole.ADMIN, UserRole.CONTRACT_MANAGER, UserRole.MANAGER] else None,
-        }
-        
-        # Загружаем элементы предложения
-        items = db.query(ProposalItem).filter(
-            ProposalItem.proposal_id == proposal.id
-        ).all()
-        
-        for item in items:
-            proposal_data["proposal_items"].append({
-                "id": item.id,
-                "proposal_id": item.proposal_id,
-                "product_id": item.product_id,
-                "is_available": item.is_available,
-                "is_analog": item.is_analog,
-                "price_per_unit": float(item.price_per_unit) if item.price_per_unit else None,
-                "delivery_days": item.delivery_days,
-                "comment": item.comment,
-                "created_at": item.created_at.isoformat() if item.created_at else None,
-                "updated_at": item.updated_at.isoformat() if item.updated_at else None,
-            })
-        
-        result.append(proposal_data)
-    
-    return result
-
-
 @router.get("/{tender_id}/proposals")
 async def get_tender_proposals(
     tender_id: int,
@@ -426,19 +390,18 @@ async def get_tender_proposals(
     if not tender:
         raise HTTPException(status_code=404, detail="Тендер не найден")
     
-    # Импортируем необходимые модели
-    from models import SupplierProposal, ProposalItem, UserModel
-    
-    # Получаем все предложения по тендеру
-    proposals = db.query(SupplierProposal).filter(
+    # Получаем все предложения по тендеру вместе с поставщиками и позициями
+    proposals = db.query(SupplierProposal).options(
+        joinedload(SupplierProposal.supplier),
+        selectinload(SupplierProposal.proposal_items)
+    ).filter(
         SupplierProposal.tender_id == tender_id
     ).all()
     
     # Загружаем связанные данные
     result = []
     for proposal in proposals:
-        # Получаем информацию о поставщике
-        supplier = db.query(UserModel).filter(UserModel.id == proposal.supplier_id).first()
+        supplier = proposal.supplier
         
         proposal_data = {
             "id": proposal.id,
@@ -456,28 +419,9 @@ async def get_tender_proposals(
                 "email": supplier.email if supplier else None,
                 "phone": supplier.phone if supplier else None,
             },
-            "proposal_items": []
+            "proposal_items": [proposal_item_dict(item) for item in proposal.proposal_items]
         }
         
-        # Загружаем элементы предложения
-        items = db.query(ProposalItem).filter(
-            ProposalItem.proposal_id == proposal.id
-        ).all()
-        
-        for item in items:
-            proposal_data["proposal_items"].append({
-                "id": item.id,
-                "proposal_id": item.proposal_id,
-                "product_id": item.product_id,
-                "is_available": item.is_available,
-                "is_analog": item.is_analog,
-                "price_per_unit": float(item.price_per_unit) if item.price_per_unit else None,
-                "delivery_days": item.delivery_days,
-                "comment": item.comment,
-                "created_at": item.created_at.isoformat() if item.created_at else None,
-                "updated_at": item.updated_at.isoformat() if item.updated_at else None,
-            })
-        
         result.append(proposal_data)
     
     return result
@@ -485,6 +429,7 @@ async def get_tender_proposals(
 
 @router.post("/", response_model=TenderSchema)
 async def create_tender(
+    request: Request,
     tender_data: TenderCreate,
     current_user: UserModel = Depends(require_any_role([UserRole.ADMIN, UserRole.CONTRACT_MANAGER])),
     db: Session = Depends(get_db)
@@ -509,89 +454,34 @@ async def create_tender(
             detail="Необходимо загрузить хотя бы один документ"
         )
     
-    # Создаем тендер
-    db_tender = Tender(
-        title=tender_data.title,
-        description=tender_data.description,
-        initial_price=tender_data.initial_price,
-        currency=tender_data.currency,
-        deadline=tender_data.deadline,
-        okpd_code=tender_data.okpd_code,
-        region=tender_data.region,
-        created_by=current_user.id,
-        publication_date=datetime.utcnow(),
-        status=TenderStatus.PUBLISHED # По умолчанию публикуем сразу
+    # Создаем тендер со всеми дочерними записями в одной транзакции
+    tender_id = create_tender_graph(
+        db,
+        {
+            "title": tender_data.title,
+            "description": tender_data.description,
+            "initial_price": tender_data.initial_price,
+            "currency": tender_data.currency,
+            "deadline": tender_data.deadline,
+            "okpd_code": tender_data.okpd_code,
+            "region": tender_data.region,
+            "created_by": current_user.id,
+            "publication_date": datetime.utcnow(),
+            "status": TenderStatus.PUBLISHED  # По умолчанию публикуем сразу
+        },
+        lots=tender_data.lots,
+        organizers=tender_data.organizers,
+        documents=tender_data.documents
     )
-    db.add(db_tender)
+    snapshot = build_tender_snapshot(db, tender_id)
     db.commit()
-    db.refresh(db_tender)
-    
-    # Создаем организаторов
-    for organizer_data in tender_data.organizers:
-        db_organizer = TenderOrganizer(
-            tender_id=db_tender.id,
-            organization_name=organizer_data.organization_name,
-            legal_address=organizer_data.legal_address,
-            postal_address=organizer_data.postal_address,
-            email=organizer_data.email,
-            phone=organizer_data.phone,
-            contact_person=organizer_data.contact_person,
-            inn=organizer_data.inn,
-            kpp=organizer_data.kpp,
-            ogrn=organizer_data.ogrn
-        )
-        db.add(db_organizer)
-    
-    # Создаем лоты
-    for lot_data in tender_data.lots:
-        db_lot = TenderLot(
-            tender_id=db_tender.id,
-            lot_number=lot_data.lot_number,
-            title=lot_data.title,
-            description=lot_data.description,
-            initial_price=lot_data.initial_price,
-            currency=lot_data.currency,
-            security_amount=lot_data.security_amount,
-            delivery_place=lot_data.delivery_place,
-            payment_terms=lot_data.payment_terms,
-            quantity=lot_data.quantity,
-            unit_of_measure=lot_data.unit_of_measure,
-            okpd_code=lot_data.okpd_code,
-            okved_code=lot_data.okved_code
-        )
-        db.add(db_lot)
-        db.flush()  # Получаем ID лота
-        
-        # Создаем товары для лота, если они есть
-        if hasattr(lot_data, 'products') and lot_data.products:
-            for product_data in lot_data.products:
-                db_product = TenderProduct(
-                    lot_id=db_lot.id,
-                    position_number=product_data.position_number,
-                    name=product_data.name,
-                    quantity=product_data.quantity,
-                    unit_of_measure=product_data.unit_of_measure
-                )
-                db.add(db_product)
-    
-    # Создаем документы
-    for document_data in tender_data.documents:
-        db_document = TenderDocument(
-            tender_id=db_tender.id,
-            title=document_data.title,
-            file_path=document_data.file_path,
-            file_size=document_data.file_size,
-            file_type=document_data.file_type
-        )
-        db.add(db_document)
     
-    db.commit()
-    db.refresh(db_tender)
-    return db_tender
+    return snapshot_response(request, snapshot)
 
 
 @router.put("/{tender_id}", response_model=TenderSchema)
 async def update_tender(
+    request: Request,
     tender_id: int,
     tender_data: TenderUpdate,
     current_user: UserModel = Depends(require_any_role([UserRole.ADMIN, UserRole.CONTRACT_MANAGER])),
@@ -632,93 +522,23 @@ async def update_tender(
         )
     
     # Обновляем основные поля тендера
-    update_data = tender_data.dict(exclude_unset=True, exclude={'organizers', 'lots', 'documents'})
+    update_data = tender_data.model_dump(exclude_unset=True, exclude={'organizers', 'lots', 'documents'})
     for field, value in update_data.items():
         setattr(tender, field, value)
     
-    # Обновляем организаторов
-    db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender_id).delete()
-    for organizer_data in tender_data.organizers:
-        db_organizer = TenderOrganizer(
-            tender_id=tender.id,
-            organization_name=organizer_data.organization_name,
-            legal_address=organizer_data.legal_address,
-            postal_address=organizer_data.postal_address,
-            email=organizer_data.email,
-            phone=organizer_data.phone,
-            contact_person=organizer_data.contact_person,
-            inn=organizer_data.inn,
-            kpp=organizer_data.kpp,
-            ogrn=organizer_data.ogrn
-        )
-        db.add(db_organizer)
-    
-    # Обновляем лоты
-    # Сначала удаляем все товары для каждого лота
-    old_lots = db.query(TenderLot).filter(TenderLot.tender_id == tender_id).all()
-    for lot in old_lots:
-        db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).delete()
-    # Затем удаляем сами лоты
-    db.query(TenderLot).filter(TenderLot.tender_id == tender_id).delete()
-    
-    # Создаем новые лоты и товары
-    for lot_data in tender_data.lots:
-        db_lot = TenderLot(
-            tender_id=tender.id,
-            lot_number=lot_data.lot_number,
-            title=lot_data.title,
-            description=lot_data.description,
-            initial_price=lot_data.initial_price,
-            currency=lot_data.currency,
-            security_amount=lot_data.security_amount,
-            delivery_place=lot_data.delivery_place,
-            payment_terms=lot_data.payment_terms,
-            quantity=lot_data.quantity,
-            unit_of_measure=lot_data.unit_of_measure,
-            okpd_code=lot_data.okpd_code,
-            okved_code=lot_data.okved_code
-        )
-        db.add(db_lot)
-        db.flush()  # Получаем ID лота
-        
-        # Создаем товары для лота
-        if hasattr(lot_data, 'products') and lot_data.products:
-            for product_data in lot_data.products:
-                db_product = TenderProduct(
-                    lot_id=db_lot.id,
-                    position_number=product_data.position_number,
-                    name=product_data.name,
-                    quantity=product_data.quantity,
-                    unit_of_measure=product_data.unit_of_measure
-                )
-                db.add(db_product)
-    
-    # Обновляем документы
-    db.query(TenderDocument).filter(TenderDocument.tender_id == tender_id).delete()
-    for document_data in tender_data.documents:
-        db_document = TenderDocument(
-            tender_id=tender.id,
-            title=document_data.title,
-            file_path=document_data.file_path,
-            file_size=document_data.file_size,
-            file_type=document_data.file_type
-        )
-        db.add(db_document)
+    # Обновляем дочерние записи: изменяется только разница
+    update_tender_graph(
+        db, tender,
+        lots=tender_data.lots,
+        organizers=tender_data.organizers,
+        documents=tender_data.documents
+    )
     
     tender.updated_at = datetime.utcnow()
+    snapshot = build_tender_snapshot(db, tender.id)
     db.commit()
-    db.refresh(tender)
-    
-    # Загружаем связанные данные для ответа
-    tender.lots = db.query(TenderLot).filter(TenderLot.tender_id == tender.id).all()
-    tender.documents = db.query(TenderDocument).filter(TenderDocument.tender_id == tender.id).all()
-    tender.organizers = db.query(TenderOrganizer).filter(TenderOrganizer.tender_id == tender.id).all()
-    
-    # Загружаем товары для каждого лота
-    for lot in tender.lots:
-        lot.products = db.query(TenderProduct).filter(TenderProduct.lot_id == lot.id).all()
     
-    return tender
+    return snapshot_response(request, snapshot)
 
 
 @router.post("/{tender_id}/publish")
@@ -743,6 +563,7 @@ async def publish_tender(
     
     tender.status = TenderStatus.PUBLISHED
     tender.publication_date = datetime.utcnow()
+    build_tender_snapshot(db, tender.id)
     
     db.commit()
     return {"message": "Тендер успешно опубликован"}
@@ -0,0 +1,441 @@
+"""
+Генератор синтетических данных для нагрузочного тестирования.
+
+Создает поставщиков с профилями и тендеры с организаторами, документами,
+лотами, товарами и предложениями поставщиков с позициями. Распределения
+приближены к рабочим: регионы с перевесом Якутии, коды ОКПД2 и товары
+бурового снабжения, цены по логнормальному закону вокруг цены товара,
+статусы по срокам подачи заявок. Названия товаров повторяются между
+тендерами, поэтому аналитика цен по товарам работает на полном объеме.
+
+Строки пишутся пакетами по --batch тендеров: в PostgreSQL через COPY, в
+остальных базах многострочными INSERT. Идентификаторы назначаются
+генератором начиная с max(id) + 1, поэтому запускать его нужно на базе
+без параллельной записи. Счетчики тендеров и лотов заполняются сразу,
+после загрузки обновляются последовательности, статистика планировщика и
+материализованные представления аналитики.
+
+Запуск из каталога backend (около миллиона строк):
+    python3 benchmarks/generate_dataset.py --tenders 20000 --suppliers 2000
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select, text  # noqa: E402
+
+from analytics_views import refresh_analytics_views  # noqa: E402
+from auth import get_password_hash  # noqa: E402
+from database import engine  # noqa: E402
+from models import (  # noqa: E402
+    LegalForm, ProposalItem, SupplierProfile, SupplierProposal, Tender, TenderDocument,
+    TenderLot, TenderOrganizer, TenderProduct, TenderStatus, User, UserRole, normalize_product_key
+)
+
+REGIONS = [
+    ("Республика Саха (Якутия)", 35),
+    ("Красноярский край", 12),
+    ("Иркутская область", 10),
+    ("Москва", 8),
+    ("Магаданская область", 7),
+    ("Амурская область", 6),
+    ("Свердловская область", 6),
+    ("Забайкальский край", 5),
+    ("Мурманская область", 5),
+    ("Чукотский автономный округ", 4),
+    ("Архангельская область", 2),
+]
+
+# ОКПД2, ОКВЭД2, предмет закупки (родительный падеж), товары: название, единица, диапазон цены
+CATALOG = [
+    ("28.92.12.000", "28.92", "буровых установок и комплектующих", [
+        ("Буровая установка колонковая", "шт", 4_000_000, 25_000_000),
+        ("Буровой насос НБ-32", "шт", 350_000, 900_000),
+        ("Вращатель шпиндельный", "шт", 600_000, 1_500_000),
+        ("Лебедка буровая", "шт", 250_000, 700_000),
+        ("Мачта буровой установки", "шт", 900_000, 2_500_000),
+    ]),
+    ("28.92.61.110", "28.92", "бурового инструмента", [
+        ("Коронка алмазная импрегнированная NQ", "шт", 18_000, 45_000),
+        ("Коронка алмазная импрегнированная HQ", "шт", 24_000, 60_000),
+        ("Коронка алмазная импрегнированная PQ", "шт", 35_000, 85_000),
+        ("Расширитель алмазный NQ", "шт", 15_000, 38_000),
+        ("Расширитель алмазный HQ", "шт", 20_000, 50_000),
+        ("Башмак обсадной HW", "шт", 12_000, 30_000),
+        ("Долото шарошечное 76 мм", "шт", 25_000, 70_000),
+        ("Долото PDC 93 мм", "шт", 60_000, 180_000),
+        ("Колонковый набор NQ 3 м", "шт", 120_000, 320_000),
+        ("Керноприемник съемный HQ", "шт", 90_000, 240_000),
+    ]),
+    ("24.20.13.110", "24.20", "бурильных и обсадных труб", [
+        ("Труба бурильная NRQ 3 м", "шт", 9_000, 22_000),
+        ("Труба бурильная HRQ 3 м", "шт", 12_000, 28_000),
+        ("Труба обсадная NW 3 м", "шт", 10_000, 26_000),
+        ("Труба обсадная HW 3 м", "шт", 14_000, 34_000),
+        ("Переходник бурильный", "шт", 3_000, 9_000),
+    ]),
+    ("20.59.59.000", "20.59", "реагентов для буровых растворов", [
+        ("Бентонит модифицированный", "кг", 40, 120),
+        ("Полимер для буровых растворов", "кг", 350, 900),
+        ("Смазочная добавка для бурения", "л", 250, 600),
+        ("Ингибитор глин", "кг", 300, 750),
+        ("Пеногаситель", "л", 200, 500),
+    ]),
+    ("19.20.21.315", "19.20", "горюче-смазочных материалов", [
+        ("Топливо дизельное ДТ-З-К5", "л", 58, 82),
+        ("Масло моторное М-10ДМ", "л", 160, 320),
+        ("Масло гидравлическое ВМГЗ", "л", 150, 290),
+        ("Смазка резьбовая", "кг", 500, 1_400),
+    ]),
+    ("32.99.11.160", "32.99", "средств индивидуальной защиты", [
+        ("Каска защитная", "шт", 350, 1_200),
+        ("Перчатки защитные утепленные", "пар", 120, 450),
+        ("Костюм утепленный", "шт", 4_500, 12_000),
+        ("Очки защитные", "шт", 150, 700),
+        ("Сапоги утепленные", "пар", 2_500, 7_500),
+    ]),
+    ("29.10.41.110", "29.10", "спецтехники", [
+        ("Вездеход гусеничный", "шт", 9_000_000, 22_000_000),
+        ("Автомобиль вахтовый", "шт", 5_000_000, 9_500_000),
+        ("Топливозаправщик", "шт", 6_000_000, 11_000_000),
+    ]),
+]
+
+SITES = [
+    "Верхне-Мунское", "Накынское", "Удачнинское", "Мирнинское", "Айхальское", "Анабарское",
+    "Нюрбинское", "Ботуобинское", "Верхнеякутское", "Куранахское", "Ломоносовское", "Эбеляхское",
+]
+PURPOSES = [
+    "геологоразведочных работ на участке «{site}»",
+    "разведочного бурения на месторождении «{site}»",
+    "эксплуатационной разведки месторождения «{site}»",
+    "полевого сезона на участке «{site}»",
+]
+ORGANIZERS = [
+    ("АО «Алмазгеобур»", "1433012345"),
+    ("ООО «Якутская геологоразведочная экспедиция»", "1435098765"),
+    ("АО «Сибирская буровая компания»", "2465043210"),
+    ("ООО «Северо-Восточное геологическое управление»", "4909087654"),
+]
+COMPANY_WORDS = [
+    "Буртех", "Геосервис", "Сибснаб", "Промкомплект", "Техноресурс", "Алмазинструмент",
+    "Северснаб", "Горное оборудование", "Бурснаб", "Якутснаб", "Дальгеотех", "Уралбур",
+]
+LEGAL_FORMS = [
+    (LegalForm.OOO, 70), (LegalForm.IP, 10), (LegalForm.ZAO, 8), (LegalForm.PAO, 4), (LegalForm.OAO, 4),
+    (LegalForm.OTHER, 4),
+]
+LEGAL_FORM_TITLES = {
+    LegalForm.OOO: "ООО", LegalForm.IP: "ИП", LegalForm.ZAO: "ЗАО", LegalForm.PAO: "ПАО",
+    LegalForm.OAO: "ОАО", LegalForm.OTHER: "АО",
+}
+PROPOSAL_STATUSES = [("submitted", 60), ("draft", 15), ("accepted", 10), ("rejected", 15)]
+
+# Порядок столбцов при записи; остальные столбцы получают значения по умолчанию
+COLUMNS = {
+    User: ["id", "email", "hashed_password", "full_name", "phone", "role", "is_active", "created_at"],
+    SupplierProfile: [
+        "id", "user_id", "legal_form", "company_name", "inn", "kpp", "legal_address",
+        "contact_person", "contact_phone", "contact_email", "is_verified", "created_at"
+    ],
+    Tender: [
+        "id", "title", "description", "notice_number", "initial_price", "currency", "status",
+        "publication_date", "deadline", "okpd_code", "okved_code", "region", "procurement_method",
+        "lots_count", "products_count", "documents_count", "proposals_count", "applications_count",
+        "created_by", "created_at"
+    ],
+    TenderOrganizer: ["id", "tender_id", "organization_name", "inn", "email", "contact_person", "created_at"],
+    TenderDocument: ["id", "tender_id", "title", "file_path", "file_size", "file_type", "uploaded_at"],
+    TenderLot: [
+        "id", "tender_id", "lot_number", "title", "initial_price", "currency", "delivery_place",
+        "okpd_code", "okved_code", "products_count", "created_at"
+    ],
+    TenderProduct: [
+        "id", "lot_id", "position_number", "name", "quantity", "unit_of_measure", "normalized_key", "created_at"
+    ],
+    SupplierProposal: [
+        "id", "tender_id", "supplier_id", "prepayment_percent", "currency", "vat_percent",
+        "general_comment", "status", "created_at"
+    ],
+    ProposalItem: [
+        "id", "proposal_id", "product_id", "is_available", "is_analog", "price_per_unit",
+        "delivery_days", "comment", "created_at"
+    ],
+}
+
+
+def weighted(choices):
+    values, weights = zip(*choices)
+    return values, weights
+
+
+class BulkWriter:
+    """Пакетная запись строк: COPY в PostgreSQL, многострочный INSERT в остальных базах"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.copy = connection.dialect.name == "postgresql"
+        self.rows_written = 0
+
+    @staticmethod
+    def copy_value(value):
+        if value is None:
+            return None
+        if isinstance(value, Enum):
+            return value.name  # Enum в базе хранится по имени элемента
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    def write(self, model, rows):
+        if not rows:
+            return
+        columns = COLUMNS[model]
+        if self.copy:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([self.copy_value(value) for value in row])
+            buffer.seek(0)
+            cursor = self.connection.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            self.connection.execute(insert(model), [dict(zip(columns, row)) for row in rows])
+        self.rows_written += len(rows)
+
+
+class IdSequence:
+    """Идентификаторы новых строк таблицы начиная с max(id) + 1"""
+
+    def __init__(self, connection, model):
+        self.next_id = (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def __call__(self) -> int:
+        value = self.next_id
+        self.next_id += 1
+        return value
+
+
+class DatasetGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.now = datetime.now(timezone.utc)
+        self.region_values, self.region_weights = weighted(REGIONS)
+        self.form_values, self.form_weights = weighted(LEGAL_FORMS)
+        self.status_values, self.status_weights = weighted(PROPOSAL_STATUSES)
+        self.password_hash = get_password_hash("supplier123")  # Один хэш на всех: хэширование медленное
+        self.supplier_ids = []
+        self.creator_id = None
+        self.ids = {}
+
+    def around(self, mean: float, minimum: int = 0) -> int:
+        """Целое со средним mean: равномерно от minimum до 2 * mean - minimum"""
+        return self.random.randint(minimum, max(minimum, round(2 * mean) - minimum))
+
+    def next_id(self, model) -> int:
+        return self.ids[model]()
+
+    def prepare(self, connection):
+        self.ids = {model: IdSequence(connection, model) for model in COLUMNS}
+        self.creator_id = connection.execute(
+            select(User.id).where(User.role.in_([UserRole.ADMIN, UserRole.CONTRACT_MANAGER])).order_by(User.id)
+        ).scalar()
+        if self.creator_id is None:
+            self.creator_id = self.next_id(User)
+            BulkWriter(connection).write(User, [(
+                self.creator_id, f"generator{self.creator_id}@load.example.com", self.password_hash,
+                "Контрактный управляющий (генератор)", None, UserRole.CONTRACT_MANAGER, True, self.now
+            )])
+
+    def supplier_rows(self, count: int):
+        users, profiles = [], []
+        for _ in range(count):
+            user_id = self.next_id(User)
+            form = self.random.choices(self.form_values, self.form_weights)[0]
+            name = f"{LEGAL_FORM_TITLES[form]} «{self.random.choice(COMPANY_WORDS)}-{user_id}»"
+            email = f"supplier{user_id}@load.example.com"
+            created_at = self.now - timedelta(days=self.random.randint(30, 1500))
+            phone = f"+7 914 {self.random.randint(100, 999)}-{self.random.randint(10, 99)}-{self.random.randint(10, 99)}"
+            users.append((user_id, email, self.password_hash, name, phone, UserRole.SUPPLIER, True, created_at))
+            profiles.append((
+                self.next_id(SupplierProfile), user_id, form, name, f"{9000000000 + user_id}",
+                None if form == LegalForm.IP else f"{self.random.randint(100000000, 999999999)}",
+                f"{self.random.choices(self.region_values, self.region_weights)[0]}, ул. Промышленная, {self.random.randint(1, 120)}",
+                "Менеджер по продажам", phone, email, self.random.random() < 0.6, created_at
+            ))
+            self.supplier_ids.append(user_id)
+        return {User: users, SupplierProfile: profiles}
+
+    def tender_rows(self, count: int):
+        rows = {model: [] for model in (Tender, TenderOrganizer, TenderDocument, TenderLot, TenderProduct,
+                                         SupplierProposal, ProposalItem)}
+        span_days = self.args.days
+        for _ in range(count):
+            tender_id = self.next_id(Tender)
+            okpd, okved, subject, products = self.random.choice(CATALOG)
+            region = self.random.choices(self.region_values, self.region_weights)[0]
+            site = self.random.choice(SITES)
+            title = f"Поставка {subject} для {self.random.choice(PURPOSES).format(site=site)}"
+
+            # Чем ближе к текущей дате, тем больше тендеров
+            published = self.now - timedelta(days=span_days * (1 - math.sqrt(self.random.random())))
+            deadline = published + timedelta(days=self.random.randint(10, 45))
+            if deadline < self.now:
+                status = self.random.choices(
+                    [TenderStatus.COMPLETED, TenderStatus.IN_PROGRESS, TenderStatus.CANCELLED], [70, 20, 10]
+                )[0]
+            else:
+                status = self.random.choices([TenderStatus.PUBLISHED, TenderStatus.DRAFT], [85, 15])[0]
+            draft = status == TenderStatus.DRAFT
+
+            # Лоты и товары: цена товара в тендере - база для цен предложений
+            tender_products = []
+            tender_price = 0
+            lots_count = self.around(self.args.lots, 1)
+            for lot_number in range(1, lots_count + 1):
+                lot_id = self.next_id(TenderLot)
+                lot_price = 0
+                products_count = self.around(self.args.products, 1)
+                for position in range(1, products_count + 1):
+                    name, unit, low, high = self.random.choice(products)
+                    quantity = self.random.randint(1, 20) if high > 100_000 else self.random.randint(10, 2000)
+                    price = math.exp(self.random.uniform(math.log(low), math.log(high)))
+                    product_id = self.next_id(TenderProduct)
+                    rows[TenderProduct].append((
+                        product_id, lot_id, position, name, str(quantity), unit,
+                        normalize_product_key(name, unit), published
+                    ))
+                    tender_products.append((product_id, price))
+                    lot_price += price * quantity
+                rows[TenderLot].append((
+                    lot_id, tender_id, lot_number, f"Лот {lot_number}: {subject}", Decimal(round(lot_price, 2)),
+                    "RUB", f"{region}, {site}", okpd, okved, products_count, published
+                ))
+                tender_price += lot_price
+
+            # Предложения: поставщики без повторов, позиции - доля товаров тендера
+            proposals_count = 0
+            if not draft and self.supplier_ids:
+                proposals_count = min(self.around(self.args.proposals), len(self.supplier_ids))
+            for supplier_id in self.random.sample(self.supplier_ids, proposals_count):
+                proposal_id = self.next_id(SupplierProposal)
+                submitted = published + (deadline - published) * self.random.random()
+                rows[SupplierProposal].append((
+                    proposal_id, tender_id, supplier_id, Decimal(self.random.choice([0, 0, 0, 30, 50, 100])),
+                    "RUB", Decimal(20), None, self.random.choices(self.status_values, self.status_weights)[0],
+                    submitted
+                ))
+                offered = [product for product in tender_products if self.random.random() < self.args.items]
+                for product_id, price in offered or tender_products[:1]:
+                    rows[ProposalItem].append((
+                        self.next_id(ProposalItem), proposal_id, product_id, True, self.random.random() < 0.2,
+                        Decimal(round(price * self.random.lognormvariate(0, 0.15), 2)),
+                        self.random.randint(5, 90), None, submitted
+                    ))
+
+            organizer, inn = self.random.choice(ORGANIZERS)
+            rows[TenderOrganizer].append((
+                self.next_id(TenderOrganizer), tender_id, organizer, inn, "zakupki@example.com",
+                "Отдел закупок", published
+            ))
+            documents_count = self.random.randint(1, 3)
+            for number in range(1, documents_count + 1):
+                rows[TenderDocument].append((
+                    self.next_id(TenderDocument), tender_id, f"Документация, часть {number}",
+                    f"/uploads/generated/{tender_id}-{number}.pdf", self.random.randint(50_000, 5_000_000),
+                    "application/pdf", published
+                ))
+
+            rows[Tender].append((
+                tender_id, title,
+                f"{title.capitalize()}. Регион поставки: {region}. Поставка партиями по заявкам заказчика, "
+                f"приемка по количеству и качеству на складе получателя.",
+                f"GEN-{tender_id:08d}", Decimal(round(tender_price, 2)), "RUB", status,
+                None if draft else published, deadline, okpd, okved, region,
+                self.random.choices(["auction", "tender", "quotation"], [50, 30, 20])[0],
+                lots_count, len(tender_products), documents_count, proposals_count, 0,
+                self.creator_id, published - timedelta(days=self.random.randint(0, 5))
+            ))
+        return rows
+
+    def run(self):
+        args = self.args
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            self.prepare(connection)
+            self.supplier_ids = list(connection.execute(
+                select(User.id).where(User.role == UserRole.SUPPLIER)
+            ).scalars())
+            writer = BulkWriter(connection)
+            for model, rows in self.supplier_rows(args.suppliers).items():
+                writer.write(model, rows)
+        print(f"Поставщики: {args.suppliers} ({len(self.supplier_ids)} всего)")
+
+        total_rows = writer.rows_written
+        for batch_start in range(0, args.tenders, args.batch):
+            count = min(args.batch, args.tenders - batch_start)
+            with engine.begin() as connection:
+                writer = BulkWriter(connection)
+                for model, rows in self.tender_rows(count).items():
+                    writer.write(model, rows)
+            total_rows += writer.rows_written
+            elapsed = time.perf_counter() - started
+            print(f"Тендеры: {batch_start + count}/{args.tenders}, строк: {total_rows} "
+                  f"({total_rows / elapsed:.0f} строк/с)")
+
+        self.finish()
+        print(f"Готово: {total_rows} строк за {time.perf_counter() - started:.1f} с")
+
+    def finish(self):
+        """Последовательности id, статистика планировщика и представления аналитики"""
+        if engine.dialect.name != "postgresql":
+            return
+        with engine.begin() as connection:
+            for model in COLUMNS:
+                table = model.__tablename__
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                ))
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            for model in COLUMNS:
+                connection.execute(text(f"ANALYZE {model.__tablename__}"))
+        if refresh_analytics_views(concurrently=False):
+            print("✓ Представления аналитики обновлены")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Синтетические данные для нагрузочного тестирования")
+    parser.add_argument("--tenders", type=int, default=1000, help="число тендеров")
+    parser.add_argument("--lots", type=float, default=3, help="лотов в тендере (в среднем)")
+    parser.add_argument("--products", type=float, default=5, help="товаров в лоте (в среднем)")
+    parser.add_argument("--suppliers", type=int, default=200, help="число новых поставщиков")
+    parser.add_argument("--proposals", type=float, default=5, help="предложений на тендер (в среднем)")
+    parser.add_argument("--items", type=float, default=0.8, help="доля товаров тендера в предложении")
+    parser.add_argument("--days", type=int, default=730, help="период публикации тендеров, дней до текущей даты")
+    parser.add_argument("--batch", type=int, default=500, help="тендеров в пакете записи")
+    parser.add_argument("--seed", type=int, default=1, help="начальное значение генератора случайных чисел")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    DatasetGenerator(parse_args()).run()
@@ -0,0 +1,433 @@
+"""
+Нагрузочный тест API: задержки p50/p95/p99 и RPS по эндпоинтам.
+
+Виртуальные пользователи параллельно и без пауз выполняют сценарии:
+- browse - анонимный просмотр списка тендеров с фильтрами, поиском,
+  сортировкой и переходом в карточку тендера;
+- supplier - поставщик открывает ленту тендеров, товары крупного тендера
+  и сохраняет цены в черновик своего предложения;
+- manager - менеджер смотрит дашборд и аналитику и выгружает тендер.
+
+Идентификаторы тендеров, черновиков, регионов и слов для поиска берутся из
+базы DATABASE_URL, поэтому ее нужно заполнить заранее
+(benchmarks/generate_dataset.py). Без --url приложение main:app вызывается
+в том же процессе через ASGI; с --url запросы идут на запущенный сервер
+(gunicorn), у которого должны быть та же база и тот же SECRET_KEY.
+
+Результаты можно сохранить в JSON (--save) и сравнить с ним следующий запуск
+(--baseline): так изменения производительности показываются до и после.
+Задержки в процессе включают работу генератора нагрузки; абсолютные значения
+сравнимы только между запусками на одной машине, базе и наборе данных.
+
+Запуск из каталога backend:
+    python3 benchmarks/load_test.py --users 20 --duration 60 --save benchmarks/baselines/load_test.json
+    python3 benchmarks/load_test.py --users 20 --duration 60 --baseline benchmarks/baselines/load_test.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+
+from auth import create_access_token  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+from models import (  # noqa: E402
+    SupplierProposal, Tender, TenderLot, TenderProduct, TenderStatus, User, UserRole
+)
+
+SCENARIO_WEIGHTS = {"browse": 6, "supplier": 3, "manager": 1}
+SORTS = ["by_published_desc", "by_deadline_asc", "by_price_desc", "by_price_asc"]
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class Fixtures:
+    """Данные базы, по которым строятся запросы сценариев"""
+    tender_ids: List[int]
+    large_tender_ids: List[int]
+    regions: List[str]
+    search_terms: List[str]
+    drafts: List[tuple]  # (id предложения, email поставщика, id тендера)
+    supplier_emails: List[str]
+    manager_email: Optional[str]
+    product_keys: List[str]
+    postgresql: bool
+    dataset: dict = field(default_factory=dict)
+
+
+def load_fixtures(sample: int = 200) -> Fixtures:
+    db = SessionLocal()
+    try:
+        tender_ids = [row[0] for row in db.query(Tender.id).order_by(func.random()).limit(sample)]
+        large_tender_ids = [
+            row[0] for row in db.query(Tender.id)
+            .filter(Tender.status == TenderStatus.PUBLISHED)
+            .order_by(Tender.products_count.desc()).limit(20)
+        ]
+        regions = [
+            row[0] for row in db.query(Tender.region).filter(Tender.region.isnot(None)).distinct().limit(20)
+        ]
+        # Первые слова названий товаров - то, что ищут пользователи
+        names = [row[0] for row in db.query(TenderProduct.name).order_by(func.random()).limit(sample)]
+        search_terms = sorted({name.split()[0].lower() for name in names if name and len(name.split()[0]) > 3})
+        drafts = [
+            (proposal_id, email, tender_id)
+            for proposal_id, email, tender_id in db.query(SupplierProposal.id, User.email, Tender.id)
+            .join(User, User.id == SupplierProposal.supplier_id)
+            .join(Tender, Tender.id == SupplierProposal.tender_id)
+            .filter(SupplierProposal.status == "draft")
+            .order_by(Tender.products_count.desc()).limit(50)
+        ]
+        supplier_emails = [
+            row[0] for row in db.query(User.email)
+            .filter(User.role == UserRole.SUPPLIER, User.is_active.is_(True)).limit(50)
+        ]
+        manager = db.query(User.email).filter(
+            User.role.in_([UserRole.CONTRACT_MANAGER, UserRole.ADMIN]), User.is_active.is_(True)
+        ).order_by(User.role.desc(), User.id).first()
+        product_keys = [
+            row[0] for row in db.query(TenderProduct.normalized_key)
+            .filter(TenderProduct.normalized_key.isnot(None))
+            .group_by(TenderProduct.normalized_key)
+            .order_by(func.count().desc()).limit(20)
+        ]
+        dataset = {
+            "tenders": db.query(func.count(Tender.id)).scalar(),
+            "lots": db.query(func.count(TenderLot.id)).scalar(),
+            "products": db.query(func.count(TenderProduct.id)).scalar(),
+            "proposals": db.query(func.count(SupplierProposal.id)).scalar(),
+        }
+    finally:
+        db.close()
+
+    if not tender_ids:
+        raise SystemExit("В базе нет тендеров: сначала запустите benchmarks/generate_dataset.py")
+    return Fixtures(
+        tender_ids=tender_ids,
+        large_tender_ids=large_tender_ids or tender_ids[:20],
+        regions=regions,
+        search_terms=search_terms,
+        drafts=drafts,
+        supplier_emails=supplier_emails,
+        manager_email=manager[0] if manager else None,
+        product_keys=product_keys,
+        postgresql=engine.dialect.name == "postgresql",
+        dataset=dataset,
+    )
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Процентиль по ближайшему рангу; values отсортированы"""
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+class Recorder:
+    """Задержки и ошибки по эндпоинтам; до окончания разогрева ничего не пишется"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.recording = False
+        self.started = 0.0
+        self.stopped = 0.0
+
+    def start(self):
+        self.recording = True
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.recording = False
+        self.stopped = time.perf_counter()
+
+    def add(self, name: str, duration: float, ok: bool):
+        if not self.recording:
+            return
+        if ok:
+            self.latencies[name].append(duration)
+        else:
+            self.errors[name] += 1
+
+    def summary(self) -> dict:
+        elapsed = max(self.stopped - self.started, 1e-9)
+        endpoints = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            endpoints[name] = endpoint_summary(self.latencies[name], self.errors[name], elapsed)
+        everything = [value for values in self.latencies.values() for value in values]
+        total = endpoint_summary(everything, sum(self.errors.values()), elapsed)
+        return {"duration_s": round(elapsed, 1), "total": total, "endpoints": endpoints}
+
+
+def endpoint_summary(latencies: List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    result = {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 1),
+        "mean_ms": round(sum(values) / len(values) * 1000, 1) if values else 0.0,
+    }
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(percentile(values, p) * 1000, 1)
+    return result
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, fixtures: Fixtures, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.fixtures = fixtures
+        self.random = rng
+
+    async def request(self, name: str, method: str, url: str, email: Optional[str] = None, **kwargs):
+        """Запрос с учетом времени до получения всего тела; name - шаблон пути для отчета"""
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': email})}"} if email else {}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.add(f"{method} {name}", time.perf_counter() - start, ok)
+        return response if ok else None
+
+    async def browse(self):
+        params = {"page": self.random.randint(1, 5), "sort": self.random.choice(SORTS)}
+        roll = self.random.random()
+        if roll < 0.3 and self.fixtures.search_terms:
+            params["search"] = self.random.choice(self.fixtures.search_terms)
+        elif roll < 0.5 and self.fixtures.regions:
+            params["region"] = self.random.choice(self.fixtures.regions)
+        elif roll < 0.6:
+            params["status"] = TenderStatus.PUBLISHED.value
+        response = await self.request("/api/v1/tenders/", "GET", "/api/v1/tenders/", params=params)
+
+        items = response.json().get("items") if response is not None else None
+        tender_id = self.random.choice(items)["id"] if items else self.random.choice(self.fixtures.tender_ids)
+        await self.request("/api/v1/tenders/{tender_id}", "GET", f"/api/v1/tenders/{tender_id}")
+        if self.random.random() < 0.5:
+            await self.request(
+                "/api/v1/tenders/{tender_id}/products", "GET", f"/api/v1/tenders/{tender_id}/products"
+            )
+
+    async def supplier(self):
+        if not self.fixtures.drafts:
+            email = self.random.choice(self.fixtures.supplier_emails)
+            await self.request("/api/v1/suppliers/tenders", "GET", "/api/v1/suppliers/tenders", email)
+            return
+        proposal_id, email, tender_id = self.random.choice(self.fixtures.drafts)
+        await self.request(
+            "/api/v1/suppliers/tenders", "GET", "/api/v1/suppliers/tenders", email,
+            params={"page": self.random.randint(1, 3)}
+        )
+        await self.request("/api/v1/suppliers/proposals", "GET", "/api/v1/suppliers/proposals", email)
+        await self.request("/api/v1/tenders/{tender_id}", "GET", f"/api/v1/tenders/{tender_id}")
+        response = await self.request(
+            "/api/v1/tenders/{tender_id}/products", "GET", f"/api/v1/tenders/{tender_id}/products"
+        )
+        if response is None:
+            return
+        items = [
+            {
+                "product_id": product["id"],
+                "price_per_unit": str(self.random.randint(1000, 500000)),
+                "delivery_days": self.random.choice([7, 14, 30, 45]),
+            }
+            for product in response.json()
+        ]
+        await self.request(
+            "/api/v1/suppliers/proposals/{proposal_id}/items", "PATCH",
+            f"/api/v1/suppliers/proposals/{proposal_id}/items", email,
+            json={"items": items, "removed_product_ids": []}
+        )
+
+    async def manager(self):
+        email = self.fixtures.manager_email
+        tender_id = self.random.choice(self.fixtures.large_tender_ids)
+        await self.request("/api/v1/dashboard/stats", "GET", "/api/v1/dashboard/stats", email)
+        await self.request("/api/v1/analytics/tenders/summary", "GET", "/api/v1/analytics/tenders/summary", email)
+        await self.request(
+            "/api/v1/analytics/tenders/{tender_id}/proposals", "GET",
+            f"/api/v1/analytics/tenders/{tender_id}/proposals", email
+        )
+        # Аналитика цен использует функции PostgreSQL
+        if self.fixtures.postgresql and self.fixtures.product_keys:
+            await self.request(
+                "/api/v1/analytics/products/price-analysis", "GET", "/api/v1/analytics/products/price-analysis",
+                email
+            )
+            await self.request(
+                "/api/v1/analytics/products/price-trend", "GET", "/api/v1/analytics/products/price-trend", email,
+                params={"product_key": self.random.choice(self.fixtures.product_keys)}
+            )
+        await self.request("/api/v1/export/tender/{tender_id}", "GET", f"/api/v1/export/tender/{tender_id}", email)
+
+    async def run(self, scenarios: List[str], weights: List[int], deadline: float):
+        while time.perf_counter() < deadline:
+            scenario = self.random.choices(scenarios, weights)[0]
+            await getattr(self, scenario)()
+
+
+def available_scenarios(fixtures: Fixtures, selected: Optional[List[str]]) -> List[str]:
+    scenarios = selected or list(SCENARIO_WEIGHTS)
+    if "supplier" in scenarios and not (fixtures.drafts or fixtures.supplier_emails):
+        print("Сценарий supplier пропущен: в базе нет поставщиков")
+        scenarios = [name for name in scenarios if name != "supplier"]
+    if "manager" in scenarios and not fixtures.manager_email:
+        print("Сценарий manager пропущен: в базе нет менеджеров и администраторов")
+        scenarios = [name for name in scenarios if name != "manager"]
+    if not scenarios:
+        raise SystemExit("Нет доступных сценариев")
+    return scenarios
+
+
+async def run_load(args, fixtures: Fixtures) -> dict:
+    scenarios = available_scenarios(fixtures, args.scenario)
+    weights = [SCENARIO_WEIGHTS[name] for name in scenarios]
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+        lifespan = None
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=timeout)
+        lifespan = app.router.lifespan_context(app)
+
+    async with client:
+        if lifespan is not None:
+            await lifespan.__aenter__()
+        try:
+            start = time.perf_counter()
+            deadline = start + args.warmup + args.duration
+            users = [
+                VirtualUser(client, recorder, fixtures, random.Random(args.seed + number))
+                for number in range(args.users)
+            ]
+            tasks = [asyncio.create_task(user.run(scenarios, weights, deadline)) for user in users]
+            await asyncio.sleep(args.warmup)
+            recorder.start()
+            await asyncio.sleep(max(deadline - time.perf_counter(), 0))
+            recorder.stop()
+            # Запросы, начатые до конца замера, завершаются, но уже не учитываются
+            await asyncio.gather(*tasks)
+        finally:
+            if lifespan is not None:
+                await lifespan.__aexit__(None, None, None)
+
+    result = recorder.summary()
+    result["meta"] = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "database": engine.dialect.name,
+        "dataset": fixtures.dataset,
+        "users": args.users,
+        "scenarios": scenarios,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    return result
+
+
+def change(current: float, previous: float) -> str:
+    if not previous:
+        return ""
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+
+def print_report(result: dict, baseline: Optional[dict] = None):
+    meta = result["meta"]
+    print(
+        f"\n{meta['target']}, {meta['database']}, пользователей: {meta['users']}, "
+        f"замер {result['duration_s']} с, набор: {meta['dataset']}"
+    )
+    header = f"{'Эндпоинт':<58} {'запр.':>6} {'ошиб.':>5} {'RPS':>7} {'p50':>8} {'p95':>8} {'p99':>8}"
+    if baseline:
+        header += f" {'Δp95':>6} {'ΔRPS':>6}"
+    print(header)
+    rows = list(result["endpoints"].items()) + [("Всего", result["total"])]
+    for name, row in rows:
+        line = (
+            f"{name:<58} {row['requests']:>6} {row['errors']:>5} {row['rps']:>7.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+        if baseline:
+            previous = baseline["total"] if name == "Всего" else baseline["endpoints"].get(name)
+            if previous:
+                line += f" {change(row['p95_ms'], previous['p95_ms']):>6} {change(row['rps'], previous['rps']):>6}"
+        print(line)
+    print("Время в мс")
+
+
+def regressions(result: dict, baseline: dict, threshold: float) -> List[str]:
+    """Эндпоинты, у которых p95 вырос больше чем на threshold процентов"""
+    found = []
+    for name, row in result["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous and previous["p95_ms"] and row["p95_ms"] > previous["p95_ms"] * (1 + threshold / 100):
+            found.append(f"{name}: p95 {previous['p95_ms']} -> {row['p95_ms']} мс")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API")
+    parser.add_argument("--url", help="Адрес запущенного сервера; по умолчанию main:app в этом процессе")
+    parser.add_argument("--users", type=int, default=10, help="Число виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=30, help="Длительность замера, с")
+    parser.add_argument("--warmup", type=float, default=5, help="Разогрев перед замером, с")
+    parser.add_argument("--timeout", type=float, default=30, help="Таймаут запроса, с")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIO_WEIGHTS),
+                        help="Только указанные сценарии (можно повторять)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="Сравнить с результатами из JSON")
+    parser.add_argument("--max-regression", type=float, default=0,
+                        help="Код возврата 1, если p95 эндпоинта вырос больше чем на столько процентов")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    result = asyncio.run(run_load(args, fixtures))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        previous = baseline["meta"]
+        for key in ("target", "database", "dataset", "users"):
+            if previous.get(key) != result["meta"].get(key):
+                print(f"ВНИМАНИЕ: {key} отличается от базового запуска: {previous.get(key)} -> {result['meta'][key]}")
+    print_report(result, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены в {args.save}")
+
+    if baseline and args.max_regression > 0:
+        found = regressions(result, baseline, args.max_regression)
+        for line in found:
+            print(f"ОШИБКА: {line}")
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
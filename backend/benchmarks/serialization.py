@@ -0,0 +1,99 @@
+"""
+Микробенчмарк сериализации страницы списка тендеров.
+
+Сравнивает путь FastAPI с response_model (валидация PaginatedResponse,
+dump и json.dumps), путь без response_model (jsonable_encoder и json.dumps)
+и FastJSONResponse (orjson напрямую по словарям).
+
+Запуск из каталога backend: python3 benchmarks/serialization.py [размер страницы]
+"""
+
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from fast_json import FastJSONResponse  # noqa: E402
+from models import TenderStatus  # noqa: E402
+from schemas import PaginatedResponse  # noqa: E402
+
+
+def tender_page(size: int) -> dict:
+    """Страница того же вида, что отдает GET /api/v1/tenders/"""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    items = []
+    for i in range(size):
+        items.append({
+            "id": i + 1,
+            "title": f"Поставка бурового инструмента, партия {i}",
+            "description": "Поставка алмазного бурового инструмента и комплектующих " * 4,
+            "initial_price": float(Decimal("1250000.50") + i),
+            "currency": "RUB",
+            "status": TenderStatus.PUBLISHED,
+            "publication_date": now,
+            "deadline": now + timedelta(days=14),
+            "okpd_code": "28.92.12",
+            "okved_code": "46.63",
+            "region": "Москва",
+            "procurement_method": "auction",
+            "created_at": now,
+            "lots": [
+                {
+                    "id": i * 10 + lot,
+                    "lot_number": lot + 1,
+                    "title": f"Лот {lot + 1}",
+                    "initial_price": 250000.0,
+                    "currency": "RUB",
+                    "products_count": 12
+                } for lot in range(3)
+            ],
+            "products_count": 36,
+            "documents_count": 2,
+            "proposals_count": 5,
+            "organizers": [{"id": i + 1, "organization_name": "ООО Алмазгеобур", "inn": "7700000000"}]
+        })
+    return {"items": items, "total": 1000, "page": 1, "size": size, "pages": 1000 // size}
+
+
+def response_model_path(page: dict) -> bytes:
+    model = PaginatedResponse.model_validate(page)
+    return JSONResponse(jsonable_encoder(model.model_dump(mode="json"))).body
+
+
+def plain_dict_path(page: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def fast_path(page: dict) -> bytes:
+    return FastJSONResponse(page).body
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    page = tender_page(size)
+
+    # Результаты должны совпадать по содержанию
+    assert json.loads(fast_path(page)) == json.loads(plain_dict_path(page))
+
+    print(f"Страница из {size} тендеров, {len(fast_path(page))} байт")
+    baseline = None
+    for name, func in [
+        ("response_model + json", response_model_path),
+        ("jsonable_encoder + json", plain_dict_path),
+        ("FastJSONResponse (orjson)", fast_path),
+    ]:
+        number, total = timeit.Timer(lambda: func(page)).autorange()
+        per_call = min(timeit.repeat(lambda: func(page), number=number, repeat=5)) / number
+        baseline = baseline or per_call
+        print(f"  {name:<28} {per_call * 1000:8.3f} мс  x{baseline / per_call:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Бюджет времени импорта приложения (python -X importtime).
+
+Импортирует main в отдельном процессе, выводит самые тяжелые модули и
+завершается с кодом 1, если суммарное время импорта больше бюджета или
+при старте загружается стек обработки данных (pandas, numpy, openpyxl) -
+он нужен только экспорту и импорту и подключается в эндпоинтах.
+
+Запуск из каталога backend: python3 benchmarks/startup.py [бюджет, мс]
+"""
+
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Бюджет по умолчанию, мс; время зависит от машины, его можно передать аргументом
+DEFAULT_BUDGET_MS = 1500
+FORBIDDEN_MODULES = ("pandas", "numpy", "openpyxl")
+
+
+def import_times(module: str = "main") -> dict:
+    """Накопленное время импорта по модулям верхнего уровня, мкс"""
+    env = {**os.environ, "ANALYTICS_REFRESH_INTERVAL": "0"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Не удалось импортировать {module}:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # строка заголовка
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    times = import_times()
+    total_ms = times["main"] / 1000
+
+    print(f"Импорт main: {total_ms:.0f} мс (бюджет {budget_ms:.0f} мс)")
+    top_level = sorted(
+        ((name, value) for name, value in times.items() if "." not in name and name != "main"),
+        key=lambda item: item[1], reverse=True
+    )
+    for name, value in top_level[:10]:
+        print(f"  {name:<28} {value / 1000:8.1f} мс")
+
+    errors = []
+    loaded = [name for name in FORBIDDEN_MODULES if name in times]
+    if loaded:
+        errors.append(f"при старте загружаются {', '.join(loaded)}")
+    if total_ms > budget_ms:
+        errors.append(f"время импорта {total_ms:.0f} мс больше бюджета {budget_ms:.0f} мс")
+    for error in errors:
+        print(f"ОШИБКА: {error}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Кэш результатов тяжелых запросов в памяти процесса.
+
+Значение хранится вместе с версией исходных данных (например, количество и
+время последнего изменения предложений). При чтении версия сверяется с
+текущей, поэтому устаревшие данные не отдаются даже при нескольких воркерах:
+каждый воркер сам обнаруживает изменение и пересчитывает результат.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from sqlalchemy import func
+
+from metrics import count_cache
+from models import SupplierProposal
+
+
+class VersionedCache:
+    """LRU-кэш, запись которого действительна, пока не изменилась версия данных"""
+
+    def __init__(self, name: str, maxsize: int = 256):
+        self.name = name  # Имя кэша в метриках
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            hit = entry is not None and entry[0] == version
+            if hit:
+                self._data.move_to_end(key)
+        count_cache(self.name, hit)
+        return entry[1] if hit else None
+
+    def set(self, key: Hashable, version: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def proposals_version(db, *criteria) -> tuple:
+    """Версия набора предложений: количество и время последнего изменения"""
+    count, last_change = db.query(
+        func.count(SupplierProposal.id),
+        func.max(func.coalesce(SupplierProposal.updated_at, SupplierProposal.created_at))
+    ).filter(*criteria).one()
+    return count, last_change
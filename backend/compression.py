@@ -0,0 +1,188 @@
+"""
+Сжатие ответов API (Brotli или gzip) по заголовку Accept-Encoding.
+
+Ответ с известным телом сжимается целиком, если он не меньше порога
+compression_minimum_size. Потоковый ответ (StreamingResponse) сжимается
+по частям со сбросом буфера компрессора после каждой части - клиент
+получает данные по мере формирования, а не после окончания ответа.
+
+Не сжимаются ответы, у которых уже есть Content-Encoding, и форматы,
+сжатые сами по себе (XLSX, изображения, архивы). nginx не сжимает
+повторно ответы с Content-Encoding, поэтому двойного сжатия нет.
+
+Brotli - необязательная зависимость: без пакета brotli используется gzip.
+"""
+
+import zlib
+from typing import Optional
+
+from fastapi import Request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Типы, которые имеет смысл сжимать; XLSX/DOCX - это уже zip-архивы
+COMPRESSIBLE_TYPES = (
+    b"application/json",
+    b"application/javascript",
+    b"application/xml",
+    b"text/",
+    b"image/svg+xml",
+)
+
+
+def _accepted(accept_encoding: str) -> dict:
+    """Кодировки из Accept-Encoding с их весами"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Кодировка сжатия для клиента: br, gzip или None"""
+    if not accept_encoding:
+        return None
+    accepted = _accepted(accept_encoding)
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def iter_chunks(buffer, chunk_size: int = 64 * 1024):
+    """
+    Части файла фиксированного размера для StreamingResponse.
+
+    Итерация по BytesIO идет по строкам, и двоичный файл отдавался бы
+    частями случайной длины.
+    """
+    buffer.seek(0)
+    while True:
+        chunk = buffer.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 16 + MAX_WBITS - формат gzip с заголовком и контрольной суммой
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Сжатая часть потока, сразу доступная клиенту"""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Сжатие тела ответа; подключается снаружи ConditionalGetMiddleware"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Request(scope).headers.get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        def start_headers(message, compressed: bool):
+            excluded = (b"vary", b"content-length") if compressed else (b"vary",)
+            headers = [
+                (key, value) for key, value in message.get("headers", [])
+                if key.lower() not in excluded
+            ]
+            vary = [value for key, value in message.get("headers", []) if key.lower() == b"vary"]
+            vary = b", ".join(vary + [b"Accept-Encoding"])
+            headers.append((b"vary", vary))
+            if compressed:
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                # Представление изменилось - сильный ETag становится слабым
+                headers = [
+                    (key, b"W/" + value if key.lower() == b"etag" and value.startswith(b'"') else value)
+                    for key, value in headers
+                ]
+            return {**message, "headers": headers}
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                headers = {key.lower(): value for key, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"")
+                if (
+                    message["status"] < 200 or message["status"] in (204, 304)
+                    or b"content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    start_message = False
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if start_message is False or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body:
+                    # Тело известно целиком: сжимаем только достаточно большие ответы
+                    if len(body) < self.minimum_size:
+                        await send(start_headers(start_message, compressed=False))
+                        await send(message)
+                        return
+                    compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                    content = compressor.finish(body)
+                    response_start = start_headers(start_message, compressed=True)
+                    response_start["headers"].append((b"content-length", str(len(content)).encode("latin-1")))
+                    await send(response_start)
+                    await send({"type": "http.response.body", "body": content})
+                    return
+                # Потоковый ответ: длина заранее неизвестна, сжимаем по частям
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                await send(start_headers(start_message, compressed=True))
+
+            if more_body:
+                content = compressor.chunk(body)
+            else:
+                content = compressor.finish(body)
+            await send({"type": "http.response.body", "body": content, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
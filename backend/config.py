@@ -14,6 +14,7 @@ class Settings(BaseSettings):
     postgres_db: str = "agb_etp"
     postgres_host: str = "localhost"
     postgres_port: int = 5433
+    db_revision_check: bool = True  # Проверять при старте, что база обновлена до последней ревизии Alembic
     
     # Настройки аутентификации
     secret_key: str = "your-secret-key-here-change-this-in-production"
@@ -25,6 +26,18 @@ class Settings(BaseSettings):
     port: int = 8000
     debug: bool = True
     
+    # Настройки рабочих процессов (gunicorn.conf.py)
+    workers: int = 0  # Число процессов; 0 - по числу CPU и доступной памяти
+    worker_memory_mb: int = 150  # Ожидаемый объем памяти одного процесса, МБ
+    workers_memory_share: float = 0.25  # Доля памяти сервера, отводимая процессам API
+    worker_threads: int = 40  # Потоков для синхронного кода в каждом процессе
+    keepalive: int = 5  # Время удержания keep-alive соединения, сек
+    max_requests: int = 1000  # Перезапуск процесса после N запросов (0 - отключено)
+    max_requests_jitter: int = 100  # Случайная добавка к max_requests, чтобы процессы не перезапускались одновременно
+    worker_timeout: int = 60  # Зависший процесс перезапускается через, сек
+    graceful_timeout: int = 30  # Время на завершение текущих запросов при перезапуске, сек
+    preload_app: bool = True  # Импорт приложения до fork: модули общие для процессов (copy-on-write)
+    
     # Настройки CORS
     cors_origins: List[str] = [
         "http://localhost:3000", 
@@ -50,6 +63,41 @@ class Settings(BaseSettings):
     # Настройки Redis
     redis_url: str = "redis://localhost:6379/0"
     
+    # Настройки аналитики
+    analytics_refresh_interval: int = 300  # Период обновления материализованных представлений, сек (0 - отключено)
+    
+    # Настройки HTTP-кэширования
+    http_cache_micro_ttl: int = 5  # Время кэширования анонимных ответов в nginx (X-Accel-Expires), сек (0 - отключено)
+    
+    # Настройки сжатия ответов
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024  # Ответы меньше этого размера, байт, не сжимаются
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4  # Brotli используется, если установлен пакет brotli
+    
+    # Настройки мониторинга
+    metrics_enabled: bool = True  # Метрики Prometheus на /metrics
+    
+    # Настройки диагностики SQL (query_stats.py)
+    db_stats_headers: bool = False  # Заголовки X-DB-Queries и X-DB-Time с числом и временем SQL-запросов в ответах
+    db_slow_query_ms: int = 200  # Порог медленного SQL-запроса для журнала, мс; 0 - отключено
+    db_explain_slow_queries: bool = False  # План EXPLAIN ANALYZE медленных SELECT в журнале (PostgreSQL); запрос выполняется повторно
+    db_slowest_top_n: int = 5  # Число самых медленных SQL-запросов в журнале HTTP-запроса
+    db_request_queries_warn: int = 50  # Предупреждение в журнале, если HTTP-запрос выполнил больше SQL-запросов; 0 - отключено
+    
+    # Настройки профилирования запросов (profiling.py)
+    profiling_enabled: bool = False  # Профили по заголовку X-Profile / ?profile= от администраторов и выборочные
+    profiling_sample_percent: float = 0.0  # Доля запросов, профили которых сохраняются, %; 0 - отключено
+    profiling_dir: str = "profiles"  # Каталог сохраненных профилей
+    profiling_format: str = "html"  # Формат сохраненных профилей pyinstrument: html или speedscope
+    
+    # Настройки журнала (access_log.py)
+    log_level: str = "INFO"
+    log_format: str = "json"  # json - запись одной строкой JSON, text - строка для чтения человеком
+    log_file: Optional[str] = None  # Файл журнала; по умолчанию stdout
+    access_log_enabled: bool = True  # Журнал доступа access вместо журнала uvicorn/gunicorn
+    forwarded_allow_ips: str = "127.0.0.1"  # Адреса прокси через запятую, которым доверяется X-Forwarded-For; * - любые
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,71 @@
+"""
+Сверка счетчиков дочерних записей тендеров и лотов.
+
+Счетчики поддерживаются событиями моделей, но массовые операции и правки
+напрямую в базе их не обновляют. Сверка пересчитывает значения и
+исправляет только разошедшиеся записи.
+
+Запуск: python3 counters.py
+"""
+
+from sqlalchemy import func, or_, select, update
+
+from database import engine
+from models import (
+    Tender, TenderLot, TenderProduct, TenderDocument, SupplierProposal, TenderApplication
+)
+
+
+def _count(model, foreign_key, parent_id):
+    return select(func.count(model.id)).where(foreign_key == parent_id).scalar_subquery()
+
+
+def tender_counters():
+    """Фактические значения счетчиков тендера (коррелированные подзапросы)"""
+    tenders = Tender.__table__
+    return {
+        "lots_count": _count(TenderLot, TenderLot.tender_id, tenders.c.id),
+        "products_count": select(func.count(TenderProduct.id)).join(
+            TenderLot, TenderProduct.lot_id == TenderLot.id
+        ).where(TenderLot.tender_id == tenders.c.id).scalar_subquery(),
+        "documents_count": _count(TenderDocument, TenderDocument.tender_id, tenders.c.id),
+        "proposals_count": _count(SupplierProposal, SupplierProposal.tender_id, tenders.c.id),
+        "applications_count": _count(TenderApplication, TenderApplication.tender_id, tenders.c.id),
+    }
+
+
+def reconcile_counters(connection, tender_ids=None) -> dict:
+    """
+    Пересчитывает счетчики тендеров и их лотов.
+
+    connection - соединение или сессия; изменения выполняются в ее
+    транзакции. tender_ids ограничивает сверку указанными тендерами.
+    Возвращает число исправленных тендеров и лотов.
+    """
+    tenders = Tender.__table__
+    lots = TenderLot.__table__
+
+    counters = tender_counters()
+    tender_update = update(tenders).where(
+        or_(*[tenders.c[name] != value for name, value in counters.items()])
+    ).values(updated_at=tenders.c.updated_at, **counters)
+
+    lot_products = _count(TenderProduct, TenderProduct.lot_id, lots.c.id)
+    lot_update = update(lots).where(lots.c.products_count != lot_products).values(products_count=lot_products)
+
+    if tender_ids is not None:
+        tender_update = tender_update.where(tenders.c.id.in_(tender_ids))
+        lot_update = lot_update.where(lots.c.tender_id.in_(tender_ids))
+
+    return {
+        "tenders": connection.execute(tender_update).rowcount,
+        "lots": connection.execute(lot_update).rowcount
+    }
+
+
+if __name__ == "__main__":
+    print("Сверка счетчиков тендеров...")
+    with engine.connect() as conn:
+        fixed = reconcile_counters(conn)
+        conn.commit()
+    print(f"✓ Исправлено тендеров: {fixed['tenders']}, лотов: {fixed['lots']}")
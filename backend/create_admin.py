@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine, Base
+from database import SessionLocal
 from models import User, UserRole
 from auth import get_password_hash
+from schema_migrations import upgrade_database
 
 def create_admin_user():
     db = SessionLocal()
@@ -25,5 +26,5 @@ def create_admin_user():
         db.close()
 
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
+    upgrade_database()
     create_admin_user()
@@ -5,9 +5,7 @@
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine
 from models import User, UserRole
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from auth import get_password_hash
 
 def create_test_users():
     db = SessionLocal()
@@ -61,7 +59,7 @@ def create_test_users():
             # Создаем нового пользователя
             user = User(
                 email=user_data["email"],
-                hashed_password=pwd_context.hash(user_data["password"]),
+                hashed_password=get_password_hash(user_data["password"]),
                 full_name=user_data["full_name"],
                 role=user_data["role"],
                 is_active=user_data["is_active"]
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
@@ -15,4 +16,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def dialect_insert(db):
+    """INSERT с поддержкой ON CONFLICT для базы сессии"""
+    if db.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert
+    return sqlite.insert
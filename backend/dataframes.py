@@ -0,0 +1,18 @@
+"""
+Отложенная загрузка pandas для экспорта и импорта.
+
+pandas вместе с numpy и openpyxl импортируется сотни миллисекунд, а нужен
+только эндпоинтам экспорта и импорта: модуль загружается при первом
+обращении, а не при старте каждого процесса (см. benchmarks/startup.py).
+"""
+
+from fastapi import HTTPException
+
+
+def load_pandas(purpose: str):
+    """Модуль pandas; без него - ошибка 500 «Библиотеки для <purpose> не установлены»"""
+    try:
+        import pandas
+    except ImportError:
+        raise HTTPException(status_code=500, detail=f"Библиотеки для {purpose} не установлены")
+    return pandas
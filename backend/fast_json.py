@@ -0,0 +1,37 @@
+"""
+Быстрая сериализация JSON-ответов через orjson.
+
+FastJSONResponse используется как класс ответа по умолчанию, а списковые
+эндпоинты возвращают его напрямую со словарями, собранными в коде: такой
+ответ не проходит повторную валидацию response_model и jsonable_encoder.
+datetime, date, UUID и Enum orjson сериализует сам, Decimal - в число,
+как jsonable_encoder.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Тип {type(value).__name__} не поддерживается для сериализации в JSON")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,76 @@
+"""
+Конфигурация gunicorn для продакшена: процессы uvicorn под надзором gunicorn.
+
+Запуск из каталога backend: gunicorn -c gunicorn.conf.py main:app
+
+Параметры берутся из Settings (переменные окружения и .env). Число
+процессов по умолчанию определяется по CPU и памяти сервера: 2 * CPU + 1,
+но не больше, чем помещается в отведенную процессам API долю памяти.
+С preload_app приложение импортируется один раз в главном процессе, и
+рабочие процессы делят загруженные модули через copy-on-write.
+
+Метрики Prometheus процессы пишут в общий каталог PROMETHEUS_MULTIPROC_DIR;
+он задается до импорта приложения и очищается при запуске.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+from config import settings
+
+
+def total_memory_mb() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+def default_workers() -> int:
+    """Число процессов по CPU, ограниченное памятью"""
+    by_cpu = multiprocessing.cpu_count() * 2 + 1
+    memory = total_memory_mb()
+    if not memory:
+        return by_cpu
+    by_memory = int(memory * settings.workers_memory_share) // settings.worker_memory_mb
+    return max(1, min(by_cpu, by_memory))
+
+
+# Должен быть задан до импорта prometheus_client (preload_app)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "agb_etp_metrics"))
+
+bind = f"{settings.host}:{settings.port}"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = settings.workers or default_workers()
+
+keepalive = settings.keepalive
+max_requests = settings.max_requests
+max_requests_jitter = settings.max_requests_jitter
+timeout = settings.worker_timeout
+graceful_timeout = settings.graceful_timeout
+preload_app = settings.preload_app
+
+# Запросы пишет журнал access приложения (access_log.py)
+accesslog = None if settings.access_log_enabled else "-"
+errorlog = "-"
+loglevel = "debug" if settings.debug else "info"
+
+
+def post_fork(server, worker):
+    # Соединения пула, открытые до fork, не должны использоваться двумя процессами
+    from database import engine
+    engine.dispose(close=False)
+
+
+def on_starting(server):
+    # Значения прошлого запуска не должны попадать в сумму
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,150 @@
+"""
+Условные GET-запросы: ETag, Last-Modified, 304 и Cache-Control.
+
+Эндпоинты, для которых версия данных известна до сборки ответа (updated_at
+тендера, версия снимка, агрегат по таблице), проверяют валидаторы сами через
+conditional_response и отвечают 304 без сериализации. Остальные JSON-ответы
+на GET получают ETag по хэшу тела в ConditionalGetMiddleware - это экономит
+передачу и отрисовку на клиенте.
+
+Анонимные ответы помечаются public и X-Accel-Expires, чтобы nginx мог
+кратковременно кэшировать чтение тендеров; ответы пользователей - private.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from config import settings
+
+PUBLIC_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Слабый ETag по версии данных"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Слабое сравнение ETag с заголовком If-None-Match"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque(tag.strip()) == _opaque(etag) for tag in if_none_match.split(","))
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def cache_headers(request: Request, etag: Optional[str] = None,
+                  last_modified: Optional[datetime] = None) -> dict:
+    """Заголовки валидаторов и политики кэширования для ответа"""
+    headers = {"Vary": "Authorization"}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    if "authorization" in request.headers:
+        headers["Cache-Control"] = PRIVATE_CACHE_CONTROL
+    else:
+        headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+        if settings.http_cache_micro_ttl > 0:
+            headers["X-Accel-Expires"] = str(settings.http_cache_micro_ttl)
+    return headers
+
+
+def conditional_response(request: Request, etag: str,
+                         last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """Ответ 304, если у клиента актуальная версия; иначе None"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, etag)
+    else:
+        fresh = not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    if fresh:
+        return Response(status_code=304, headers=cache_headers(request, etag, last_modified))
+    return None
+
+
+class ConditionalGetMiddleware:
+    """
+    ETag по хэшу тела для JSON-ответов на GET, у которых его нет.
+
+    Потоковые и не-JSON ответы (экспорт файлов) пропускаются без буферизации.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        start_message = None
+        body = []
+
+        async def send_with_etag(message):
+            nonlocal start_message
+            if start_message is None and message["type"] == "http.response.start":
+                headers = {key.lower(): value for key, value in message.get("headers", [])}
+                cacheable = (
+                    message["status"] == 200
+                    and b"etag" not in headers
+                    and headers.get(b"content-type", b"").startswith(b"application/json")
+                )
+                if not cacheable:
+                    start_message = False
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if not start_message or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            content = b"".join(body)
+            etag = 'W/"' + hashlib.sha1(content).hexdigest() + '"'
+            extra = cache_headers(request, etag)
+            headers = [
+                (key, value) for key, value in start_message.get("headers", [])
+                if key.lower() not in (b"cache-control", b"vary")
+            ]
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                headers = [(key, value) for key, value in headers if key.lower() != b"content-length"]
+                start_message = {**start_message, "status": 304}
+                content = b""
+            headers += [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in extra.items()]
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": content})
+
+        await self.app(scope, receive, send_with_etag)
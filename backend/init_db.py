@@ -4,15 +4,16 @@
 """
 
 from sqlalchemy.orm import Session
-from database import SessionLocal, engine
-from models import Base, User, UserRole
+from database import SessionLocal
+from models import User, UserRole
+from schema_migrations import upgrade_database
 from auth import get_password_hash
 import sys
 
 def create_tables():
-    """Создание всех таблиц в базе данных"""
+    """Создание и обновление таблиц в базе данных (миграции Alembic)"""
     print("Создание таблиц в базе данных...")
-    Base.metadata.create_all(bind=engine)
+    upgrade_database()
     print("Таблицы созданы успешно!")
 
 def create_admin():
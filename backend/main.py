@@ -1,17 +1,48 @@
+import asyncio
+import anyio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
 from config import settings
+from schema_migrations import check_schema_revision
+from analytics_views import analytics_refresh_loop
+from http_cache import ConditionalGetMiddleware
+from compression import CompressionMiddleware
+from fast_json import FastJSONResponse
+from metrics import MetricsMiddleware, metrics_response
+from query_stats import QueryStatsMiddleware
+from profiling import ProfilingMiddleware
+from access_log import AccessLogMiddleware, setup_logging, stop_logging
 from api.v1 import auth, tenders, applications, users, export, imports, dashboard, files, suppliers, analytics
 
-# Создаем таблицы в базе данных
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Проверка схемы базы данных при старте и фоновые задачи на время работы"""
+    # Поток журнала запускается в каждом процессе: потоки главного процесса gunicorn не переживают fork
+    setup_logging()
+    if settings.db_revision_check:
+        await asyncio.to_thread(check_schema_revision)
+
+    # Пул потоков для синхронного кода (зависимости, эндпоинты без async)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.worker_threads
+
+    refresh_task = None
+    if settings.analytics_refresh_interval > 0:
+        refresh_task = asyncio.create_task(analytics_refresh_loop())
+    yield
+    if refresh_task:
+        refresh_task.cancel()
+    stop_logging()
+
 
 # Создаем приложение FastAPI
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    description="Электронная торговая площадка для компании Алмазгеобур"
+    description="Электронная торговая площадка для компании Алмазгеобур",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # Настройка CORS
@@ -23,6 +54,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ETag и 304 для JSON-ответов на GET
+app.add_middleware(ConditionalGetMiddleware)
+
+# Сжатие ответов; подключается последним, чтобы ETag считался по исходному телу
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality
+    )
+
+# Профили запросов по флагу администратора или выборочно; внутри статистики SQL,
+# чтобы разделять время запроса на SQL и Python
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
+# Статистика SQL-запросов на HTTP-запрос (журнал, метрики, заголовки X-DB-* по настройке)
+app.add_middleware(QueryStatsMiddleware)
+
+# Идентификатор запроса (X-Request-ID) и журнал доступа в JSON
+app.add_middleware(AccessLogMiddleware)
+
+# Метрики Prometheus; подключаются последними (снаружи всех middleware), чтобы
+# время ответа включало журнал, статистику SQL и профилирование
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Подключение роутеров API v1
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Аутентификация"])
 app.include_router(tenders.router, prefix="/api/v1/tenders", tags=["Тендеры"])
@@ -42,6 +101,13 @@ async def root():
     return {"message": "Добро пожаловать на API Алмазгеобур ЭТП!"}
 
 
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Метрики Prometheus"""
+        return metrics_response()
+
+
 @app.get("/health")
 async def health_check():
     """Проверка состояния сервиса"""
@@ -54,5 +120,6 @@ if __name__ == "__main__":
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        reload=settings.debug,
+        access_log=not settings.access_log_enabled
     )
\ No newline at end of file
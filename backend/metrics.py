@@ -0,0 +1,166 @@
+"""
+Метрики Prometheus.
+
+MetricsMiddleware для каждого HTTP-запроса записывает время ответа, размер
+тела, число, время и медленные SQL-запросы по шаблону маршрута
+(/api/v1/tenders/{tender_id}, а не конкретный URL) и число запросов в
+обработке. Кроме того собираются состояние пула соединений, попадания в
+кэши и длительность экспорта и импорта.
+
+При нескольких процессах gunicorn задает PROMETHEUS_MULTIPROC_DIR: значения
+пишутся в файлы общего каталога, и /metrics любого процесса отдает сумму по
+всем процессам.
+"""
+
+import os
+import time
+
+from fastapi import Request, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+from sqlalchemy.pool import QueuePool
+
+from database import engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 200)
+JOB_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP-запросы в обработке",
+    ["method"], multiprocess_mode="livesum"
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Размер тела ответа (после сжатия)",
+    ["method", "route"], buckets=SIZE_BUCKETS
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries", "Число SQL-запросов на HTTP-запрос",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS
+)
+DB_DURATION = Histogram(
+    "http_request_db_seconds", "Суммарное время SQL-запросов на HTTP-запрос",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+DB_SLOW_QUERIES = Counter(
+    "http_request_db_slow_queries_total", "SQL-запросы медленнее db_slow_query_ms",
+    ["method", "route"]
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Соединения пула по состоянию (checked_out, idle, overflow)",
+    ["state"], multiprocess_mode="livesum"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Обращения к кэшам по результату (hit, miss)",
+    ["cache", "result"]
+)
+JOB_DURATION = Histogram(
+    "data_job_duration_seconds", "Длительность экспорта и импорта данных",
+    ["job"], buckets=JOB_BUCKETS
+)
+
+
+def count_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def observe_pool():
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        DB_POOL_CONNECTIONS.labels("checked_out").set(pool.checkedout())
+        DB_POOL_CONNECTIONS.labels("idle").set(pool.checkedin())
+        DB_POOL_CONNECTIONS.labels("overflow").set(max(pool.overflow(), 0))
+
+
+async def track_job(request: Request):
+    """Зависимость роутеров экспорта и импорта: длительность обработки по эндпоинтам"""
+    start = time.perf_counter()
+    yield
+    JOB_DURATION.labels(request.scope["route"].name).observe(time.perf_counter() - start)
+
+
+def route_template(scope) -> str:
+    """
+    Шаблон пути найденного маршрута: /api/v1/tenders/{tender_id}.
+
+    В части версий FastAPI маршруты подключенного роутера хранят путь без
+    префикса, поэтому префикс восстанавливается по фактическому пути запроса.
+    """
+    path_format = getattr(scope.get("route"), "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    params = {name: str(value) for name, value in scope.get("path_params", {}).items()}
+    try:
+        concrete = path_format.format(**params)
+    except (KeyError, IndexError):
+        return path_format
+    path = scope["path"]
+    if path.endswith(concrete):
+        return path[:len(path) - len(concrete)] + path_format
+    return path_format
+
+
+def metrics_response() -> Response:
+    """Значения метрик в текстовом формате Prometheus"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Метрики HTTP-запросов по шаблонам маршрутов; подключается последним (снаружи всех)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        # Маршрут известен только после маршрутизации, поэтому запросы
+        # в обработке считаются по методу
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+
+            # Маршрутизатор записывает найденный маршрут в scope; неизвестные
+            # пути объединяются, чтобы не плодить значения метки
+            route = route_template(scope)
+            REQUEST_DURATION.labels(method, route, str(status)).observe(duration)
+            RESPONSE_SIZE.labels(method, route).observe(size)
+            # Статистику SQL собирает внутренний QueryStatsMiddleware и оставляет в scope
+            stats = scope.get("query_stats")
+            if stats is not None:
+                DB_QUERIES.labels(method, route).observe(stats.count)
+                DB_DURATION.labels(method, route).observe(stats.duration)
+                if stats.slow_count:
+                    DB_SLOW_QUERIES.labels(method, route).inc(stats.slow_count)
+            observe_pool()
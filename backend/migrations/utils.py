@@ -0,0 +1,28 @@
+"""
+Проверки схемы для ревизий, которые должны быть идемпотентными.
+
+Базы, созданные до перехода на Alembic, могли уже получить часть
+изменений через отдельные скрипты migrate_*.py, поэтому ревизии
+проверяют наличие колонок, индексов и таблиц перед изменением.
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+def is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def has_table(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def has_column(table_name: str, column_name: str) -> bool:
+    columns = sa.inspect(op.get_bind()).get_columns(table_name)
+    return any(column["name"] == column_name for column in columns)
+
+
+def has_index(table_name: str, index_name: str) -> bool:
+    indexes = sa.inspect(op.get_bind()).get_indexes(table_name)
+    return any(index["name"] == index_name for index in indexes)
@@ -0,0 +1,235 @@
+"""Исходная схема базы данных
+
+Таблицы в том виде, в каком их создавал Base.metadata.create_all до
+перехода на Alembic. Базы, созданные так, помечаются этой ревизией
+(schema_migrations.upgrade_database) и доводятся следующими ревизиями.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('full_name', sa.String(), nullable=False),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('role', sa.Enum('ADMIN', 'CONTRACT_MANAGER', 'MANAGER', 'SUPPLIER', name='userrole'), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('supplier_profiles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('legal_form', sa.Enum('IP', 'OOO', 'OAO', 'ZAO', 'PAO', 'OTHER', name='legalform'), nullable=False),
+    sa.Column('company_name', sa.String(), nullable=False),
+    sa.Column('inn', sa.String(), nullable=False),
+    sa.Column('kpp', sa.String(), nullable=True),
+    sa.Column('ogrn', sa.String(), nullable=True),
+    sa.Column('legal_address', sa.Text(), nullable=True),
+    sa.Column('actual_address', sa.Text(), nullable=True),
+    sa.Column('bank_name', sa.String(), nullable=True),
+    sa.Column('bank_account', sa.String(), nullable=True),
+    sa.Column('correspondent_account', sa.String(), nullable=True),
+    sa.Column('bic', sa.String(), nullable=True),
+    sa.Column('contact_person', sa.String(), nullable=True),
+    sa.Column('contact_phone', sa.String(), nullable=True),
+    sa.Column('contact_email', sa.String(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('inn'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_index(op.f('ix_supplier_profiles_id'), 'supplier_profiles', ['id'], unique=False)
+    op.create_table('tenders',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('notice_number', sa.String(), nullable=True),
+    sa.Column('initial_price', sa.Numeric(precision=20, scale=2), nullable=True),
+    sa.Column('currency', sa.String(), nullable=True),
+    sa.Column('status', sa.Enum('DRAFT', 'PUBLISHED', 'IN_PROGRESS', 'COMPLETED', 'CANCELLED', name='tenderstatus'), nullable=True),
+    sa.Column('publication_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('deadline', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('okpd_code', sa.String(), nullable=True),
+    sa.Column('okved_code', sa.String(), nullable=True),
+    sa.Column('region', sa.String(), nullable=True),
+    sa.Column('procurement_method', sa.String(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('notice_number')
+    )
+    op.create_index(op.f('ix_tenders_id'), 'tenders', ['id'], unique=False)
+    op.create_table('supplier_proposals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tender_id', sa.Integer(), nullable=True),
+    sa.Column('supplier_id', sa.Integer(), nullable=True),
+    sa.Column('prepayment_percent', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('currency', sa.String(), nullable=True),
+    sa.Column('vat_percent', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('general_comment', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['supplier_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_supplier_proposals_id'), 'supplier_proposals', ['id'], unique=False)
+    op.create_table('tender_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tender_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('file_path', sa.String(), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('file_type', sa.String(), nullable=True),
+    sa.Column('uploaded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tender_documents_id'), 'tender_documents', ['id'], unique=False)
+    op.create_table('tender_lots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tender_id', sa.Integer(), nullable=True),
+    sa.Column('lot_number', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('initial_price', sa.Numeric(precision=20, scale=2), nullable=True),
+    sa.Column('currency', sa.String(), nullable=True),
+    sa.Column('security_amount', sa.Numeric(precision=20, scale=2), nullable=True),
+    sa.Column('delivery_place', sa.Text(), nullable=True),
+    sa.Column('payment_terms', sa.Text(), nullable=True),
+    sa.Column('quantity', sa.String(), nullable=True),
+    sa.Column('unit_of_measure', sa.String(), nullable=True),
+    sa.Column('okpd_code', sa.String(), nullable=True),
+    sa.Column('okved_code', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tender_lots_id'), 'tender_lots', ['id'], unique=False)
+    op.create_table('tender_organizers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tender_id', sa.Integer(), nullable=True),
+    sa.Column('organization_name', sa.String(), nullable=False),
+    sa.Column('legal_address', sa.Text(), nullable=True),
+    sa.Column('postal_address', sa.Text(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('phone', sa.String(), nullable=True),
+    sa.Column('contact_person', sa.String(), nullable=True),
+    sa.Column('inn', sa.String(), nullable=True),
+    sa.Column('kpp', sa.String(), nullable=True),
+    sa.Column('ogrn', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tender_organizers_id'), 'tender_organizers', ['id'], unique=False)
+    op.create_table('tender_procedure_stages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tender_id', sa.Integer(), nullable=True),
+    sa.Column('stage_name', sa.String(), nullable=False),
+    sa.Column('stage_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('stage_description', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tender_procedure_stages_id'), 'tender_procedure_stages', ['id'], unique=False)
+    op.create_table('tender_applications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tender_id', sa.Integer(), nullable=True),
+    sa.Column('lot_id', sa.Integer(), nullable=True),
+    sa.Column('supplier_id', sa.Integer(), nullable=True),
+    sa.Column('proposed_price', sa.Numeric(precision=20, scale=2), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['lot_id'], ['tender_lots.id'], ),
+    sa.ForeignKeyConstraint(['supplier_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tender_applications_id'), 'tender_applications', ['id'], unique=False)
+    op.create_table('tender_products',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lot_id', sa.Integer(), nullable=True),
+    sa.Column('position_number', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('quantity', sa.String(), nullable=True),
+    sa.Column('unit_of_measure', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['lot_id'], ['tender_lots.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tender_products_id'), 'tender_products', ['id'], unique=False)
+    op.create_table('proposal_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('proposal_id', sa.Integer(), nullable=True),
+    sa.Column('product_id', sa.Integer(), nullable=True),
+    sa.Column('is_available', sa.Boolean(), nullable=True),
+    sa.Column('is_analog', sa.Boolean(), nullable=True),
+    sa.Column('price_per_unit', sa.Numeric(precision=20, scale=2), nullable=True),
+    sa.Column('delivery_days', sa.Integer(), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['tender_products.id'], ),
+    sa.ForeignKeyConstraint(['proposal_id'], ['supplier_proposals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_proposal_items_id'), 'proposal_items', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_proposal_items_id'), table_name='proposal_items')
+    op.drop_table('proposal_items')
+    op.drop_index(op.f('ix_tender_products_id'), table_name='tender_products')
+    op.drop_table('tender_products')
+    op.drop_index(op.f('ix_tender_applications_id'), table_name='tender_applications')
+    op.drop_table('tender_applications')
+    op.drop_index(op.f('ix_tender_procedure_stages_id'), table_name='tender_procedure_stages')
+    op.drop_table('tender_procedure_stages')
+    op.drop_index(op.f('ix_tender_organizers_id'), table_name='tender_organizers')
+    op.drop_table('tender_organizers')
+    op.drop_index(op.f('ix_tender_lots_id'), table_name='tender_lots')
+    op.drop_table('tender_lots')
+    op.drop_index(op.f('ix_tender_documents_id'), table_name='tender_documents')
+    op.drop_table('tender_documents')
+    op.drop_index(op.f('ix_supplier_proposals_id'), table_name='supplier_proposals')
+    op.drop_table('supplier_proposals')
+    op.drop_index(op.f('ix_tenders_id'), table_name='tenders')
+    op.drop_table('tenders')
+    op.drop_index(op.f('ix_supplier_profiles_id'), table_name='supplier_profiles')
+    op.drop_table('supplier_profiles')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    
+    # Типы перечислений PostgreSQL не удаляются вместе с таблицами
+    bind = op.get_bind()
+    for name in ("tenderstatus", "legalform", "userrole"):
+        sa.Enum(name=name).drop(bind, checkfirst=True)
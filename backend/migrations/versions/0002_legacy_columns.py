@@ -0,0 +1,48 @@
+"""Колонки старых баз: lot_id заявок и точность денежных полей
+
+Заменяет скрипты migrate_db.py и migrate_precision.py. Новые базы получают
+эти колонки уже в ревизии 0001, ревизия доводит до нее базы, созданные
+ранними версиями приложения.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.utils import has_column, is_postgresql
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = [
+    ("tenders", "initial_price"),
+    ("tender_lots", "initial_price"),
+    ("tender_lots", "security_amount"),
+    ("tender_applications", "proposed_price"),
+    ("proposal_items", "price_per_unit"),
+]
+
+
+def upgrade():
+    if not has_column("tender_applications", "lot_id"):
+        op.add_column("tender_applications", sa.Column("lot_id", sa.Integer(), nullable=True))
+        op.create_foreign_key(None, "tender_applications", "tender_lots", ["lot_id"], ["id"])
+
+    if not is_postgresql():
+        return
+    inspector = sa.inspect(op.get_bind())
+    for table_name, column_name in MONEY_COLUMNS:
+        column = next(c for c in inspector.get_columns(table_name) if c["name"] == column_name)
+        if getattr(column["type"], "precision", None) != 20:
+            op.alter_column(table_name, column_name, type_=sa.Numeric(20, 2))
+
+
+def downgrade():
+    # Ревизия только доводит старые базы до исходной схемы
+    pass
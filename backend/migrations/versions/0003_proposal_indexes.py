@@ -0,0 +1,36 @@
+"""Индексы по внешним ключам предложений поставщиков
+
+Заменяет скрипт migrate_proposal_indexes.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.utils import has_index
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_supplier_proposals_tender_id", "supplier_proposals", "tender_id"),
+    ("ix_supplier_proposals_supplier_id", "supplier_proposals", "supplier_id"),
+    ("ix_proposal_items_proposal_id", "proposal_items", "proposal_id"),
+    ("ix_proposal_items_product_id", "proposal_items", "product_id"),
+]
+
+
+def upgrade():
+    for index_name, table_name, column_name in INDEXES:
+        if not has_index(table_name, index_name):
+            op.create_index(index_name, table_name, [column_name])
+
+
+def downgrade():
+    for index_name, table_name, _ in INDEXES:
+        op.drop_index(index_name, table_name=table_name)
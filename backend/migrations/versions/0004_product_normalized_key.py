@@ -0,0 +1,69 @@
+"""Нормализованный ключ товара для аналитики цен
+
+Заменяет скрипт migrate_product_keys.py. Ключи существующих товаров
+рассчитываются пачками. Нормализация зафиксирована в ревизии в том виде,
+в каком ее выполняли модели на момент ее создания, и не зависит от
+текущего models.normalize_product_key.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.utils import has_column, has_index
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _normalize_text(value: str) -> str:
+    if not value:
+        return ""
+    value = value.lower().replace("ё", "е")
+    return " ".join(re.sub(r"[^\w]+", " ", value).split())
+
+
+def _product_key(name: str, unit_of_measure: str = None):
+    if not name:
+        return None
+    return f"{_normalize_text(name)}|{_normalize_text(unit_of_measure)}"
+
+
+def upgrade():
+    if not has_column("tender_products", "normalized_key"):
+        op.add_column("tender_products", sa.Column("normalized_key", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    while True:
+        rows = bind.execute(sa.text("""
+            SELECT id, name, unit_of_measure FROM tender_products
+            WHERE normalized_key IS NULL
+            LIMIT :limit
+        """), {"limit": BATCH_SIZE}).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            sa.text("UPDATE tender_products SET normalized_key = :key WHERE id = :id"),
+            [{"id": row.id, "key": _product_key(row.name, row.unit_of_measure) or ""} for row in rows]
+        )
+
+    if not has_index("tender_products", "ix_tender_products_normalized_key"):
+        op.create_index(
+            "ix_tender_products_normalized_key", "tender_products", ["normalized_key"],
+            postgresql_ops={"normalized_key": "varchar_pattern_ops"}
+        )
+
+
+def downgrade():
+    op.drop_index("ix_tender_products_normalized_key", table_name="tender_products")
+    op.drop_column("tender_products", "normalized_key")
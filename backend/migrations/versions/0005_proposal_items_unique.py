@@ -0,0 +1,43 @@
+"""Уникальность товара в предложении поставщика
+
+Заменяет скрипт migrate_proposal_items_unique.py. Из дублей позиций
+остается последняя сохраненная.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.utils import has_index
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if has_index("proposal_items", "ux_proposal_items_proposal_product"):
+        return
+    op.execute("""
+        DELETE FROM proposal_items
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY proposal_id, product_id ORDER BY id DESC
+                ) AS rn
+                FROM proposal_items
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+    op.create_index(
+        "ux_proposal_items_proposal_product", "proposal_items", ["proposal_id", "product_id"], unique=True
+    )
+
+
+def downgrade():
+    op.drop_index("ux_proposal_items_proposal_product", table_name="proposal_items")
@@ -0,0 +1,70 @@
+"""Счетчики дочерних записей тендеров и лотов
+
+Заменяет скрипт migrate_tender_counters.py: добавляет колонки и заполняет
+их фактическими значениями. Пересчет зафиксирован в ревизии SQL-запросами
+и не зависит от текущих counters и моделей.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.utils import has_column
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+COUNTER_COLUMNS = [
+    ("tenders", "lots_count"),
+    ("tenders", "products_count"),
+    ("tenders", "documents_count"),
+    ("tenders", "proposals_count"),
+    ("tenders", "applications_count"),
+    ("tender_lots", "products_count"),
+]
+
+RECONCILE_TENDERS = """
+    UPDATE tenders SET
+        lots_count = (SELECT count(tender_lots.id) FROM tender_lots WHERE tender_lots.tender_id = tenders.id),
+        products_count = (
+            SELECT count(tender_products.id) FROM tender_products
+            JOIN tender_lots ON tender_products.lot_id = tender_lots.id
+            WHERE tender_lots.tender_id = tenders.id
+        ),
+        documents_count = (
+            SELECT count(tender_documents.id) FROM tender_documents WHERE tender_documents.tender_id = tenders.id
+        ),
+        proposals_count = (
+            SELECT count(supplier_proposals.id) FROM supplier_proposals WHERE supplier_proposals.tender_id = tenders.id
+        ),
+        applications_count = (
+            SELECT count(tender_applications.id) FROM tender_applications
+            WHERE tender_applications.tender_id = tenders.id
+        )
+"""
+
+RECONCILE_LOTS = """
+    UPDATE tender_lots SET
+        products_count = (
+            SELECT count(tender_products.id) FROM tender_products WHERE tender_products.lot_id = tender_lots.id
+        )
+"""
+
+
+def upgrade():
+    for table_name, column_name in COUNTER_COLUMNS:
+        if not has_column(table_name, column_name):
+            op.add_column(table_name, sa.Column(column_name, sa.Integer(), nullable=False, server_default="0"))
+    op.execute(RECONCILE_TENDERS)
+    op.execute(RECONCILE_LOTS)
+
+
+def downgrade():
+    for table_name, column_name in reversed(COUNTER_COLUMNS):
+        op.drop_column(table_name, column_name)
@@ -0,0 +1,36 @@
+"""Снимки детальной карточки тендера
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.utils import has_table
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # До перехода на Alembic таблицу создавал create_all при старте приложения
+    if has_table("tender_snapshots"):
+        return
+    op.create_table('tender_snapshots',
+    sa.Column('tender_id', sa.Integer(), nullable=False),
+    sa.Column('tender_updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('etag', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['tender_id'], ['tenders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('tender_id')
+    )
+
+
+def downgrade():
+    op.drop_table('tender_snapshots')
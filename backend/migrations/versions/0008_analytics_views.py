@@ -0,0 +1,121 @@
+"""Материализованные представления аналитики
+
+Заменяет скрипт migrate_analytics_views.py. DDL зафиксирован в ревизии
+и не зависит от текущих определений в analytics_views: изменение
+представления оформляется новой ревизией, которая пересоздает его.
+Только для PostgreSQL - на других СУБД аналитика читается из подзапросов.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.utils import is_postgresql
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+PRICED_ITEM = "proposal_items.price_per_unit IS NOT NULL AND proposal_items.is_available = true"
+
+VIEWS = [
+    ("mv_supplier_stats", "supplier_id", f"""
+        SELECT
+            proposal_stats.supplier_id,
+            proposal_stats.proposals_count,
+            proposal_stats.accepted_proposals,
+            proposal_stats.first_proposal,
+            proposal_stats.last_proposal,
+            coalesce(item_stats.items_count, 0) AS items_count,
+            coalesce(item_stats.priced_items, 0) AS priced_items,
+            item_stats.price_sum,
+            item_stats.avg_price,
+            item_stats.min_price,
+            item_stats.max_price,
+            item_stats.avg_delivery,
+            item_stats.min_delivery,
+            item_stats.max_delivery,
+            coalesce(item_stats.analog_items, 0) AS analog_items
+        FROM (
+            SELECT
+                supplier_proposals.supplier_id AS supplier_id,
+                count(supplier_proposals.id) AS proposals_count,
+                count(CASE WHEN supplier_proposals.status = 'accepted' THEN 1 END) AS accepted_proposals,
+                min(supplier_proposals.created_at) AS first_proposal,
+                max(supplier_proposals.created_at) AS last_proposal
+            FROM supplier_proposals
+            WHERE supplier_proposals.supplier_id IS NOT NULL
+            GROUP BY supplier_proposals.supplier_id
+        ) AS proposal_stats
+        LEFT OUTER JOIN (
+            SELECT
+                supplier_proposals.supplier_id AS supplier_id,
+                count(proposal_items.id) AS items_count,
+                count(CASE WHEN {PRICED_ITEM} THEN 1 END) AS priced_items,
+                sum(CASE WHEN {PRICED_ITEM} THEN proposal_items.price_per_unit END) AS price_sum,
+                avg(CASE WHEN {PRICED_ITEM} THEN proposal_items.price_per_unit END) AS avg_price,
+                min(CASE WHEN {PRICED_ITEM} THEN proposal_items.price_per_unit END) AS min_price,
+                max(CASE WHEN {PRICED_ITEM} THEN proposal_items.price_per_unit END) AS max_price,
+                avg(proposal_items.delivery_days) AS avg_delivery,
+                min(proposal_items.delivery_days) AS min_delivery,
+                max(proposal_items.delivery_days) AS max_delivery,
+                count(CASE WHEN proposal_items.is_analog = true THEN 1 END) AS analog_items
+            FROM proposal_items
+            JOIN supplier_proposals ON proposal_items.proposal_id = supplier_proposals.id
+            WHERE supplier_proposals.supplier_id IS NOT NULL
+            GROUP BY supplier_proposals.supplier_id
+        ) AS item_stats ON proposal_stats.supplier_id = item_stats.supplier_id
+    """),
+    ("mv_product_price_stats", "product_key", f"""
+        SELECT
+            tender_products.normalized_key AS product_key,
+            min(tender_products.name) AS product_name,
+            min(tender_products.unit_of_measure) AS unit_of_measure,
+            count(DISTINCT tender_lots.tender_id) AS tenders_count,
+            count(proposal_items.id) AS proposals_count,
+            avg(proposal_items.price_per_unit) AS avg_price,
+            min(proposal_items.price_per_unit) AS min_price,
+            max(proposal_items.price_per_unit) AS max_price,
+            stddev(proposal_items.price_per_unit) AS price_stddev,
+            percentile_cont(0.25) WITHIN GROUP (ORDER BY proposal_items.price_per_unit) AS p25_price,
+            percentile_cont(0.5) WITHIN GROUP (ORDER BY proposal_items.price_per_unit) AS median_price,
+            percentile_cont(0.75) WITHIN GROUP (ORDER BY proposal_items.price_per_unit) AS p75_price,
+            percentile_cont(0.9) WITHIN GROUP (ORDER BY proposal_items.price_per_unit) AS p90_price
+        FROM proposal_items
+        JOIN tender_products ON proposal_items.product_id = tender_products.id
+        JOIN tender_lots ON tender_products.lot_id = tender_lots.id
+        WHERE {PRICED_ITEM} AND tender_products.normalized_key IS NOT NULL
+        GROUP BY tender_products.normalized_key
+    """),
+    ("mv_tender_stats", "tender_id", """
+        SELECT
+            supplier_proposals.tender_id AS tender_id,
+            count(supplier_proposals.id) AS proposals_count,
+            count(DISTINCT supplier_proposals.supplier_id) AS suppliers_count,
+            count(CASE WHEN supplier_proposals.status = 'accepted' THEN 1 END) AS accepted_proposals,
+            max(supplier_proposals.updated_at) AS last_updated
+        FROM supplier_proposals
+        WHERE supplier_proposals.tender_id IS NOT NULL
+        GROUP BY supplier_proposals.tender_id
+    """),
+]
+
+
+def upgrade():
+    if not is_postgresql():
+        return
+    for name, key, query in VIEWS:
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
+        op.execute(f"CREATE MATERIALIZED VIEW {name} AS {query}")
+        op.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name}_{key} ON {name} ({key})")
+
+
+def downgrade():
+    if not is_postgresql():
+        return
+    for name, _, _ in reversed(VIEWS):
+        op.execute(f"DROP MATERIALIZED VIEW IF EXISTS {name}")
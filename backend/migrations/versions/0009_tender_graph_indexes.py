@@ -0,0 +1,40 @@
+"""Индексы по внешним ключам лотов, товаров и связанных с тендером таблиц
+
+Карточка тендера, фильтры списка по товарам и кодам лотов и пересчет
+счетчиков выбирают строки по tender_id и lot_id; без индексов PostgreSQL
+просматривает таблицы целиком.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.utils import has_index
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_tender_lots_tender_id", "tender_lots", "tender_id"),
+    ("ix_tender_products_lot_id", "tender_products", "lot_id"),
+    ("ix_tender_documents_tender_id", "tender_documents", "tender_id"),
+    ("ix_tender_organizers_tender_id", "tender_organizers", "tender_id"),
+    ("ix_tender_applications_tender_id", "tender_applications", "tender_id"),
+    ("ix_tender_applications_supplier_id", "tender_applications", "supplier_id"),
+]
+
+
+def upgrade():
+    for index_name, table_name, column_name in INDEXES:
+        if not has_index(table_name, index_name):
+            op.create_index(index_name, table_name, [column_name])
+
+
+def downgrade():
+    for index_name, table_name, _ in INDEXES:
+        op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,35 @@
+"""Время последнего обновления представлений аналитики
+
+Фоновое обновление запускается в каждом процессе gunicorn; по этой
+отметке процесс пропускает обновление, если другой процесс уже выполнил
+его в текущем периоде.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.utils import has_table
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if has_table("analytics_refreshes"):
+        return
+    op.create_table('analytics_refreshes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('analytics_refreshes')
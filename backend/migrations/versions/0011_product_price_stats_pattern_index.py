@@ -0,0 +1,35 @@
+"""Индекс для поиска по префиксу ключа товара в mv_product_price_stats
+
+Анализ цен ищет товары по префиксу product_key представления; индекс
+varchar_pattern_ops на tender_products.normalized_key для этого запроса
+не используется. Только для PostgreSQL.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+from migrations.utils import is_postgresql
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not is_postgresql():
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_mv_product_price_stats_product_key_pattern "
+        "ON mv_product_price_stats (product_key varchar_pattern_ops)"
+    )
+
+
+def downgrade():
+    if not is_postgresql():
+        return
+    op.execute("DROP INDEX IF EXISTS ix_mv_product_price_stats_product_key_pattern")
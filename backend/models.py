@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Numeric
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Numeric, Index, event, select, update
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 import enum
+import re
 
 
 class UserRole(str, enum.Enum):
@@ -91,6 +92,12 @@ class Tender(Base):
     okved_code = Column(String)  # Код ОКВЭД2
     region = Column(String)
     procurement_method = Column(String, default="auction")  # Способ закупки
+    # Счетчики дочерних записей, поддерживаются в той же транзакции (см. maintain_counter)
+    lots_count = Column(Integer, nullable=False, default=0, server_default="0")
+    products_count = Column(Integer, nullable=False, default=0, server_default="0")
+    documents_count = Column(Integer, nullable=False, default=0, server_default="0")
+    proposals_count = Column(Integer, nullable=False, default=0, server_default="0")
+    applications_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -107,7 +114,7 @@ class TenderLot(Base):
     __tablename__ = "tender_lots"
     
     id = Column(Integer, primary_key=True, index=True)
-    tender_id = Column(Integer, ForeignKey("tenders.id"))
+    tender_id = Column(Integer, ForeignKey("tenders.id"), index=True)
     lot_number = Column(Integer, nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text)
@@ -120,6 +127,7 @@ class TenderLot(Base):
     unit_of_measure = Column(String)  # Единица измерения
     okpd_code = Column(String)  # Код ОКПД2 для лота
     okved_code = Column(String)  # Код ОКВЭД2 для лота
+    products_count = Column(Integer, nullable=False, default=0, server_default="0")  # Счетчик товаров лота
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Связи
@@ -127,26 +135,55 @@ class TenderLot(Base):
     products = relationship("TenderProduct", back_populates="lot")
 
 
+def normalize_text(value: str) -> str:
+    """Нормализация текста для сравнения: регистр, ё, пунктуация, пробелы"""
+    if not value:
+        return ""
+    value = value.lower().replace("ё", "е")
+    return " ".join(re.sub(r"[^\w]+", " ", value).split())
+
+
+def normalize_product_key(name: str, unit_of_measure: str = None):
+    """Ключ товара для сопоставления между тендерами: название + единица измерения"""
+    if not name:
+        return None
+    return f"{normalize_text(name)}|{normalize_text(unit_of_measure)}"
+
+
 class TenderProduct(Base):
     __tablename__ = "tender_products"
+    __table_args__ = (
+        # varchar_pattern_ops позволяет использовать индекс и для поиска по префиксу (LIKE 'ключ%')
+        Index(
+            "ix_tender_products_normalized_key", "normalized_key",
+            postgresql_ops={"normalized_key": "varchar_pattern_ops"}
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    lot_id = Column(Integer, ForeignKey("tender_lots.id"))
+    lot_id = Column(Integer, ForeignKey("tender_lots.id"), index=True)
     position_number = Column(Integer)  # Номер позиции
     name = Column(String, nullable=False)  # Наименование товара
     quantity = Column(String)  # Количество
     unit_of_measure = Column(String)  # Единица измерения
+    normalized_key = Column(String)  # Нормализованный ключ товара для аналитики цен
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Связи
     lot = relationship("TenderLot", back_populates="products")
 
 
+@event.listens_for(TenderProduct, "before_insert")
+@event.listens_for(TenderProduct, "before_update")
+def set_product_normalized_key(mapper, connection, target):
+    target.normalized_key = normalize_product_key(target.name, target.unit_of_measure)
+
+
 class TenderDocument(Base):
     __tablename__ = "tender_documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    tender_id = Column(Integer, ForeignKey("tenders.id"))
+    tender_id = Column(Integer, ForeignKey("tenders.id"), index=True)
     title = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
     file_size = Column(Integer)
@@ -161,7 +198,7 @@ class TenderOrganizer(Base):
     __tablename__ = "tender_organizers"
     
     id = Column(Integer, primary_key=True, index=True)
-    tender_id = Column(Integer, ForeignKey("tenders.id"))
+    tender_id = Column(Integer, ForeignKey("tenders.id"), index=True)
     organization_name = Column(String, nullable=False)
     legal_address = Column(Text)
     postal_address = Column(Text)
@@ -191,13 +228,32 @@ class TenderProcedureStage(Base):
     tender = relationship("Tender")
 
 
+class TenderSnapshot(Base):
+    """Сериализованная детальная карточка тендера, выдаваемая без сборки графа"""
+    __tablename__ = "tender_snapshots"
+    
+    tender_id = Column(Integer, ForeignKey("tenders.id", ondelete="CASCADE"), primary_key=True)
+    tender_updated_at = Column(DateTime(timezone=True))  # Версия тендера, по которой построен снимок
+    etag = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON карточки тендера
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class AnalyticsRefresh(Base):
+    """Время последнего обновления представлений аналитики, общее для всех процессов"""
+    __tablename__ = "analytics_refreshes"
+    
+    id = Column(Integer, primary_key=True)
+    refreshed_at = Column(DateTime(timezone=True), nullable=False)
+
+
 class TenderApplication(Base):
     __tablename__ = "tender_applications"
     
     id = Column(Integer, primary_key=True, index=True)
-    tender_id = Column(Integer, ForeignKey("tenders.id"))
+    tender_id = Column(Integer, ForeignKey("tenders.id"), index=True)
     lot_id = Column(Integer, ForeignKey("tender_lots.id"), nullable=True)
-    supplier_id = Column(Integer, ForeignKey("users.id"))
+    supplier_id = Column(Integer, ForeignKey("users.id"), index=True)
     proposed_price = Column(Numeric(20, 2))
     comment = Column(Text)
     status = Column(String, default="submitted")  # submitted, accepted, rejected
@@ -214,8 +270,8 @@ class SupplierProposal(Base):
     __tablename__ = "supplier_proposals"
     
     id = Column(Integer, primary_key=True, index=True)
-    tender_id = Column(Integer, ForeignKey("tenders.id"))
-    supplier_id = Column(Integer, ForeignKey("users.id"))
+    tender_id = Column(Integer, ForeignKey("tenders.id"), index=True)
+    supplier_id = Column(Integer, ForeignKey("users.id"), index=True)
     prepayment_percent = Column(Numeric(5, 2), default=0)  # Размер предоплаты в процентах
     currency = Column(String, default="RUB")  # Валюта предложения
     vat_percent = Column(Numeric(5, 2), default=20)  # НДС в процентах
@@ -232,10 +288,14 @@ class SupplierProposal(Base):
 
 class ProposalItem(Base):
     __tablename__ = "proposal_items"
+    __table_args__ = (
+        # Позиция товара в предложении одна - по этому ключу выполняется upsert
+        Index("ux_proposal_items_proposal_product", "proposal_id", "product_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    proposal_id = Column(Integer, ForeignKey("supplier_proposals.id"))
-    product_id = Column(Integer, ForeignKey("tender_products.id"))
+    proposal_id = Column(Integer, ForeignKey("supplier_proposals.id"), index=True)
+    product_id = Column(Integer, ForeignKey("tender_products.id"), index=True)
     is_available = Column(Boolean, default=True)  # Тогл наличия товара
     is_analog = Column(Boolean, default=False)  # Тогл оригинал/аналог
     price_per_unit = Column(Numeric(20, 2))  # Цена за единицу
@@ -247,3 +307,45 @@ class ProposalItem(Base):
     # Связи
     proposal = relationship("SupplierProposal", back_populates="proposal_items")
     product = relationship("TenderProduct")
+
+
+def change_counter(connection, parent, parent_id, column_name: str, delta: int):
+    """Атомарно изменяет счетчик родительской записи"""
+    if parent_id is None:
+        return
+    table = parent.__table__
+    values = {column_name: table.c[column_name] + delta}
+    if "updated_at" in table.c:
+        values["updated_at"] = table.c.updated_at  # Счетчик не является изменением записи
+    connection.execute(update(table).where(table.c.id == parent_id).values(**values))
+
+
+def maintain_counter(child, parent, column_name: str, parent_id):
+    """
+    Поддерживает счетчик дочерних записей при вставке и удалении через ORM.
+
+    Массовые операции (query.delete, insert()) события не вызывают - после
+    них счетчики пересчитываются через counters.reconcile_counters.
+    """
+    @event.listens_for(child, "after_insert")
+    def increment(mapper, connection, target):
+        change_counter(connection, parent, parent_id(target), column_name, 1)
+
+    @event.listens_for(child, "after_delete")
+    def decrement(mapper, connection, target):
+        change_counter(connection, parent, parent_id(target), column_name, -1)
+
+
+def lot_tender_id(target):
+    """ID тендера товара через его лот"""
+    if target.lot_id is None:
+        return None
+    return select(TenderLot.tender_id).where(TenderLot.id == target.lot_id).scalar_subquery()
+
+
+maintain_counter(TenderLot, Tender, "lots_count", lambda target: target.tender_id)
+maintain_counter(TenderProduct, TenderLot, "products_count", lambda target: target.lot_id)
+maintain_counter(TenderProduct, Tender, "products_count", lot_tender_id)
+maintain_counter(TenderDocument, Tender, "documents_count", lambda target: target.tender_id)
+maintain_counter(SupplierProposal, Tender, "proposals_count", lambda target: target.tender_id)
+maintain_counter(TenderApplication, Tender, "applications_count", lambda target: target.tender_id)
@@ -0,0 +1,230 @@
+"""
+Профилирование отдельных HTTP-запросов.
+
+ProfilingMiddleware включается настройкой profiling_enabled и профилирует:
+- запрос администратора с заголовком X-Profile или параметром ?profile=
+  (html, speedscope, text - вернуть профиль вместо ответа; store - вернуть
+  обычный ответ и сохранить профиль в profiling_dir);
+- долю profiling_sample_percent всех запросов - профили сохраняются.
+
+Профиль строит pyinstrument, если он установлен: в асинхронном режиме он
+учитывает только задачу профилируемого запроса. Без него используется
+cProfile, который видит весь код потока цикла событий (в том числе
+параллельные запросы), а вывод доступен только в виде текста и файла .prof.
+В процессе одновременно профилируется один запрос.
+
+Время запроса делится на SQL (по статистике query_stats) и остальное -
+Python и ожидание; разбивка попадает в заголовки X-Profile-*, текстовый
+профиль и журнал.
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import Request, Response
+from jose import JWTError, jwt
+
+from auth import ALGORITHM, SECRET_KEY
+from config import settings
+from database import SessionLocal
+from metrics import route_template
+from models import User, UserRole
+from query_stats import current_query_stats
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_FORMATS = ("html", "speedscope", "text")
+_UNSAFE_CHARS = re.compile(r"[^\w.-]+")
+
+_active = False  # Профиль уже снимается в этом процессе
+
+
+class PyinstrumentProfile:
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.profiler = Profiler(async_mode="enabled")
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+
+    def render(self, output_format: str, summary: str):
+        """Содержимое и тип профиля для ответа"""
+        if output_format == "speedscope":
+            from pyinstrument.renderers import SpeedscopeRenderer
+            return self.profiler.output(SpeedscopeRenderer()), "application/json"
+        if output_format == "text":
+            return summary + "\n\n" + self.profiler.output_text(unicode=True), "text/plain; charset=utf-8"
+        return self.profiler.output_html(), "text/html; charset=utf-8"
+
+    def save(self, path: str) -> str:
+        """Сохраняет профиль в формате profiling_format; возвращает имя файла"""
+        if settings.profiling_format == "speedscope":
+            path += ".speedscope.json"
+            content, _ = self.render("speedscope", "")
+        else:
+            path += ".html"
+            content, _ = self.render("html", "")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+
+class CProfileProfile:
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def render(self, output_format: str, summary: str):
+        # HTML и speedscope строит только pyinstrument
+        stream = io.StringIO()
+        stream.write(summary + "\n\n")
+        pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(60)
+        return stream.getvalue(), "text/plain; charset=utf-8"
+
+    def save(self, path: str) -> str:
+        # Файл для snakeviz или python -m pstats
+        path += ".prof"
+        self.profiler.dump_stats(path)
+        return path
+
+
+def create_profile():
+    try:
+        return PyinstrumentProfile()
+    except ImportError:
+        return CProfileProfile()
+
+
+def _bearer_email(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+def _is_admin(email: str) -> bool:
+    db = SessionLocal()
+    try:
+        user = db.query(User.role, User.is_active).filter(User.email == email).first()
+        return user is not None and user.is_active and user.role == UserRole.ADMIN
+    finally:
+        db.close()
+
+
+async def requested_format(request: Request) -> Optional[str]:
+    """Формат профиля из X-Profile или ?profile=, если запрос сделал администратор"""
+    value = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not value:
+        return None
+    email = _bearer_email(request)
+    if email is None or not await asyncio.to_thread(_is_admin, email):
+        return None
+    value = value.lower()
+    return value if value in RESPONSE_FORMATS else "store"
+
+
+def profile_path(scope) -> str:
+    """Путь файла профиля без расширения: время, метод и шаблон маршрута"""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%f")
+    route = _UNSAFE_CHARS.sub("_", route_template(scope).strip("/")) or "root"
+    return os.path.join(settings.profiling_dir, f"{stamp}-{scope['method']}-{route}")
+
+
+class ProfilingMiddleware:
+    """Профиль запроса по запросу администратора или выборочно; подключается внутри QueryStatsMiddleware"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _active
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        output_format = await requested_format(Request(scope))
+        if output_format is None and random.random() * 100 < settings.profiling_sample_percent:
+            output_format = "store"
+        if output_format is None or _active:
+            await self.app(scope, receive, send)
+            return
+
+        replace_response = output_format in RESPONSE_FORMATS
+        status = 500
+
+        async def send_or_discard(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if not replace_response:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile", b"stored"))
+                    message = {**message, "headers": headers}
+            if not replace_response:
+                await send(message)
+
+        stats = current_query_stats()
+        sql_before = stats.duration if stats else 0.0
+        queries_before = stats.count if stats else 0
+
+        _active = True
+        profile = create_profile()
+        start = time.perf_counter()
+        profile.start()
+        try:
+            await self.app(scope, receive, send_or_discard)
+        finally:
+            profile.stop()
+            _active = False
+            total = time.perf_counter() - start
+
+        sql = (stats.duration - sql_before) if stats else 0.0
+        queries = (stats.count - queries_before) if stats else 0
+        summary = (
+            f"{scope['method']} {scope['path']} -> {status}: всего {total * 1000:.1f} мс, "
+            f"SQL {sql * 1000:.1f} мс (запросов: {queries}), Python и ожидание {(total - sql) * 1000:.1f} мс"
+        )
+        split = {
+            "x-profile-total-ms": f"{total * 1000:.1f}",
+            "x-profile-sql-ms": f"{sql * 1000:.1f}",
+            "x-profile-python-ms": f"{(total - sql) * 1000:.1f}",
+        }
+
+        if replace_response:
+            content, media_type = profile.render(output_format, summary)
+            logger.info("Профиль %s", summary)
+            await Response(content, media_type=media_type, headers=split)(scope, receive, send)
+            return
+
+        try:
+            os.makedirs(settings.profiling_dir, exist_ok=True)
+            path = profile.save(profile_path(scope))
+        except OSError as e:
+            logger.warning("Не удалось сохранить профиль %s: %s", summary, e)
+            return
+        logger.info(
+            "Профиль %s: %s", summary, path,
+            extra={"profile_path": path, "profile_total_ms": round(total * 1000, 1),
+                   "profile_sql_ms": round(sql * 1000, 1)}
+        )
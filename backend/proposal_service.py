@@ -0,0 +1,189 @@
+"""
+Запись предложений поставщиков.
+
+Общий код для всех эндпоинтов, создающих и изменяющих предложения:
+позиции проверяются одним запросом по товарам лотов тендера и
+вставляются одной многострочной командой INSERT. При сохранении
+изменяются только отличающиеся позиции: upsert по (proposal_id, product_id)
+через INSERT ... ON CONFLICT DO UPDATE и удаление исключенных товаров.
+"""
+
+from typing import List
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, insert, or_
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from models import Tender, TenderStatus, TenderLot, TenderProduct, SupplierProposal, ProposalItem
+from schemas import ProposalItemCreate
+
+# Поля позиции, которые задает поставщик
+ITEM_FIELDS = ("is_available", "is_analog", "price_per_unit", "delivery_days", "comment")
+
+
+def _item_error(location: str, index: int, field: str, message: str, value) -> dict:
+    """Ошибка позиции в формате ошибок валидации FastAPI"""
+    return {
+        "loc": ["body", location, index, field],
+        "msg": message,
+        "type": "value_error",
+        "input": value
+    }
+
+
+def validate_proposal_items(db: Session, tender_id: int, items: List[ProposalItemCreate],
+                            location: str = "proposal_items"):
+    """
+    Проверяет позиции предложения.
+
+    Все товары проверяются одним запросом с IN по товарам лотов тендера.
+    При ошибках выбрасывает 422 со списком ошибок по каждой позиции.
+    """
+    product_ids = {item.product_id for item in items}
+    tender_product_ids = set()
+    if product_ids:
+        tender_product_ids = {
+            product_id for (product_id,) in db.query(TenderProduct.id).join(
+                TenderLot, TenderProduct.lot_id == TenderLot.id
+            ).filter(
+                TenderLot.tender_id == tender_id,
+                TenderProduct.id.in_(product_ids)
+            )
+        }
+
+    errors = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        if item.product_id not in tender_product_ids:
+            errors.append(_item_error(location, index, "product_id", f"Товар с ID {item.product_id} не найден в тендере", item.product_id))
+        elif item.product_id in seen_ids:
+            errors.append(_item_error(location, index, "product_id", f"Товар с ID {item.product_id} указан несколько раз", item.product_id))
+        seen_ids.add(item.product_id)
+
+        if item.price_per_unit is not None and item.price_per_unit < 0:
+            errors.append(_item_error(location, index, "price_per_unit", "Цена не может быть отрицательной", str(item.price_per_unit)))
+        if item.delivery_days is not None and item.delivery_days < 0:
+            errors.append(_item_error(location, index, "delivery_days", "Срок поставки не может быть отрицательным", item.delivery_days))
+
+    if errors:
+        raise HTTPException(status_code=422, detail=errors)
+
+
+def insert_proposal_items(db: Session, proposal_id: int, items: List[ProposalItemCreate]):
+    """Вставляет позиции предложения одной многострочной командой"""
+    if not items:
+        return
+    db.execute(insert(ProposalItem), _item_rows(proposal_id, items))
+
+
+def _item_rows(proposal_id: int, items: List[ProposalItemCreate]) -> List[dict]:
+    return [
+        {"proposal_id": proposal_id, "product_id": item.product_id,
+         **{field: getattr(item, field) for field in ITEM_FIELDS}}
+        for item in items
+    ]
+
+
+def upsert_proposal_items(db: Session, proposal: SupplierProposal, items: List[ProposalItemCreate]) -> int:
+    """
+    Сохраняет позиции одной командой INSERT ... ON CONFLICT DO UPDATE.
+
+    Существующая позиция перезаписывается, только если ее значения
+    отличаются, поэтому неизмененные строки не трогаются. Возвращает
+    число вставленных или измененных позиций.
+    """
+    if not items:
+        return 0
+    statement = dialect_insert(db)(ProposalItem).values(_item_rows(proposal.id, items))
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[ProposalItem.proposal_id, ProposalItem.product_id],
+        set_={**{field: excluded[field] for field in ITEM_FIELDS}, "updated_at": func.now()},
+        where=or_(*[
+            getattr(ProposalItem, field).is_distinct_from(excluded[field]) for field in ITEM_FIELDS
+        ])
+    )
+    return db.execute(statement).rowcount
+
+
+def delete_proposal_items(db: Session, proposal: SupplierProposal, product_ids: List[int], keep: bool = False) -> int:
+    """Удаляет позиции по товарам (или, при keep=True, все позиции кроме указанных)"""
+    criteria = [ProposalItem.proposal_id == proposal.id]
+    if keep:
+        if product_ids:
+            criteria.append(ProposalItem.product_id.notin_(product_ids))
+    elif product_ids:
+        criteria.append(ProposalItem.product_id.in_(product_ids))
+    else:
+        return 0
+    return db.query(ProposalItem).filter(*criteria).delete(synchronize_session=False)
+
+
+def create_proposal(db: Session, tender_id: int, supplier_id: int, proposal_data) -> SupplierProposal:
+    """Создает предложение поставщика с позициями в одной транзакции"""
+
+    # Проверяем, что тендер существует и опубликован
+    tender = db.query(Tender).filter(Tender.id == tender_id).first()
+    if not tender:
+        raise HTTPException(
+            status_code=404,
+            detail="Тендер не найден"
+        )
+
+    if tender.status != TenderStatus.PUBLISHED:
+        raise HTTPException(
+            status_code=400,
+            detail="Нельзя подавать предложения на неопубликованные тендеры"
+        )
+
+    # Проверяем, что у поставщика еще нет предложения на этот тендер
+    existing_proposal = db.query(SupplierProposal.id).filter(
+        and_(
+            SupplierProposal.tender_id == tender_id,
+            SupplierProposal.supplier_id == supplier_id
+        )
+    ).first()
+
+    if existing_proposal:
+        raise HTTPException(
+            status_code=400,
+            detail="У вас уже есть предложение на этот тендер"
+        )
+
+    validate_proposal_items(db, tender_id, proposal_data.proposal_items)
+
+    db_proposal = SupplierProposal(
+        tender_id=tender_id,
+        supplier_id=supplier_id,
+        prepayment_percent=proposal_data.prepayment_percent,
+        currency=proposal_data.currency,
+        vat_percent=proposal_data.vat_percent,
+        general_comment=proposal_data.general_comment,
+        status="draft"
+    )
+    db.add(db_proposal)
+    db.flush()  # Получаем ID предложения
+
+    insert_proposal_items(db, db_proposal.id, proposal_data.proposal_items)
+
+    db.commit()
+    db.refresh(db_proposal)
+    return db_proposal
+
+
+def replace_proposal_items(db: Session, proposal: SupplierProposal, items: List[ProposalItemCreate]):
+    """Приводит позиции предложения к переданному списку, изменяя только разницу"""
+    validate_proposal_items(db, proposal.tender_id, items)
+    delete_proposal_items(db, proposal, [item.product_id for item in items], keep=True)
+    upsert_proposal_items(db, proposal, items)
+
+
+def patch_proposal_items(db: Session, proposal: SupplierProposal, items: List[ProposalItemCreate],
+                         removed_product_ids: List[int]) -> dict:
+    """Применяет изменения позиций: upsert переданных и удаление исключенных товаров"""
+    validate_proposal_items(db, proposal.tender_id, items, location="items")
+    return {
+        "updated": upsert_proposal_items(db, proposal, items),
+        "removed": delete_proposal_items(db, proposal, removed_product_ids)
+    }
@@ -0,0 +1,203 @@
+"""
+Число и время SQL-запросов в рамках HTTP-запроса.
+
+QueryStatsMiddleware открывает статистику на время запроса, а события
+движка дописывают в нее каждый выполненный запрос. Статистика хранится в
+контекстной переменной: синхронный код, который FastAPI выполняет в пуле
+потоков, получает копию контекста с тем же объектом.
+
+По итогам запроса:
+- по настройке db_stats_headers ответ получает заголовки X-DB-Queries и
+  X-DB-Time (мс);
+- запросы с большим числом SQL-запросов или с медленными запросами
+  попадают в журнал вместе с самыми медленными запросами (SQL без значений
+  параметров);
+- медленный SELECT в PostgreSQL по настройке дополнительно записывается в
+  журнал с планом EXPLAIN ANALYZE.
+"""
+
+import heapq
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+
+from config import settings
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0  # Суммарное время выполнения, сек
+    slow_count: int = 0
+    slowest: List[Tuple[float, str]] = field(default_factory=list)  # Куча (время, SQL) из db_slowest_top_n
+
+    def add(self, duration: float, statement: str):
+        self.count += 1
+        self.duration += duration
+        if len(self.slowest) < settings.db_slowest_top_n:
+            heapq.heappush(self.slowest, (duration, statement))
+        elif self.slowest and duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, statement))
+
+    def top(self) -> List[dict]:
+        """Самые медленные запросы, от медленного к быстрому"""
+        return [
+            {"sql": normalize_sql(statement), "ms": round(duration * 1000, 1)}
+            for duration, statement in sorted(self.slowest, reverse=True)
+        ]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\?|\$\d+|(?<![:\w]):\w+")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROW_LIST = re.compile(r"(\(\?(?:, \.\.\.)?\))(?:\s*,\s*\(\?(?:, \.\.\.)?\))+")
+_SPACES = re.compile(r"\s+")
+_SELECT = re.compile(r"\s*SELECT\b", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL без значений параметров и списков: одинаковые запросы дают одну строку"""
+    statement = _SPACES.sub(" ", statement).strip()
+    statement = _PARAMETER.sub("?", statement)
+    statement = _PARAMETER_LIST.sub("(?, ...)", statement)
+    return _ROW_LIST.sub(r"\1, ...", statement)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def start_query_stats():
+    """Начинает сбор статистики; возвращает статистику и токен для stop_query_stats"""
+    stats = QueryStats()
+    return stats, _current.set(stats)
+
+
+def stop_query_stats(token):
+    _current.reset(token)
+
+
+def explain_analyze(conn, statement: str, parameters) -> str:
+    """
+    План выполнения запроса с фактическими временами.
+
+    Запрос выполняется повторно внутри точки сохранения, которая всегда
+    откатывается: ни результат, ни ошибка EXPLAIN не остаются в транзакции
+    запроса.
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT explain_slow_query")
+        try:
+            cursor.execute("EXPLAIN ANALYZE " + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            plan = f"EXPLAIN не выполнен: {e}"
+        cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+        cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+        return plan
+    finally:
+        cursor.close()
+
+
+def _is_select(statement: str) -> bool:
+    # EXPLAIN ANALYZE выполняет запрос: повторяется только простой SELECT,
+    # WITH может содержать изменяющие данные подзапросы
+    return _SELECT.match(statement) is not None
+
+
+def log_slow_query(conn, statement: str, parameters, duration: float, executemany: bool):
+    message = "Медленный SQL-запрос %.1f мс: %s"
+    args = [duration * 1000, normalize_sql(statement)]
+    if (
+        settings.db_explain_slow_queries
+        and conn.dialect.name == "postgresql"
+        and not executemany
+        and _is_select(statement)
+    ):
+        message += "\n%s"
+        args.append(explain_analyze(conn, statement, parameters))
+    logger.warning(message, *args)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.add(duration, statement)
+
+    if settings.db_slow_query_ms > 0 and duration * 1000 >= settings.db_slow_query_ms:
+        if stats is not None:
+            stats.slow_count += 1
+        log_slow_query(conn, statement, parameters, duration, executemany)
+
+
+@event.listens_for(engine, "handle_error")
+def _handle_error(context):
+    # after_cursor_execute для упавшего запроса не вызывается
+    connection = context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+class QueryStatsMiddleware:
+    """Сбор статистики SQL-запросов на HTTP-запрос; подключается внутри AccessLogMiddleware и MetricsMiddleware"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_query_stats()
+        # Для журнала доступа и метрик во внешних AccessLogMiddleware и MetricsMiddleware
+        scope["query_stats"] = stats
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.db_stats_headers:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.count).encode("latin-1")))
+                headers.append((b"x-db-time", f"{stats.duration * 1000:.1f}".encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            stop_query_stats(token)
+            self.log_request(scope, stats)
+
+    def log_request(self, scope, stats: QueryStats):
+        noisy = stats.slow_count or (
+            settings.db_request_queries_warn > 0 and stats.count > settings.db_request_queries_warn
+        )
+        level = logging.WARNING if noisy else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(
+            level, "SQL-запросы %s %s: %d за %.1f мс",
+            scope["method"], scope["path"], stats.count, stats.duration * 1000,
+            extra={
+                "db_queries": stats.count,
+                "db_time_ms": round(stats.duration * 1000, 1),
+                "db_slow_queries": stats.slow_count,
+                "db_slowest": stats.top(),
+            }
+        )
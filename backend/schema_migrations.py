@@ -0,0 +1,89 @@
+"""
+Миграции схемы базы данных (Alembic) и проверка ревизии при старте.
+
+Схема изменяется только ревизиями из migrations/versions:
+    python3 schema_migrations.py        - обновить базу до последней ревизии
+    alembic revision -m "описание"      - новая ревизия (из каталога backend)
+
+Рабочие процессы API схему не меняют: при старте они сравнивают ревизию
+в alembic_version с HEAD_REVISION - один запрос по ключу вместо отражения
+всей схемы через create_all. Alembic при этом не импортируется: он нужен
+только для обновления базы. Новая ревизия меняет и HEAD_REVISION (тест
+сверяет его с migrations/versions). Базы, созданные create_all до
+перехода на Alembic, при первом обновлении помечаются исходной ревизией
+и доводятся следующими.
+
+Запуск: python3 schema_migrations.py
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import inspect, text
+
+from database import engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+BASELINE_REVISION = "0001"
+HEAD_REVISION = "0011"  # Последняя ревизия в migrations/versions
+MIGRATION_LOCK_KEY = 726002
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+@lru_cache()
+def head_revision() -> str:
+    """Последняя ревизия из migrations/versions"""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def current_revision(connection) -> Optional[str]:
+    """Ревизия, до которой обновлена база; None, если миграции не применялись"""
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def check_schema_revision(bind=engine):
+    """Проверяет, что база обновлена до ревизии, с которой работает код"""
+    with bind.connect() as connection:
+        current = current_revision(connection)
+    expected = HEAD_REVISION
+    if current != expected:
+        raise RuntimeError(
+            f"Схема базы данных в ревизии {current or '(нет)'}, код ожидает {expected}. "
+            "Обновите базу: python3 schema_migrations.py"
+        )
+
+
+def upgrade_database(bind=engine):
+    """Обновляет базу до последней ревизии в одной транзакции"""
+    from alembic import command
+
+    with bind.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Одновременный запуск из нескольких процессов выполняется по очереди
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+        config = alembic_config(connection)
+        if current_revision(connection) is None and inspect(connection).has_table("tenders"):
+            command.stamp(config, BASELINE_REVISION)
+            print(f"✓ База создана до перехода на Alembic, помечена ревизией {BASELINE_REVISION}")
+        command.upgrade(config, "head")
+    print(f"✓ Схема базы данных в ревизии {head_revision()}")
+
+
+if __name__ == "__main__":
+    print("Обновление схемы базы данных...")
+    upgrade_database()
+    print("Миграция завершена!")
@@ -227,6 +227,19 @@ class SupplierProposalUpdate(BaseModel):
     general_comment: Optional[str] = None
     proposal_items: Optional[List[ProposalItemCreate]] = None
 
+class ProposalItemsPatch(BaseModel):
+    """Изменения позиций предложения: сохраняемые позиции и удаляемые товары"""
+    items: List[ProposalItemCreate] = []
+    removed_product_ids: List[int] = []
+
+class TenderProposalCreate(BaseModel):
+    """Предложение, подаваемое со страницы тендера (тендер указан в пути)"""
+    prepayment_percent: Decimal = Decimal('0')
+    currency: str = "RUB"
+    vat_percent: Decimal = Decimal('20')
+    general_comment: Optional[str] = None
+    proposal_items: List[ProposalItemCreate] = []
+
 class SupplierProposal(SupplierProposalBase):
     id: int
     supplier_id: int
@@ -0,0 +1,12 @@
+#!/bin/sh
+# Запуск backend в контейнере: миграции схемы, затем сервер приложения
+set -e
+
+python3 schema_migrations.py
+
+if [ "$BUILD_ENV" = "production" ]; then
+    # Несколько процессов uvicorn под надзором gunicorn (настройки в gunicorn.conf.py)
+    exec gunicorn -c gunicorn.conf.py main:app
+fi
+
+exec uvicorn main:app --host 0.0.0.0 --port 8000 --reload
@@ -0,0 +1,177 @@
+"""
+Сравнение предложений поставщиков по тендеру.
+
+Итоги по предложениям и распределение цен по позициям считаются в базе
+двумя агрегирующими запросами - их число не зависит ни от количества
+поставщиков, ни от количества позиций тендера.
+"""
+
+from sqlalchemy import and_, case, cast, func, literal, Numeric
+from sqlalchemy.orm import Session
+
+from cache import VersionedCache, proposals_version
+from models import (
+    Tender, TenderLot, TenderProduct, SupplierProposal, ProposalItem, User as UserModel
+)
+
+# Результат сравнения по тендеру до изменения его предложений
+comparison_cache = VersionedCache("tender_comparison", maxsize=128)
+
+PRICED_ITEM = and_(ProposalItem.is_available == True, ProposalItem.price_per_unit.isnot(None))
+
+
+def quantity_value(dialect_name: str):
+    """Количество позиции числом: первое число из строки, по умолчанию 1"""
+    if dialect_name == 'postgresql':
+        # Группа без захвата: substring с захватывающей группой вернул бы только ее
+        number = func.substring(func.replace(TenderProduct.quantity, ',', '.'), r'[0-9]+(?:\.[0-9]+)?')
+    else:
+        number = func.replace(TenderProduct.quantity, ',', '.')
+    return func.coalesce(cast(number, Numeric), 1)
+
+
+def vat_factor():
+    return 1 + func.coalesce(SupplierProposal.vat_percent, 0) / 100
+
+
+def _proposals_summary(db: Session, tender_id: int, dialect_name: str):
+    """Итоги по каждому предложению и место по стоимости с НДС"""
+    line_total = ProposalItem.price_per_unit * quantity_value(dialect_name)
+
+    item_totals = db.query(
+        ProposalItem.proposal_id.label('proposal_id'),
+        func.sum(case((PRICED_ITEM, line_total))).label('total_price'),
+        func.count(case((PRICED_ITEM, 1))).label('available_items'),
+        func.count(case((ProposalItem.is_analog == True, 1))).label('analog_items'),
+        func.count(ProposalItem.id).label('total_items')
+    ).join(
+        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
+    ).outerjoin(
+        TenderProduct, ProposalItem.product_id == TenderProduct.id
+    ).filter(
+        SupplierProposal.tender_id == tender_id
+    ).group_by(ProposalItem.proposal_id).subquery('item_totals')
+
+    total_with_vat = item_totals.c.total_price * vat_factor()
+    price_rank = func.rank().over(order_by=total_with_vat.asc().nulls_last())
+
+    return db.query(
+        SupplierProposal,
+        UserModel.full_name,
+        UserModel.email,
+        func.coalesce(item_totals.c.total_price, 0).label('total_price'),
+        func.coalesce(total_with_vat, 0).label('total_price_with_vat'),
+        func.coalesce(item_totals.c.available_items, 0).label('available_items'),
+        func.coalesce(item_totals.c.analog_items, 0).label('analog_items'),
+        func.coalesce(item_totals.c.total_items, 0).label('total_items'),
+        price_rank.label('rank')
+    ).outerjoin(
+        item_totals, item_totals.c.proposal_id == SupplierProposal.id
+    ).outerjoin(
+        UserModel, UserModel.id == SupplierProposal.supplier_id
+    ).filter(
+        SupplierProposal.tender_id == tender_id
+    ).order_by(price_rank, SupplierProposal.id).all()
+
+
+def _products_distribution(db: Session, tender_id: int, dialect_name: str):
+    """Минимальная, медианная и максимальная цена за единицу с НДС по каждой позиции"""
+    offers = db.query(
+        ProposalItem.product_id.label('product_id'),
+        (ProposalItem.price_per_unit * vat_factor()).label('unit_price')
+    ).join(
+        SupplierProposal, ProposalItem.proposal_id == SupplierProposal.id
+    ).filter(
+        SupplierProposal.tender_id == tender_id,
+        PRICED_ITEM
+    ).subquery('offers')
+
+    if dialect_name == 'postgresql':
+        median = func.percentile_cont(0.5).within_group(offers.c.unit_price)
+    else:
+        median = literal(None)
+
+    return db.query(
+        TenderProduct.id,
+        TenderProduct.lot_id,
+        TenderLot.lot_number,
+        TenderProduct.position_number,
+        TenderProduct.name,
+        TenderProduct.quantity,
+        TenderProduct.unit_of_measure,
+        func.count(offers.c.unit_price).label('offers_count'),
+        func.min(offers.c.unit_price).label('min_price'),
+        median.label('median_price'),
+        func.max(offers.c.unit_price).label('max_price')
+    ).join(
+        TenderLot, TenderProduct.lot_id == TenderLot.id
+    ).outerjoin(
+        offers, offers.c.product_id == TenderProduct.id
+    ).filter(
+        TenderLot.tender_id == tender_id
+    ).group_by(
+        TenderProduct.id, TenderProduct.lot_id, TenderLot.lot_number, TenderProduct.position_number,
+        TenderProduct.name, TenderProduct.quantity, TenderProduct.unit_of_measure
+    ).order_by(TenderLot.lot_number, TenderProduct.position_number, TenderProduct.id).all()
+
+
+def _to_float(value):
+    return float(value) if value is not None else None
+
+
+def compare_tender_proposals(db: Session, tender: Tender) -> dict:
+    """Сравнение предложений по тендеру с кэшированием до изменения предложений"""
+    version = (tender.updated_at,) + proposals_version(db, SupplierProposal.tender_id == tender.id)
+    cached = comparison_cache.get(tender.id, version)
+    if cached is not None:
+        return cached
+
+    dialect_name = db.get_bind().dialect.name
+
+    proposals_data = []
+    for row in _proposals_summary(db, tender.id, dialect_name):
+        proposal = row.SupplierProposal
+        proposals_data.append({
+            "proposal_id": proposal.id,
+            "supplier_id": proposal.supplier_id,
+            "supplier_name": row.full_name if row.full_name else "Неизвестно",
+            "supplier_email": row.email if row.email else "",
+            "status": proposal.status,
+            "prepayment_percent": float(proposal.prepayment_percent or 0),
+            "currency": proposal.currency,
+            "vat_percent": float(proposal.vat_percent or 0),
+            "total_price": float(row.total_price),
+            "total_price_with_vat": float(row.total_price_with_vat),
+            "rank": row.rank,
+            "available_items": row.available_items,
+            "analog_items": row.analog_items,
+            "total_items": row.total_items,
+            "created_at": proposal.created_at,
+            "updated_at": proposal.updated_at
+        })
+
+    products_data = []
+    for row in _products_distribution(db, tender.id, dialect_name):
+        products_data.append({
+            "product_id": row.id,
+            "lot_id": row.lot_id,
+            "lot_number": row.lot_number,
+            "position_number": row.position_number,
+            "name": row.name,
+            "quantity": row.quantity,
+            "unit_of_measure": row.unit_of_measure,
+            "offers_count": row.offers_count,
+            "min_price": _to_float(row.min_price),
+            "median_price": _to_float(row.median_price),
+            "max_price": _to_float(row.max_price)
+        })
+
+    result = {
+        "tender_id": tender.id,
+        "tender_title": tender.title,
+        "proposals_count": len(proposals_data),
+        "proposals": proposals_data,
+        "products": products_data
+    }
+    comparison_cache.set(tender.id, version, result)
+    return result
@@ -0,0 +1,91 @@
+"""
+Снимки детальной карточки тендера.
+
+Карточка (тендер с лотами, товарами, документами и организаторами)
+сериализуется один раз на версию тендера и хранится в tender_snapshots
+вместе с ETag. Чтение - один запрос по ключу; снимок пересобирается
+эндпоинтами записи тендера, а если тендер изменился в обход них
+(его updated_at не совпадает с версией снимка) - при первом чтении.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from database import dialect_insert
+from http_cache import conditional_response, cache_headers
+from metrics import count_cache
+from models import Tender, TenderSnapshot, TenderStatus
+from schemas import Tender as TenderSchema
+from tender_writer import load_tender_graph
+
+
+class Snapshot(NamedTuple):
+    status: TenderStatus
+    etag: str
+    payload: str
+    last_modified: Optional[datetime]
+
+
+def build_tender_snapshot(db: Session, tender_id: int) -> Optional[Snapshot]:
+    """Сериализует карточку тендера и сохраняет снимок (в транзакции сессии)"""
+    # Снимок строится по состоянию в базе, а не по измененным объектам сессии
+    db.flush()
+    db.expire_all()
+    tender = load_tender_graph(db, tender_id)
+    if tender is None:
+        return None
+
+    payload = json.dumps(
+        TenderSchema.model_validate(tender).model_dump(mode="json"),
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    etag = '"' + hashlib.sha1(payload.encode("utf-8")).hexdigest() + '"'
+
+    values = {"tender_updated_at": tender.updated_at, "etag": etag, "payload": payload}
+    statement = dialect_insert(db)(TenderSnapshot).values(tender_id=tender_id, **values)
+    db.execute(statement.on_conflict_do_update(index_elements=[TenderSnapshot.tender_id], set_=values))
+    return Snapshot(tender.status, etag, payload, tender.updated_at or tender.created_at)
+
+
+def get_tender_snapshot(db: Session, tender_id: int) -> Optional[Snapshot]:
+    """Актуальный снимок карточки тендера; None, если тендер не найден"""
+    row = db.query(
+        Tender.status,
+        Tender.updated_at,
+        Tender.created_at,
+        TenderSnapshot.tender_updated_at,
+        TenderSnapshot.etag,
+        TenderSnapshot.payload
+    ).outerjoin(
+        TenderSnapshot, TenderSnapshot.tender_id == Tender.id
+    ).filter(Tender.id == tender_id).first()
+
+    if row is None:
+        return None
+    fresh = row.etag is not None and row.tender_updated_at == row.updated_at
+    count_cache("tender_snapshot", fresh)
+    if fresh:
+        return Snapshot(row.status, row.etag, row.payload, row.updated_at or row.created_at)
+
+    snapshot = build_tender_snapshot(db, tender_id)
+    db.commit()
+    return snapshot
+
+
+def snapshot_response(request: Request, snapshot: Snapshot) -> Response:
+    """Ответ с готовым JSON снимка без повторной сериализации (или 304)"""
+    not_modified = conditional_response(request, snapshot.etag, snapshot.last_modified)
+    if not_modified:
+        return not_modified
+    return Response(
+        content=snapshot.payload,
+        media_type="application/json",
+        headers=cache_headers(request, snapshot.etag, snapshot.last_modified)
+    )
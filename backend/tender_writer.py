@@ -0,0 +1,243 @@
+"""
+Запись тендера вместе с дочерними записями.
+
+Граф тендера (тендер -> лоты -> товары, организаторы, документы)
+вставляется в одной транзакции многострочными INSERT ... RETURNING по
+уровням: число запросов зависит от глубины графа, а не от количества
+лотов и товаров. RETURNING используется только там, где id нужны
+следующему уровню.
+
+Обновление сравнивает граф с сохраненным: лоты сопоставляются по
+lot_number, товары - по (lot_number, position_number), организаторы и
+документы - по порядку. Выполняются только нужные вставки, изменения и
+удаления, по одному массовому запросу на таблицу, а id неизмененных
+товаров (и ссылки на них из позиций предложений) сохраняются.
+
+Массовые операции не вызывают события моделей, поэтому счетчики и
+нормализованные ключи товаров заполняются здесь явно.
+"""
+
+from typing import Dict, Hashable, List
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from models import (
+    Tender, TenderLot, TenderProduct, TenderDocument, TenderOrganizer, SupplierProposal, ProposalItem,
+    normalize_product_key
+)
+
+
+def insert_rows(db: Session, model, rows: List[dict]) -> List[int]:
+    """
+    Многострочная вставка с RETURNING; возвращает id в порядке переданных строк.
+
+    В PostgreSQL строки отправляются пакетами INSERT ... RETURNING, порядок
+    id гарантирует SQLAlchemy. SQLite такой порядок не гарантирует, и там
+    вставка выполняется построчно.
+    """
+    if not rows:
+        return []
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.scalars(statement, rows))
+
+
+def insert_many(db: Session, model, rows: List[dict]):
+    """Многострочная вставка без возврата id"""
+    if rows:
+        db.execute(insert(model), rows)
+
+
+def lot_values(lot_data) -> dict:
+    return {
+        **lot_data.model_dump(exclude={'products'}),
+        "products_count": len(lot_data.products or [])
+    }
+
+
+def product_values(product_data) -> dict:
+    return {
+        **product_data.model_dump(),
+        "normalized_key": normalize_product_key(product_data.name, product_data.unit_of_measure)
+    }
+
+
+def lot_row(tender_id: int, lot_data) -> dict:
+    return {**lot_values(lot_data), "tender_id": tender_id}
+
+
+def product_row(lot_id: int, product_data) -> dict:
+    return {**product_values(product_data), "lot_id": lot_id}
+
+
+def insert_lots(db: Session, tender_id: int, lots) -> List[int]:
+    """Вставляет лоты и их товары: по одному запросу на уровень"""
+    lot_ids = insert_rows(db, TenderLot, [lot_row(tender_id, lot_data) for lot_data in lots])
+    insert_many(db, TenderProduct, [
+        product_row(lot_id, product_data)
+        for lot_id, lot_data in zip(lot_ids, lots)
+        for product_data in lot_data.products or []
+    ])
+    return lot_ids
+
+
+def create_tender_graph(db: Session, tender_values: dict, lots, organizers, documents) -> int:
+    """
+    Создает тендер с лотами, товарами, организаторами и документами.
+
+    Фиксация транзакции остается за вызывающим кодом - при ошибке
+    на любом уровне не сохраняется ничего.
+    """
+    tender_id = insert_rows(db, Tender, [{
+        **tender_values,
+        "lots_count": len(lots),
+        "products_count": sum(len(lot_data.products or []) for lot_data in lots),
+        "documents_count": len(documents)
+    }])[0]
+
+    insert_lots(db, tender_id, lots)
+    insert_many(db, TenderOrganizer, [
+        {**organizer_data.model_dump(), "tender_id": tender_id} for organizer_data in organizers
+    ])
+    insert_many(db, TenderDocument, [
+        {**document_data.model_dump(), "tender_id": tender_id} for document_data in documents
+    ])
+    return tender_id
+
+
+def diff_rows(existing: Dict[Hashable, object], incoming: Dict[Hashable, dict]):
+    """
+    Разница между сохраненными записями и новыми значениями по ключу.
+
+    Возвращает новые записи (ключ, значения), изменения для массового
+    UPDATE по первичному ключу и id удаляемых записей.
+    """
+    inserts = [(key, values) for key, values in incoming.items() if key not in existing]
+    updates = [
+        {"id": existing[key].id, **values}
+        for key, values in incoming.items()
+        if key in existing and any(getattr(existing[key], field) != value for field, value in values.items())
+    ]
+    removed_ids = [row.id for key, row in existing.items() if key not in incoming]
+    return inserts, updates, removed_ids
+
+
+def product_keys(lot_number: int, positions: List) -> List[tuple]:
+    """Ключи товаров лота: номер позиции, а без него - порядковый номер среди таких товаров"""
+    keys = []
+    unnumbered = 0
+    for position_number in positions:
+        if position_number is None:
+            unnumbered += 1
+            keys.append((lot_number, "#", unnumbered))
+        else:
+            keys.append((lot_number, position_number))
+    return keys
+
+
+def _unique(keys, message: str):
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail=message)
+
+
+def _apply_updates(db: Session, model, updates: List[dict]):
+    if updates:
+        db.execute(update(model), updates)
+
+
+def _delete_ids(db: Session, model, ids: List[int]):
+    if ids:
+        db.execute(delete(model).where(model.id.in_(ids)))
+
+
+def sync_by_order(db: Session, model, tender_id: int, items) -> int:
+    """Синхронизирует записи без естественного ключа (организаторы, документы) по порядку"""
+    existing = db.query(model).filter(model.tender_id == tender_id).order_by(model.id).all()
+    inserts, updates, removed_ids = diff_rows(
+        dict(enumerate(existing)),
+        {index: item.model_dump() for index, item in enumerate(items)}
+    )
+    _delete_ids(db, model, removed_ids)
+    _apply_updates(db, model, updates)
+    insert_many(db, model, [{**values, "tender_id": tender_id} for _, values in inserts])
+    return len(items)
+
+
+def update_tender_graph(db: Session, tender: Tender, lots, organizers, documents):
+    """
+    Приводит дочерние записи тендера к переданным, изменяя только разницу.
+
+    Позиции предложений поставщиков удаляются только для товаров,
+    исключенных из тендера; у затронутых предложений обновляется updated_at,
+    по которому кэши определяют версию предложений. Фиксация транзакции
+    остается за вызывающим кодом.
+    """
+    _unique([lot_data.lot_number for lot_data in lots], "Номера лотов не должны повторяться")
+
+    existing_lots = {
+        lot.lot_number: lot for lot in db.query(TenderLot).filter(TenderLot.tender_id == tender.id)
+    }
+    lot_inserts, lot_updates, removed_lot_ids = diff_rows(
+        existing_lots, {lot_data.lot_number: lot_values(lot_data) for lot_data in lots}
+    )
+
+    existing_products = {}
+    lot_numbers = {lot.id: lot.lot_number for lot in existing_lots.values()}
+    products_by_lot = {}
+    for product in db.query(TenderProduct).filter(
+        TenderProduct.lot_id.in_(list(lot_numbers))
+    ).order_by(TenderProduct.id):
+        products_by_lot.setdefault(product.lot_id, []).append(product)
+    for lot_id, products in products_by_lot.items():
+        keys = product_keys(lot_numbers[lot_id], [product.position_number for product in products])
+        existing_products.update(zip(keys, products))
+
+    incoming_products = {}
+    for lot_data in lots:
+        products = lot_data.products or []
+        keys = product_keys(lot_data.lot_number, [product_data.position_number for product_data in products])
+        _unique(keys, f"Номера позиций в лоте {lot_data.lot_number} не должны повторяться")
+        incoming_products.update(zip(keys, [product_values(product_data) for product_data in products]))
+    product_inserts, product_updates, removed_product_ids = diff_rows(existing_products, incoming_products)
+
+    # Удаления: позиции предложений по исключенным товарам, товары, лоты
+    if removed_product_ids:
+        removed_items = ProposalItem.product_id.in_(removed_product_ids)
+        db.execute(
+            update(SupplierProposal)
+            .where(SupplierProposal.id.in_(select(ProposalItem.proposal_id).where(removed_items)))
+            .values(updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(delete(ProposalItem).where(removed_items))
+    _delete_ids(db, TenderProduct, removed_product_ids)
+    _delete_ids(db, TenderLot, removed_lot_ids)
+
+    # Изменения существующих лотов и товаров
+    _apply_updates(db, TenderLot, lot_updates)
+    _apply_updates(db, TenderProduct, product_updates)
+
+    # Вставки: новые лоты, затем новые товары (в том числе новых лотов)
+    new_lot_ids = insert_rows(db, TenderLot, [{**values, "tender_id": tender.id} for _, values in lot_inserts])
+    lot_ids = {number: lot.id for number, lot in existing_lots.items()}
+    lot_ids.update(zip([number for number, _ in lot_inserts], new_lot_ids))
+    insert_many(db, TenderProduct, [
+        {**values, "lot_id": lot_ids[key[0]]} for key, values in product_inserts
+    ])
+
+    documents_count = sync_by_order(db, TenderDocument, tender.id, documents)
+    sync_by_order(db, TenderOrganizer, tender.id, organizers)
+
+    tender.lots_count = len(lots)
+    tender.products_count = len(incoming_products)
+    tender.documents_count = documents_count
+
+
+def load_tender_graph(db: Session, tender_id: int) -> Tender:
+    """Загружает тендер со всеми дочерними записями фиксированным числом запросов"""
+    return db.query(Tender).options(
+        selectinload(Tender.lots).selectinload(TenderLot.products),
+        selectinload(Tender.documents),
+        selectinload(Tender.organizers)
+    ).filter(Tender.id == tender_id).first()
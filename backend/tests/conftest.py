@@ -0,0 +1,74 @@
+"""
+Общие фикстуры тестов.
+
+Тесты выполняются на базе из TEST_DATABASE_URL (например, PostgreSQL из
+docker-compose.postgres.yml) или, если она не задана, на временной базе
+SQLite. На PostgreSQL схема создается миграциями Alembic, на SQLite - по
+моделям (миграции используют функции PostgreSQL) с отметкой последней
+ревизии. Переменные окружения задаются до импорта приложения: настройки
+читаются один раз при импорте config.
+"""
+
+import os
+import shutil
+import tempfile
+
+_sqlite_dir = None
+if not os.environ.get("TEST_DATABASE_URL"):
+    _sqlite_dir = tempfile.mkdtemp(prefix="agb_etp_tests_")
+    os.environ["TEST_DATABASE_URL"] = f"sqlite:///{os.path.join(_sqlite_dir, 'test.db')}"
+
+os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+os.environ["DB_STATS_HEADERS"] = "true"  # Заголовки X-DB-Queries и X-DB-Time
+os.environ["ANALYTICS_REFRESH_INTERVAL"] = "0"
+os.environ["HTTP_CACHE_MICRO_TTL"] = "0"
+
+import pytest
+from alembic import command
+from fastapi.testclient import TestClient
+
+from analytics_views import views_available
+from auth import create_access_token
+from database import Base, SessionLocal, engine
+from schema_migrations import alembic_config, upgrade_database
+
+from tests.factories import LARGE, SMALL, build_dataset
+
+is_postgresql = engine.dialect.name == "postgresql"
+postgresql_only = pytest.mark.skipif(not is_postgresql, reason="только PostgreSQL (TEST_DATABASE_URL)")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    if is_postgresql:
+        upgrade_database()
+    else:
+        Base.metadata.create_all(bind=engine)
+        command.stamp(alembic_config(), "head")
+    yield engine
+    engine.dispose()
+    if _sqlite_dir:
+        shutil.rmtree(_sqlite_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client(database):
+    import main
+    if is_postgresql:
+        # Проверка наличия представлений кэшируется в процессе: выполняется до
+        # измерений, чтобы не попасть в счетчик первого запроса к аналитике
+        with SessionLocal() as db:
+            views_available(db)
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session", params=[SMALL, LARGE], ids=str)
+def dataset(request, database):
+    """База с данными заданного объема; тесты с одним объемом выполняются подряд"""
+    build_dataset(request.param)
+    return request.param
+
+
+def auth_headers(email: str) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': email})}"}
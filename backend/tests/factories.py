@@ -0,0 +1,167 @@
+"""
+Наборы данных для тестов.
+
+Основа - фабрики create_admin.py и create_test_*.py (администратор,
+пользователи по ролям, несколько тендеров с предложениями). Поверх них
+scale_dataset добавляет заданное число тендеров, лотов, товаров, поставщиков
+и предложений, чтобы запросы к API выполнялись на данных разного объема.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from analytics_views import refresh_analytics_views
+from api.v1.analytics import supplier_statistics_cache
+from auth import get_password_hash
+from counters import reconcile_counters
+from create_admin import create_admin_user
+from create_test_supplier_proposals import create_test_supplier_proposals
+from create_test_tenders import create_test_tenders
+from create_test_users import create_test_users
+from database import Base, SessionLocal, engine
+from models import (
+    LegalForm, ProposalItem, SupplierProfile, SupplierProposal, Tender, TenderApplication,
+    TenderDocument, TenderLot, TenderOrganizer, TenderProduct, TenderStatus, User, UserRole
+)
+from tender_comparison import comparison_cache
+
+ADMIN_EMAIL = "admin@agb.com"
+MANAGER_EMAIL = "manager@almazgeobur.ru"
+SUPPLIER_EMAIL = "supplier1@example.com"
+LOAD_SUPPLIER_EMAIL = "supplier1@load.example.com"  # Поставщик с профилем из scale_dataset
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    name: str
+    tenders: int
+    lots: int  # Лотов в тендере
+    products: int  # Товаров в лоте
+    suppliers: int  # Дополнительных поставщиков, каждый подает предложение на каждый тендер
+
+    def __str__(self):
+        return self.name
+
+
+SMALL = DatasetSize("small", tenders=2, lots=1, products=2, suppliers=1)
+LARGE = DatasetSize("large", tenders=8, lots=3, products=4, suppliers=4)
+
+
+def clear_database():
+    """Удаляет все строки таблиц моделей; ревизия Alembic сохраняется"""
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+def add_supplier(db, number: int) -> User:
+    supplier = User(
+        email=f"supplier{number}@load.example.com",
+        hashed_password=get_password_hash("supplier123"),
+        full_name=f"ООО Поставщик-{number}",
+        role=UserRole.SUPPLIER,
+        is_active=True
+    )
+    db.add(supplier)
+    db.flush()
+    db.add(SupplierProfile(
+        user_id=supplier.id,
+        legal_form=LegalForm.OOO,
+        company_name=supplier.full_name,
+        inn=f"77{number:08d}"
+    ))
+    return supplier
+
+
+def add_tender(db, number: int, creator: User, size: DatasetSize) -> Tender:
+    tender = Tender(
+        title=f"Поставка оборудования №{number}",
+        description="Поставка бурового инструмента и расходных материалов",
+        notice_number=f"LOAD-{number:06d}",
+        initial_price=Decimal(100000 * number),
+        status=TenderStatus.PUBLISHED,
+        publication_date=datetime.utcnow() - timedelta(days=number),
+        deadline=datetime.utcnow() + timedelta(days=30 + number),
+        okpd_code="28.92.12.000",
+        region="Республика Саха (Якутия)",
+        created_by=creator.id
+    )
+    db.add(tender)
+    db.flush()
+    db.add(TenderOrganizer(tender_id=tender.id, organization_name="АО Алмазгеобур", inn="1435000000"))
+    db.add(TenderDocument(tender_id=tender.id, title="Техническое задание", file_path=f"/uploads/tz-{number}.pdf"))
+    for lot_number in range(1, size.lots + 1):
+        lot = TenderLot(tender_id=tender.id, lot_number=lot_number, title=f"Лот {lot_number}")
+        db.add(lot)
+        db.flush()
+        db.add_all([
+            TenderProduct(
+                lot_id=lot.id,
+                position_number=position,
+                name=f"Коронка буровая тип {position}",
+                quantity=str(position * 10),
+                unit_of_measure="шт"
+            )
+            for position in range(1, size.products + 1)
+        ])
+    db.flush()
+    return tender
+
+
+def add_proposal(db, tender: Tender, supplier: User, status: str) -> SupplierProposal:
+    proposal = SupplierProposal(tender_id=tender.id, supplier_id=supplier.id, status=status)
+    db.add(proposal)
+    db.flush()
+    products = db.query(TenderProduct.id).join(TenderLot).filter(TenderLot.tender_id == tender.id)
+    db.add_all([
+        ProposalItem(
+            proposal_id=proposal.id,
+            product_id=product_id,
+            price_per_unit=Decimal(random.randint(1000, 50000)),
+            delivery_days=random.randint(5, 60),
+            is_analog=random.random() < 0.3
+        )
+        for product_id, in products
+    ])
+    return proposal
+
+
+def scale_dataset(size: DatasetSize):
+    """Добавляет тендеры с лотами, товарами, заявками и предложениями всех поставщиков"""
+    db = SessionLocal()
+    try:
+        creator = db.query(User).filter(User.email == ADMIN_EMAIL).one()
+        suppliers = db.query(User).filter(User.role == UserRole.SUPPLIER).all()
+        suppliers += [add_supplier(db, number) for number in range(1, size.suppliers + 1)]
+        statuses = ["draft", "submitted", "accepted", "rejected"]
+        for number in range(1, size.tenders + 1):
+            tender = add_tender(db, number, creator, size)
+            for index, supplier in enumerate(suppliers):
+                add_proposal(db, tender, supplier, statuses[index % len(statuses)])
+                db.add(TenderApplication(
+                    tender_id=tender.id,
+                    supplier_id=supplier.id,
+                    proposed_price=tender.initial_price,
+                    comment="Готовы поставить в срок"
+                ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_dataset(size: DatasetSize):
+    """Пустая база, данные фабрик репозитория и дополнительные данные объема size"""
+    random.seed(size.name)
+    clear_database()
+    create_admin_user()
+    create_test_users()
+    create_test_tenders()
+    create_test_supplier_proposals()
+    scale_dataset(size)
+    with engine.begin() as connection:
+        reconcile_counters(connection)
+    refresh_analytics_views(concurrently=False)  # Только PostgreSQL
+    comparison_cache.clear()
+    supplier_statistics_cache.clear()
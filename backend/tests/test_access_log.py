@@ -0,0 +1,87 @@
+"""
+Журнал доступа: идентификатор запроса, поля записи access и формат JSON.
+"""
+
+import json
+import logging
+
+import pytest
+
+from access_log import JsonFormatter, client_address
+from config import settings
+
+from tests.conftest import auth_headers
+from tests.factories import SUPPLIER_EMAIL
+
+
+def access_records(caplog):
+    return [record for record in caplog.records if record.name == "access"]
+
+
+def test_request_id_is_returned_and_generated(client):
+    response = client.get("/health", headers={"X-Request-ID": "nginx-42.a"})
+    assert response.headers["X-Request-ID"] == "nginx-42.a"
+
+    # Неподходящий идентификатор заменяется новым
+    response = client.get("/health", headers={"X-Request-ID": "bad id\n"})
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+def test_access_record_fields(client, dataset, caplog, monkeypatch):
+    caplog.set_level(logging.INFO, logger="access")
+    monkeypatch.setattr(settings, "forwarded_allow_ips", "testclient")
+
+    # Без сжатия размер записи совпадает с размером тела
+    headers = {**auth_headers(SUPPLIER_EMAIL), "X-Forwarded-For": "10.0.0.7, 10.0.0.1", "Accept-Encoding": "identity"}
+    response = client.get("/api/v1/suppliers/proposals", headers=headers)
+
+    assert response.status_code == 200
+    record = access_records(caplog)[-1]
+    assert record.request_id == response.headers["X-Request-ID"]
+    assert record.route == "/api/v1/suppliers/proposals"
+    assert record.status == 200
+    assert record.role == "supplier" and record.user_id is not None
+    assert record.db_queries == int(response.headers["X-DB-Queries"])
+    assert record.response_bytes == len(response.content)
+    assert record.client == "10.0.0.1"
+
+
+def test_anonymous_record_has_route_template(client, dataset, caplog):
+    caplog.set_level(logging.INFO, logger="access")
+    tender_id = client.get("/api/v1/tenders/").json()["items"][0]["id"]
+
+    client.get(f"/api/v1/tenders/{tender_id}")
+
+    record = access_records(caplog)[-1]
+    assert record.route == "/api/v1/tenders/{tender_id}"
+    assert record.user_id is None and record.role is None
+
+
+def test_json_formatter_puts_extra_on_top_level():
+    record = logging.LogRecord("access", logging.INFO, __file__, 1, "GET %s", ("/health",), None)
+    record.request_id = "abc"
+    record.status = 200
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "GET /health"
+    assert entry["level"] == "INFO" and entry["logger"] == "access"
+    assert entry["request_id"] == "abc" and entry["status"] == 200
+    assert "args" not in entry and "msg" not in entry
+
+
+@pytest.mark.parametrize("allow_ips, forwarded, expected", [
+    ("127.0.0.1", None, "127.0.0.1"),
+    # Адрес, добавленный nginx, - последний; левее - то, что прислал клиент
+    ("127.0.0.1", "6.6.6.6, 10.0.0.7", "10.0.0.7"),
+    ("127.0.0.1, 10.0.0.2", "6.6.6.6, 10.0.0.7, 10.0.0.2", "10.0.0.7"),
+    ("127.0.0.1, 10.0.0.7", "10.0.0.7", "10.0.0.7"),
+    ("*", "10.0.0.7, 10.0.0.2", "10.0.0.7"),
+    # Соединение не от доверенного прокси: заголовок подделан
+    ("10.0.0.2", "6.6.6.6", "127.0.0.1"),
+])
+def test_client_address_trusts_only_known_proxies(monkeypatch, allow_ips, forwarded, expected):
+    monkeypatch.setattr(settings, "forwarded_allow_ips", allow_ips)
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+
+    assert client_address({"client": ("127.0.0.1", 40000), "headers": headers}) == expected
@@ -0,0 +1,172 @@
+"""
+Представления аналитики: проверка наличия, обновление одним процессом за период,
+поиск по префиксу ключа товара,
+согласованность страниц с итогами и ответ на СУБД без функций PostgreSQL.
+"""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from analytics_views import ANALYTICS_VIEWS, _views_available, refresh_analytics_views, views_available
+from database import SessionLocal, engine
+from models import ProposalItem, SupplierProfile, SupplierProposal, Tender, TenderLot, TenderProduct, User
+
+from tests.conftest import auth_headers, is_postgresql, postgresql_only
+from tests.factories import ADMIN_EMAIL, SUPPLIER_EMAIL, add_supplier
+
+
+@pytest.mark.skipif(is_postgresql, reason="только без PostgreSQL")
+@pytest.mark.parametrize("path", [
+    "/api/v1/analytics/products/price-analysis",
+    "/api/v1/analytics/products/price-histogram?product_key=x",
+    "/api/v1/analytics/products/price-trend?product_key=x",
+])
+def test_postgresql_analytics_is_not_implemented_elsewhere(client, dataset, path):
+    response = client.get(path, headers=auth_headers(ADMIN_EMAIL))
+
+    assert response.status_code == 501
+    assert "PostgreSQL" in response.json()["detail"]
+
+
+@postgresql_only
+def test_missing_views_are_rechecked(client, dataset):
+    view = ANALYTICS_VIEWS[0]
+    # Представление удаляется и создается в обход drop/create_analytics_views, как миграцией
+    _views_available.clear()
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP MATERIALIZED VIEW {view.name}"))
+    try:
+        with SessionLocal() as db:
+            assert not views_available(db)
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(view.create_sql()))
+            for statement in view.index_sql():
+                connection.execute(text(statement))
+
+    with SessionLocal() as db:
+        assert views_available(db)
+
+
+@postgresql_only
+def test_refresh_is_skipped_within_interval(dataset):
+    assert refresh_analytics_views(concurrently=False)
+
+    assert not refresh_analytics_views(min_interval=3600)
+    assert refresh_analytics_views(min_interval=0)
+
+
+@postgresql_only
+def test_suppliers_total_matches_stale_view(client, dataset):
+    # Предложение нового поставщика попадет в представление только после обновления
+    with SessionLocal() as db:
+        supplier = add_supplier(db, 999)
+        tender_id = db.query(Tender.id).filter(Tender.notice_number == "LOAD-000001").scalar()
+        db.add(SupplierProposal(tender_id=tender_id, supplier_id=supplier.id, status="draft"))
+        db.commit()
+        supplier_id = supplier.id
+    try:
+        response = client.get(
+            "/api/v1/analytics/suppliers/performance", params={"size": 100}, headers=auth_headers(ADMIN_EMAIL)
+        )
+
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert page["total"] == len(page["items"])
+        assert supplier_id not in [item["supplier_id"] for item in page["items"]]
+    finally:
+        with SessionLocal() as db:
+            db.query(SupplierProposal).filter(SupplierProposal.supplier_id == supplier_id).delete()
+            db.query(SupplierProfile).filter(SupplierProfile.user_id == supplier_id).delete()
+            db.query(User).filter(User.id == supplier_id).delete()
+            db.commit()
+
+
+@postgresql_only
+@pytest.mark.parametrize("product_name, found", [("коронка буровая", True), ("коронка_буровая", False)])
+def test_price_analysis_prefix_is_literal(client, dataset, product_name, found):
+    response = client.get(
+        "/api/v1/analytics/products/price-analysis", params={"product_name": product_name},
+        headers=auth_headers(ADMIN_EMAIL)
+    )
+
+    assert response.status_code == 200, response.text
+    assert bool(response.json()["items"]) == found
+
+
+@postgresql_only
+def test_product_key_prefix_index_exists(database):
+    with engine.connect() as connection:
+        definition = connection.execute(text(
+            "SELECT indexdef FROM pg_indexes WHERE indexname = 'ix_mv_product_price_stats_product_key_pattern'"
+        )).scalar()
+
+    assert "varchar_pattern_ops" in definition
+
+
+@pytest.fixture
+def priced_product(dataset):
+    """Товар с ценами 100, 200, 300 и 400 в четырех предложениях"""
+    with SessionLocal() as db:
+        creator = db.query(User).filter(User.email == ADMIN_EMAIL).one()
+        supplier = db.query(User).filter(User.email == SUPPLIER_EMAIL).one()
+        tender = Tender(title="Калибровка цен", description="", created_by=creator.id)
+        db.add(tender)
+        db.flush()
+        lot = TenderLot(tender_id=tender.id, lot_number=1, title="Лот 1")
+        db.add(lot)
+        db.flush()
+        product = TenderProduct(lot_id=lot.id, position_number=1, name="Калибратор контрольный", unit_of_measure="шт")
+        db.add(product)
+        db.flush()
+        for price in (100, 200, 300, 400):
+            proposal = SupplierProposal(tender_id=tender.id, supplier_id=supplier.id)
+            db.add(proposal)
+            db.flush()
+            db.add(ProposalItem(proposal_id=proposal.id, product_id=product.id, price_per_unit=Decimal(price)))
+        db.commit()
+        tender_id = tender.id
+        key = product.normalized_key
+
+    yield key
+
+    with SessionLocal() as db:
+        proposal_ids = [id for id, in db.query(SupplierProposal.id).filter(SupplierProposal.tender_id == tender_id)]
+        db.query(ProposalItem).filter(ProposalItem.proposal_id.in_(proposal_ids)).delete()
+        for proposal in db.query(SupplierProposal).filter(SupplierProposal.id.in_(proposal_ids)):
+            db.delete(proposal)
+        db.query(TenderProduct).filter(TenderProduct.normalized_key == key).delete()
+        db.query(TenderLot).filter(TenderLot.tender_id == tender_id).delete()
+        db.query(Tender).filter(Tender.id == tender_id).delete()
+        db.commit()
+
+
+@postgresql_only
+def test_price_histogram_buckets(client, priced_product):
+    response = client.get(
+        "/api/v1/analytics/products/price-histogram", params={"product_key": priced_product, "buckets": 2},
+        headers=auth_headers(ADMIN_EMAIL)
+    )
+
+    assert response.status_code == 200, response.text
+    # Максимальная цена попадает в последний интервал, а не за его границу
+    assert [
+        (item["bucket"], item["count"], item["min_price"], item["max_price"], item["range_from"], item["range_to"])
+        for item in response.json()["items"]
+    ] == [(1, 2, 100, 200, 100, 250), (2, 2, 300, 400, 250, 400)]
+
+
+@postgresql_only
+def test_price_trend_median(client, priced_product):
+    response = client.get(
+        "/api/v1/analytics/products/price-trend", params={"product_key": priced_product},
+        headers=auth_headers(ADMIN_EMAIL)
+    )
+
+    assert response.status_code == 200, response.text
+    [period] = response.json()["items"]
+    assert period["proposals_count"] == 4
+    assert period["median_price"] == 250
+    assert (period["min_price"], period["avg_price"], period["max_price"]) == (100, 250, 400)
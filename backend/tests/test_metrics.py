@@ -0,0 +1,24 @@
+"""
+Метрики Prometheus: порядок middleware и статистика SQL по маршрутам.
+"""
+
+from prometheus_client import REGISTRY
+
+from metrics import MetricsMiddleware
+
+
+def test_metrics_middleware_is_outermost(client):
+    import main
+
+    # Последний подключенный middleware - первый в списке и самый внешний
+    assert main.app.user_middleware[0].cls is MetricsMiddleware
+
+
+def test_request_metrics_include_sql_stats(client, dataset):
+    labels = {"method": "GET", "route": "/api/v1/tenders/"}
+    before = REGISTRY.get_sample_value("http_request_db_queries_sum", labels) or 0
+
+    response = client.get("/api/v1/tenders/")
+
+    after = REGISTRY.get_sample_value("http_request_db_queries_sum", labels)
+    assert after - before == int(response.headers["X-DB-Queries"]) > 0
@@ -0,0 +1,68 @@
+"""
+Профилирование запросов: флаг администратора, выборочные профили и
+разбивка времени на SQL и Python.
+"""
+
+import os
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import get_db
+from models import User
+from profiling import ProfilingMiddleware
+from query_stats import QueryStatsMiddleware
+
+from tests.conftest import auth_headers
+from tests.factories import ADMIN_EMAIL, SUPPLIER_EMAIL
+
+
+@pytest.fixture
+def profiled(dataset, tmp_path, monkeypatch):
+    """Приложение с одним эндпоинтом под теми же middleware, что и в main"""
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    app = FastAPI()
+
+    @app.get("/users/count")
+    def users_count(db: Session = Depends(get_db)):
+        return {"count": db.query(User).count()}
+
+    with TestClient(QueryStatsMiddleware(ProfilingMiddleware(app))) as client:
+        yield client
+
+
+def test_admin_gets_profile_instead_of_response(profiled):
+    response = profiled.get("/users/count", headers={**auth_headers(ADMIN_EMAIL), "X-Profile": "text"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    # Запрос пользователя для проверки прав не входит в профиль
+    assert "GET /users/count -> 200" in response.text and "(запросов: 1)" in response.text
+    total = float(response.headers["X-Profile-Total-Ms"])
+    sql = float(response.headers["X-Profile-SQL-Ms"])
+    assert 0 <= sql <= total
+    assert float(response.headers["X-Profile-Python-Ms"]) == pytest.approx(total - sql, abs=0.2)
+
+
+def test_profile_flag_ignored_for_other_users(profiled):
+    for headers in ({"X-Profile": "text"}, {**auth_headers(SUPPLIER_EMAIL), "X-Profile": "text"}):
+        response = profiled.get("/users/count?profile=html", headers=headers)
+
+        assert response.status_code == 200
+        assert "count" in response.json()
+        assert "X-Profile-Total-Ms" not in response.headers
+
+
+def test_sampled_profile_is_stored(profiled, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_sample_percent", 100.0)
+
+    response = profiled.get("/users/count")
+
+    assert response.status_code == 200
+    assert "count" in response.json()
+    assert response.headers["X-Profile"] == "stored"
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and "-GET-users_count." in files[0]
@@ -0,0 +1,59 @@
+"""
+Предложения поставщиков: списки по ролям и проверка роли поставщика.
+"""
+
+import pytest
+
+from database import SessionLocal
+from models import SupplierProposal, Tender, User
+
+from tests.conftest import auth_headers
+from tests.factories import MANAGER_EMAIL, SUPPLIER_EMAIL
+
+
+def test_supplier_lists_own_proposals(client, dataset):
+    with SessionLocal() as db:
+        supplier_id = db.query(User.id).filter(User.email == SUPPLIER_EMAIL).scalar()
+        own = db.query(SupplierProposal).filter(SupplierProposal.supplier_id == supplier_id).count()
+
+    # Маршрут объявлен до /{tender_id} и не разбирается как идентификатор тендера
+    response = client.get("/api/v1/tenders/proposals", headers=auth_headers(SUPPLIER_EMAIL))
+
+    assert response.status_code == 200, response.text
+    proposals = response.json()
+    assert len(proposals) == own > 0
+    assert {proposal["supplier_id"] for proposal in proposals} == {supplier_id}
+    assert all(proposal["tender_info"] is None for proposal in proposals)
+
+
+def test_manager_lists_all_proposals(client, dataset):
+    with SessionLocal() as db:
+        total = db.query(SupplierProposal).count()
+
+    response = client.get("/api/v1/tenders/proposals", headers=auth_headers(MANAGER_EMAIL))
+
+    assert response.status_code == 200, response.text
+    proposals = response.json()
+    assert len(proposals) == total
+    assert all(proposal["tender_info"]["title"] for proposal in proposals)
+
+
+def test_manager_lists_tender_proposals(client, dataset):
+    with SessionLocal() as db:
+        tender_id = db.query(Tender.id).filter(Tender.notice_number == "LOAD-000001").scalar()
+        total = db.query(SupplierProposal).filter(SupplierProposal.tender_id == tender_id).count()
+
+    response = client.get(f"/api/v1/tenders/{tender_id}/proposals", headers=auth_headers(MANAGER_EMAIL))
+
+    assert response.status_code == 200, response.text
+    proposals = response.json()
+    assert len(proposals) == total > 0
+    assert all(proposal["supplier_info"]["email"] for proposal in proposals)
+    assert all(proposal["proposal_items"] for proposal in proposals)
+
+
+@pytest.mark.parametrize("email, status_code", [(SUPPLIER_EMAIL, 200), (MANAGER_EMAIL, 403)])
+def test_supplier_endpoints_check_role(client, dataset, email, status_code):
+    response = client.get("/api/v1/suppliers/proposals", headers=auth_headers(email))
+
+    assert response.status_code == status_code, response.text
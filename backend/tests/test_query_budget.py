@@ -0,0 +1,226 @@
+"""
+Бюджет SQL-запросов на запрос к API.
+
+Каждый эндпоинт вызывается на наборах данных разного объема (SMALL и
+LARGE), число выполненных SQL-запросов берется из заголовка X-DB-Queries.
+Бюджет не зависит от объема данных: запрос к базе на каждую строку
+(тендер, лот, предложение) превышает его на большом наборе.
+
+Кэши в памяти процесса очищаются перед каждым вызовом - измеряется
+обработка без кэша.
+"""
+
+from urllib.parse import quote
+
+import pytest
+
+from api.v1.analytics import supplier_statistics_cache
+from database import SessionLocal
+from models import SupplierProposal, Tender, TenderApplication, User
+from tender_comparison import comparison_cache
+
+from tests.conftest import auth_headers, is_postgresql, postgresql_only
+from tests.factories import ADMIN_EMAIL, LOAD_SUPPLIER_EMAIL, MANAGER_EMAIL, SUPPLIER_EMAIL
+
+PRODUCT_KEY = quote("коронка буровая тип 1|шт")
+
+# Метод, путь, пользователь, не больше SQL-запросов
+BUDGETS = [
+    ("GET", "/api/v1/auth/me", ADMIN_EMAIL, 1),
+    ("GET", "/", None, 0),
+    ("GET", "/health", None, 0),
+
+    ("GET", "/api/v1/tenders/", None, 4),
+    ("GET", "/api/v1/tenders/?search=бур&sort=by_price_desc", None, 4),
+    ("GET", "/api/v1/tenders/{tender_id}", None, 7),
+    ("GET", "/api/v1/tenders/{tender_id}/products", None, 3),
+    ("GET", "/api/v1/tenders/{tender_id}/proposals", MANAGER_EMAIL, 4),
+    ("GET", "/api/v1/tenders/proposals", MANAGER_EMAIL, 3),
+    ("GET", "/api/v1/tenders/proposals", SUPPLIER_EMAIL, 3),
+
+    ("GET", "/api/v1/applications/my", SUPPLIER_EMAIL, 2),
+    ("GET", "/api/v1/applications/tender/{tender_id}", ADMIN_EMAIL, 3),
+    ("GET", "/api/v1/applications/{application_id}", ADMIN_EMAIL, 9),
+    ("GET", "/api/v1/applications/export/tender/{tender_id}", ADMIN_EMAIL, 3),
+
+    ("GET", "/api/v1/users/", ADMIN_EMAIL, 2),
+    ("GET", "/api/v1/users/{user_id}", ADMIN_EMAIL, 2),
+    ("GET", "/api/v1/users/{user_id}/supplier-profile", ADMIN_EMAIL, 3),
+
+    ("GET", "/api/v1/export/tender/{tender_id}", ADMIN_EMAIL, 6),
+    ("GET", "/api/v1/export/tenders", ADMIN_EMAIL, 2),
+
+    ("GET", "/api/v1/dashboard/stats", ADMIN_EMAIL, 13),
+    ("GET", "/api/v1/dashboard/recent-tenders", ADMIN_EMAIL, 2),
+
+    ("GET", "/api/v1/files/list", ADMIN_EMAIL, 1),
+
+    ("GET", "/api/v1/suppliers/tenders", SUPPLIER_EMAIL, 3),
+    ("GET", "/api/v1/suppliers/tenders/{tender_id}", SUPPLIER_EMAIL, 2),
+    ("GET", "/api/v1/suppliers/tenders/{tender_id}/products", SUPPLIER_EMAIL, 4),
+    ("GET", "/api/v1/suppliers/proposals", SUPPLIER_EMAIL, 8),
+    ("GET", "/api/v1/suppliers/proposals/{proposal_id}", SUPPLIER_EMAIL, 3),
+
+    ("GET", "/api/v1/analytics/tenders/summary", ADMIN_EMAIL, 5),
+    ("GET", "/api/v1/analytics/suppliers/performance", ADMIN_EMAIL, 3),
+    ("GET", "/api/v1/analytics/tenders/{tender_id}/proposals", ADMIN_EMAIL, 5),
+    # Функции PostgreSQL (width_bucket, date_trunc, percentile_cont)
+    pytest.param("GET", "/api/v1/analytics/products/price-analysis", ADMIN_EMAIL, 2, marks=postgresql_only),
+    pytest.param(
+        "GET", f"/api/v1/analytics/products/price-histogram?product_key={PRODUCT_KEY}", ADMIN_EMAIL, 2,
+        marks=postgresql_only
+    ),
+    pytest.param(
+        "GET", f"/api/v1/analytics/products/price-trend?product_key={PRODUCT_KEY}", ADMIN_EMAIL, 2,
+        marks=postgresql_only
+    ),
+    ("GET", "/api/v1/analytics/suppliers/{supplier_id}/statistics", ADMIN_EMAIL, 3),
+    # Пользователь, блокировка, три представления, снятие блокировки
+    pytest.param("POST", "/api/v1/analytics/refresh", ADMIN_EMAIL, 6, marks=postgresql_only),
+]
+
+# Эндпоинты без бюджета: причина
+NOT_COVERED = {
+    "GET /api/v1/files/download/{file_id}": "читает файл с диска, к базе не обращается",
+}
+
+
+def endpoint(case) -> str:
+    """Метод и шаблон пути случая BUDGETS: GET /api/v1/tenders/{tender_id}"""
+    method, path = getattr(case, "values", case)[:2]
+    return f"{method} {path.split('?')[0]}"
+
+
+@pytest.fixture(scope="session")
+def ids(dataset):
+    """Идентификаторы записей набора данных для подстановки в пути"""
+    db = SessionLocal()
+    try:
+        supplier = db.query(User).filter(User.email == SUPPLIER_EMAIL).one()
+        profile_user = db.query(User).filter(User.email == LOAD_SUPPLIER_EMAIL).one()
+        proposal = db.query(SupplierProposal).filter(SupplierProposal.supplier_id == supplier.id).first()
+        tender = db.query(Tender).filter(Tender.notice_number == "LOAD-000001").one()
+        application = db.query(TenderApplication).filter(TenderApplication.tender_id == tender.id).first()
+        return {
+            "tender_id": tender.id,
+            "proposal_id": proposal.id,
+            "supplier_id": supplier.id,
+            "user_id": profile_user.id,
+            "application_id": application.id,
+        }
+    finally:
+        db.close()
+
+
+def tender_payload(size) -> dict:
+    """Тендер с числом лотов и товаров набора данных"""
+    return {
+        "title": "Поставка долот",
+        "description": "Тендер для проверки числа запросов",
+        "initial_price": "1500000",
+        "organizers": [{"organization_name": "АО Алмазгеобур", "inn": "1435000000"}],
+        "documents": [{"title": "Техническое задание", "file_path": "/uploads/tz.pdf"}],
+        "lots": [
+            {
+                "lot_number": lot_number,
+                "title": f"Лот {lot_number}",
+                "products": [
+                    {"position_number": position, "name": f"Долото тип {position}", "quantity": "5", "unit_of_measure": "шт"}
+                    for position in range(1, size.products + 1)
+                ]
+            }
+            for lot_number in range(1, size.lots + 1)
+        ]
+    }
+
+
+def proposal_items(client, tender_id: int) -> list:
+    response = client.get(f"/api/v1/tenders/{tender_id}/products")
+    return [
+        {"product_id": product["id"], "price_per_unit": "1000", "delivery_days": 10}
+        for product in response.json()
+    ]
+
+
+def query_count(client, method: str, path: str, email=None, **kwargs) -> int:
+    comparison_cache.clear()
+    supplier_statistics_cache.clear()
+    headers = auth_headers(email) if email else {}
+    response = client.request(method, path, headers=headers, **kwargs)
+    assert response.status_code < 400, f"{method} {path}: {response.status_code} {response.text[:200]}"
+    return int(response.headers["X-DB-Queries"])
+
+
+@pytest.mark.parametrize(
+    "method, path, email, budget", BUDGETS,
+    ids=[endpoint(case) for case in BUDGETS]
+)
+def test_query_budget(client, ids, method, path, email, budget):
+    count = query_count(client, method, path.format(**ids), email)
+    assert count <= budget, f"{method} {path}: {count} SQL-запросов при бюджете {budget}"
+
+
+@pytest.fixture
+def published_tender(client, dataset) -> int:
+    """Новый опубликованный тендер без предложений"""
+    response = client.post("/api/v1/tenders/", json=tender_payload(dataset), headers=auth_headers(ADMIN_EMAIL))
+    assert response.status_code < 400, response.text
+    tender_id = response.json()["id"]
+    client.post(f"/api/v1/tenders/{tender_id}/publish", headers=auth_headers(ADMIN_EMAIL))
+    return tender_id
+
+
+def test_create_tender_budget(client, dataset):
+    count = query_count(client, "POST", "/api/v1/tenders/", ADMIN_EMAIL, json=tender_payload(dataset))
+    # SQLite не гарантирует порядок id в многострочном INSERT ... RETURNING,
+    # и insert_rows вставляет там лоты построчно
+    budget = 12 if is_postgresql else 11 + dataset.lots
+    assert count <= budget, f"Создание тендера: {count} SQL-запросов при бюджете {budget}"
+
+
+def test_update_tender_budget(client, dataset, published_tender):
+    payload = tender_payload(dataset)
+    payload["lots"][0]["products"].append({"name": "Переходник", "quantity": "1", "unit_of_measure": "шт"})
+    count = query_count(client, "PUT", f"/api/v1/tenders/{published_tender}", ADMIN_EMAIL, json=payload)
+    assert count <= 15, f"Изменение тендера: {count} SQL-запросов при бюджете 15"
+
+
+def test_create_proposal_budget(client, published_tender):
+    payload = {"tender_id": published_tender, "proposal_items": proposal_items(client, published_tender)}
+    count = query_count(client, "POST", "/api/v1/suppliers/proposals", SUPPLIER_EMAIL, json=payload)
+    assert count <= 10, f"Создание предложения: {count} SQL-запросов при бюджете 10"
+
+
+def test_patch_proposal_items_budget(client, published_tender):
+    items = proposal_items(client, published_tender)
+    response = client.post(
+        "/api/v1/suppliers/proposals", json={"tender_id": published_tender, "proposal_items": items[:1]},
+        headers=auth_headers(SUPPLIER_EMAIL)
+    )
+    proposal_id = response.json()["id"]
+    for item in items:
+        item["price_per_unit"] = "900"
+    count = query_count(
+        client, "PATCH", f"/api/v1/suppliers/proposals/{proposal_id}/items", SUPPLIER_EMAIL,
+        json={"items": items, "removed_product_ids": []}
+    )
+    assert count <= 5, f"Изменение позиций предложения: {count} SQL-запросов при бюджете 5"
+
+
+def test_every_endpoint_has_budget(client):
+    """Новый эндпоинт чтения должен получить бюджет (или причину, почему его нет)"""
+    covered = {endpoint(case) for case in BUDGETS}
+    # Схема OpenAPI содержит полные пути с префиксами роутеров
+    missing = [
+        f"GET {path}"
+        for path, operations in client.app.openapi()["paths"].items()
+        if "get" in operations and f"GET {path}" not in covered and f"GET {path}" not in NOT_COVERED
+    ]
+    assert not missing, f"Эндпоинты без бюджета SQL-запросов: {missing}"
+
+
+def test_seeded_users_can_log_in(client, dataset):
+    """Пароли create_test_users проверяются тем же алгоритмом, что и при входе"""
+    response = client.post("/api/v1/auth/login", json={"email": SUPPLIER_EMAIL, "password": "supplier123"})
+    assert response.status_code == 200, response.text
+    assert response.json()["access_token"]
@@ -0,0 +1,72 @@
+"""
+Диагностика SQL: заголовки статистики и повтор медленных запросов с EXPLAIN ANALYZE.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from config import Settings, settings
+from query_stats import _is_select, explain_analyze
+
+
+class FakeCursor:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.executed = []
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement.split(" ", 1)[0] if statement.startswith("EXPLAIN") else statement)
+        if self.fail and statement.startswith("EXPLAIN"):
+            raise RuntimeError("canceling statement")
+
+    def fetchall(self):
+        return [("Seq Scan on tenders",)]
+
+    def close(self):
+        pass
+
+
+def fake_connection(cursor):
+    """Соединение SQLAlchemy, у которого есть только курсор DB-API"""
+    return SimpleNamespace(connection=SimpleNamespace(dbapi_connection=SimpleNamespace(cursor=lambda: cursor)))
+
+
+def test_stats_headers_are_off_by_default():
+    assert Settings.model_fields["db_stats_headers"].default is False
+
+
+def test_stats_headers_follow_setting(client, monkeypatch):
+    assert "X-DB-Queries" in client.get("/health").headers
+
+    monkeypatch.setattr(settings, "db_stats_headers", False)
+    response = client.get("/health")
+
+    assert "X-DB-Queries" not in response.headers and "X-DB-Time" not in response.headers
+
+
+@pytest.mark.parametrize("fail", [False, True])
+def test_explain_always_rolls_back_savepoint(fail):
+    cursor = FakeCursor(fail=fail)
+
+    plan = explain_analyze(fake_connection(cursor), "SELECT * FROM tenders", {})
+
+    assert cursor.executed == [
+        "SAVEPOINT explain_slow_query",
+        "EXPLAIN",
+        "ROLLBACK TO SAVEPOINT explain_slow_query",
+        "RELEASE SAVEPOINT explain_slow_query",
+    ]
+    assert plan.startswith("EXPLAIN не выполнен") == fail
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT tenders.id FROM tenders", True),
+    ("\n  select 1", True),
+    ("WITH moved AS (DELETE FROM tenders RETURNING id) SELECT count(*) FROM moved", False),
+    ("WITH RECURSIVE t(n) AS (SELECT 1) SELECT n FROM t", False),
+    ("UPDATE tenders SET status = 'draft'", False),
+    ("SELECTED", False),
+])
+def test_only_plain_select_is_explained(statement, expected):
+    assert _is_select(statement) is expected
@@ -0,0 +1,85 @@
+"""
+Схема базы: ревизия Alembic и индексы, на которые рассчитаны запросы API.
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+from schema_migrations import HEAD_REVISION, check_schema_revision, head_revision
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_head_revision_constant_matches_migrations():
+    assert HEAD_REVISION == head_revision()
+
+
+def test_schema_revision_check_passes_on_migrated_database(database):
+    check_schema_revision(database)
+
+
+def test_app_import_does_not_load_alembic():
+    # Ревизия проверяется простым SQL: Alembic нужен только для обновления базы
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print(any(m.split('.')[0] == 'alembic' for m in sys.modules))"],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+@pytest.mark.parametrize("table_name, column_name", [
+    ("tender_lots", "tender_id"),
+    ("tender_products", "lot_id"),
+    ("tender_documents", "tender_id"),
+    ("tender_organizers", "tender_id"),
+    ("tender_applications", "tender_id"),
+    ("tender_applications", "supplier_id"),
+])
+def test_tender_graph_foreign_keys_are_indexed(database, table_name, column_name):
+    indexes = inspect(database).get_indexes(table_name)
+
+    assert [column_name] in [index["column_names"] for index in indexes]
+
+
+
+def test_data_migrations_on_fresh_database(tmp_path):
+    """Ревизии 0004 и 0006 заполняют ключи товаров и счетчики в существующих строках"""
+    from alembic import command
+    from sqlalchemy import create_engine, text
+
+    from schema_migrations import alembic_config
+
+    rows = [
+        ("INSERT INTO tenders (id, title, description, status, created_at) "
+         "VALUES (1, 'Тендер', '', 'DRAFT', :now)"),
+        "INSERT INTO tender_lots (id, tender_id, lot_number, title, created_at) VALUES (1, 1, 1, 'Лот', :now)",
+        ("INSERT INTO tender_products (id, lot_id, position_number, name, unit_of_measure, created_at) "
+         "VALUES (1, 1, 1, 'Коронка  буровая, Ёмкая', 'Шт.', :now)"),
+        "INSERT INTO supplier_proposals (id, tender_id, created_at) VALUES (1, 1, :now)",
+    ]
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    with fresh.begin() as connection:
+        command.upgrade(alembic_config(connection), "0003")
+        # server_default now() ревизии 0001 в SQLite не работает - время задается явно
+        for statement in rows:
+            connection.execute(text(statement), {"now": datetime.utcnow()})
+
+        command.upgrade(alembic_config(connection), "head")
+
+        key = connection.execute(text("SELECT normalized_key FROM tender_products")).scalar()
+        tender = connection.execute(text(
+            "SELECT lots_count, products_count, proposals_count, documents_count FROM tenders"
+        )).one()
+        lot_products = connection.execute(text("SELECT products_count FROM tender_lots")).scalar()
+    fresh.dispose()
+
+    assert key == "коронка буровая емкая|шт"
+    assert tuple(tender) == (1, 1, 1, 0)
+    assert lot_products == 1
@@ -0,0 +1,33 @@
+"""Время старта приложения и отложенная загрузка pandas"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+from dataframes import load_pandas
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_startup_fits_import_budget():
+    # Замер benchmarks/startup.py с бюджетом по умолчанию: код 1, если импорт
+    # main дольше бюджета или при старте загружаются pandas, numpy, openpyxl
+    result = subprocess.run(
+        [sys.executable, os.path.join("benchmarks", "startup.py")],
+        cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_load_pandas_without_library(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pandas", None)
+
+    with pytest.raises(HTTPException) as error:
+        load_pandas("экспорта в Excel")
+
+    assert error.value.status_code == 500
+    assert error.value.detail == "Библиотеки для экспорта в Excel не установлены"
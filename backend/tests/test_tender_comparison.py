@@ -0,0 +1,51 @@
+"""
+Итоги сравнения предложений: количество позиции из строкового поля.
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from database import SessionLocal
+from models import ProposalItem, SupplierProposal, Tender, TenderLot, TenderProduct, User
+from tender_comparison import comparison_cache, compare_tender_proposals
+
+from tests.conftest import postgresql_only
+from tests.factories import ADMIN_EMAIL, SUPPLIER_EMAIL
+
+
+@pytest.mark.parametrize("quantity, expected", [
+    ("10", 10),
+    ("2.5", 2.5),
+    ("2,5", 2.5),
+    pytest.param("12 шт", 12, marks=postgresql_only),
+    pytest.param("1.25 т", 1.25, marks=postgresql_only),
+    pytest.param("по заявке", 1, marks=postgresql_only),
+])
+def test_total_price_uses_product_quantity(dataset, quantity, expected):
+    db = SessionLocal()
+    try:
+        creator = db.query(User).filter(User.email == ADMIN_EMAIL).one()
+        supplier = db.query(User).filter(User.email == SUPPLIER_EMAIL).one()
+        tender = Tender(title="Сравнение количества", description="", created_by=creator.id)
+        db.add(tender)
+        db.flush()
+        lot = TenderLot(tender_id=tender.id, lot_number=1, title="Лот 1")
+        db.add(lot)
+        db.flush()
+        product = TenderProduct(lot_id=lot.id, position_number=1, name="Коронка", quantity=quantity)
+        proposal = SupplierProposal(tender_id=tender.id, supplier_id=supplier.id, vat_percent=Decimal(20))
+        db.add_all([product, proposal])
+        db.flush()
+        db.add(ProposalItem(proposal_id=proposal.id, product_id=product.id, price_per_unit=Decimal(100)))
+        db.flush()
+
+        result = compare_tender_proposals(db, tender)
+    finally:
+        db.rollback()
+        db.close()
+        comparison_cache.clear()
+
+    [summary] = result["proposals"]
+    assert summary["total_price"] == pytest.approx(100 * expected)
+    assert summary["total_price_with_vat"] == pytest.approx(120 * expected)
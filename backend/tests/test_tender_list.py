@@ -0,0 +1,82 @@
+"""
+Список тендеров: фильтры по лотам и товарам, версия списка для условных запросов.
+"""
+
+import pytest
+
+from database import SessionLocal
+from models import SupplierProposal, User
+
+from tests.conftest import auth_headers
+from tests.factories import ADMIN_EMAIL, SUPPLIER_EMAIL
+
+
+@pytest.fixture
+def tender_with_matches(client, dataset) -> int:
+    """Тендер с двумя организаторами, у которого искомые слова есть в нескольких лотах и товарах, но не в названии"""
+    payload = {
+        "title": "Поставка бурового инструмента",
+        "description": "Поставка по заявке",
+        "initial_price": "100000",
+        "organizers": [
+            {"organization_name": "АО Алмазгеобур", "inn": "1435000000"},
+            {"organization_name": "ООО Буровой сервис", "inn": "1435999999"}
+        ],
+        "documents": [{"title": "Техническое задание", "file_path": "uploads/tz.pdf"}],
+        "lots": [
+            {
+                "lot_number": lot_number,
+                "title": f"Лот {lot_number}",
+                "okpd_code": "28.92.61.110",
+                "products": [
+                    {"position_number": position, "name": f"Adapter XQZ-{lot_number}{position}", "quantity": "1"}
+                    for position in range(1, 4)
+                ]
+            }
+            for lot_number in range(1, 3)
+        ]
+    }
+    response = client.post("/api/v1/tenders/", json=payload, headers=auth_headers(ADMIN_EMAIL))
+    assert response.status_code < 400, response.text
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"search": "xqz"},
+    {"okpd_code": "28.92.61.110"},
+    {"organizer_inn": "1435999999"},
+], ids=["all", "search", "okpd_code", "organizer_inn"])
+def test_lot_product_and_organizer_matches_return_tender_once(client, tender_with_matches, params):
+    response = client.get("/api/v1/tenders/", params={**params, "size": 100})
+
+    assert response.status_code == 200, response.text
+    page = response.json()
+    ids = [item["id"] for item in page["items"]]
+    assert ids.count(tender_with_matches) == 1
+    assert len(ids) == len(set(ids)) == page["total"]
+
+
+
+def test_list_version_covers_proposals(client, tender_with_matches):
+    params = {"search": "xqz"}
+    response = client.get("/api/v1/tenders/", params=params)
+    etag = response.headers["ETag"]
+    # Время изменения тендера не учитывает предложения, поэтому не отдается
+    assert "Last-Modified" not in response.headers
+    assert client.get("/api/v1/tenders/", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    # Новое предложение меняет только счетчик тендера
+    with SessionLocal() as db:
+        supplier_id = db.query(User.id).filter(User.email == SUPPLIER_EMAIL).scalar()
+        proposal = SupplierProposal(tender_id=tender_with_matches, supplier_id=supplier_id)
+        db.add(proposal)
+        db.commit()
+        try:
+            response = client.get("/api/v1/tenders/", params=params, headers={"If-None-Match": etag})
+
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+        finally:
+            db.delete(proposal)
+            db.commit()
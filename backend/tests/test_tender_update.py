@@ -0,0 +1,60 @@
+"""
+Изменение тендера: позиции предложений по исключенным товарам и кэши предложений.
+"""
+
+from datetime import datetime, timedelta
+
+from database import SessionLocal
+from models import SupplierProposal, User
+
+from tests.conftest import auth_headers
+from tests.factories import ADMIN_EMAIL, SUPPLIER_EMAIL
+
+
+def tender_payload(products: int) -> dict:
+    return {
+        "title": "Поставка долот",
+        "description": "Тендер для проверки изменения товаров",
+        "initial_price": "1500000",
+        "organizers": [{"organization_name": "АО Алмазгеобур", "inn": "1435000000"}],
+        "documents": [{"title": "Техническое задание", "file_path": "/uploads/tz.pdf"}],
+        "lots": [{
+            "lot_number": 1,
+            "title": "Лот 1",
+            "products": [
+                {"position_number": position, "name": f"Долото тип {position}", "quantity": "5", "unit_of_measure": "шт"}
+                for position in range(1, products + 1)
+            ]
+        }]
+    }
+
+
+def test_removed_product_invalidates_supplier_statistics(client, dataset):
+    admin = auth_headers(ADMIN_EMAIL)
+    tender_id = client.post("/api/v1/tenders/", json=tender_payload(3), headers=admin).json()["id"]
+    client.post(f"/api/v1/tenders/{tender_id}/publish", headers=admin)
+    products = client.get(f"/api/v1/tenders/{tender_id}/products").json()
+    response = client.post("/api/v1/suppliers/proposals", json={
+        "tender_id": tender_id,
+        "proposal_items": [
+            {"product_id": product["id"], "price_per_unit": "1000", "delivery_days": 10} for product in products
+        ]
+    }, headers=auth_headers(SUPPLIER_EMAIL))
+    assert response.status_code < 400, response.text
+
+    with SessionLocal() as db:
+        supplier_id = db.query(User.id).filter(User.email == SUPPLIER_EMAIL).scalar()
+        # Время изменения в SQLite хранится с точностью до секунды
+        db.query(SupplierProposal).filter(SupplierProposal.supplier_id == supplier_id).update(
+            {"created_at": datetime.utcnow() - timedelta(hours=1), "updated_at": None}
+        )
+        db.commit()
+
+    statistics_url = f"/api/v1/analytics/suppliers/{supplier_id}/statistics"
+    before = client.get(statistics_url, headers=admin).json()["statistics"]["analog_statistics"]["total_items"]
+
+    response = client.put(f"/api/v1/tenders/{tender_id}", json=tender_payload(2), headers=admin)
+    assert response.status_code < 400, response.text
+
+    after = client.get(statistics_url, headers=admin).json()["statistics"]["analog_statistics"]["total_items"]
+    assert after == before - 1
@@ -32,9 +32,10 @@ interface SuppliersResponse {
 }
 
 interface PriceAnalysis {
-  product_id: number;
+  product_key: string;
   product_name: string;
-  position_number: number | null;
+  unit_of_measure: string | null;
+  tenders_count: number;
   proposals_count: number;
   avg_price: number;
   min_price: number;
@@ -596,13 +597,13 @@ export default function AnalyticsPage() {
                 </thead>
                 <tbody className="bg-white divide-y divide-gray-200">
                   {priceAnalysis.map((item) => (
-                    <tr key={item.product_id}>
+                    <tr key={item.product_key}>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div>
                           <div className="text-sm font-medium text-gray-900">{item.product_name}</div>
-                          {item.position_number && (
-                            <div className="text-sm text-gray-500">Позиция: {item.position_number}</div>
-                          )}
+                          <div className="text-sm text-gray-500">
+                            {item.unit_of_measure && `${item.unit_of_measure} · `}Тендеров: {item.tenders_count}
+                          </div>
                         </div>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-900">
@@ -205,7 +205,11 @@ export default function ApplyToTenderPage() {
 
       if (!response.ok) {
         const errorData = await response.json().catch(() => ({}));
-        throw new Error(errorData.detail || `Ошибка создания предложения (${response.status})`);
+        // Ошибки по позициям приходят списком
+        const detail = Array.isArray(errorData.detail)
+          ? errorData.detail.map((error: { msg: string }) => error.msg).join('; ')
+          : errorData.detail;
+        throw new Error(detail || `Ошибка создания предложения (${response.status})`);
       }
 
       const proposalData = await response.json();
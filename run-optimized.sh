@@ -20,6 +20,7 @@ echo "🌐 IP сервера: $SERVER_IP"
 # Остановка всех процессов
 echo "🛑 Остановка всех процессов..."
 pkill -f "python3 main.py" 2>/dev/null || true
+pkill -f "gunicorn.*main:app" 2>/dev/null || true
 pkill -f "npm start" 2>/dev/null || true
 pkill -f "next start" 2>/dev/null || true
 pkill -f "node.*next" 2>/dev/null || true
@@ -62,6 +63,9 @@ MAX_FILE_SIZE=10485760
 HOST=0.0.0.0
 PORT=8000
 DEBUG=false
+
+# Workers (0 - по числу CPU и доступной памяти)
+WORKERS=0
 EOF
 
 # Создание .env.local для Frontend
@@ -115,16 +119,25 @@ pip3 install --break-system-packages --no-cache-dir \
     passlib==1.7.4 \
     python-multipart==0.0.20 \
     bcrypt==5.0.0 \
-    email-validator==2.3.0
+    email-validator==2.3.0 \
+    orjson==3.9.10 \
+    alembic==1.12.1 \
+    gunicorn==21.2.0 \
+    prometheus-client==0.19.0 \
+    pyinstrument==4.6.1
 
 if [ $? -ne 0 ]; then
     echo "❌ Ошибка установки Python зависимостей"
     exit 1
 fi
 
+# Миграции схемы базы данных (до запуска Backend - при старте он проверяет ревизию)
+echo "🔄 Обновление схемы базы данных..."
+python3 schema_migrations.py
+
 # Запуск Backend
 echo "🚀 Запуск Backend..."
-nohup python3 main.py > ../logs/backend.log 2>&1 &
+nohup gunicorn -c gunicorn.conf.py main:app > ../logs/backend.log 2>&1 &
 BACKEND_PID=$!
 echo "Backend PID: $BACKEND_PID"
 
@@ -143,10 +156,6 @@ if curl -s http://localhost:8000/health > /dev/null; then
     cd backend
     python3 init_db.py
     
-    # Выполнение миграции точности полей
-    echo "🔄 Выполнение миграции точности полей..."
-    python3 ../migrate_precision.py
-    
     cd ..
 else
     echo "❌ Backend не запустился"
@@ -7,6 +7,7 @@ echo "🛑 Остановка Алмазгеобур ЭТП..."
 # Остановка Backend и Frontend
 echo "⏹️  Остановка Backend и Frontend..."
 pkill -f "python3 main.py" 2>/dev/null || true
+pkill -f "gunicorn.*main:app" 2>/dev/null || true
 pkill -f "npm start" 2>/dev/null || true
 pkill -f "next start" 2>/dev/null || true
 pkill -f "node.*next" 2>/dev/null || true